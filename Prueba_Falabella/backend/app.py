@@ -1,35 +1,91 @@
 # backend/app.py
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Blueprint, Response, current_app, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 from config import Config
-from models import db, TipoDocumento, Cliente, Compra
+from models import db, TipoDocumento, Cliente, tipos_documento
+from consultas import (
+    consulta_clientes_por_total, codificar_cursor, decodificar_cursor,
+    consulta_cliente_con_totales, consulta_compras_cliente, buscar_clientes_lote,
+    totales_compras_por_cliente
+)
+from exportacion import (
+    COLUMNAS_CLIENTE, COLUMNAS_COMPRAS,
+    escribir_csv_cliente, escribir_excel, fila_datos_cliente, filas_compras, generar_csv_compras
+)
+from reportes import generar_reporte_fidelizacion, parametros_reporte_fidelizacion
+from segmentacion import Segmentacion
+from busqueda import consulta_busqueda_clientes
+from ingesta import ERROR, ESTADOS, LoteDemasiadoGrande, ingerir_compras, leer_csv, leer_ndjson
+from columnar import (
+    FORMATOS_COLUMNARES, disponible as columnar_disponible,
+    escribir_columnar, esquemas, lotes_compras, lotes_compras_cliente
+)
+from cache_artefactos import cache_artefactos
+from retencion import retencion
+from metricas import registro
+from instrumentacion import instrumentacion
+from migraciones import preparar_esquema
+from dinero import a_centavos, a_pesos, formatear_cop
+from trabajos import cola_trabajos, ColaLlena, Trabajo
+from conexiones import conexiones, solo_lectura
+from respuestas import compresion, condicional, orjson_disponible, ProveedorJSONRapido
+from sqlalchemy import select, func
 from datetime import datetime, timedelta
-import pandas as pd
+import io
+import json
 import os
 
-app = Flask(__name__)
-app.config.from_object(Config)
+# Rutas de la API; la app se arma en create_app()
+api = Blueprint('api', __name__)
 
-# Inicializar extensiones
-db.init_app(app)
-CORS(app)
+def mensaje_sin_fidelizacion():
+    """Mensaje cuando ningún cliente supera el umbral de fidelización configurado"""
+    return (
+        f"No hay clientes que superen los {formatear_cop(a_centavos(current_app.config['UMBRAL_FIDELIZACION']))} COP "
+        f"en los últimos {current_app.config['DIAS_VENTANA_FIDELIZACION']} días"
+    )
 
-# Inicializar carpeta de exportaciones
-Config.init_app(app)
+# formato: (extensión, tipo MIME; None para deducirlo de la extensión)
+FORMATOS_REPORTE = {'excel': ('xlsx', None), **FORMATOS_COLUMNARES}
+
+
+def _error_formato(formato, formatos):
+    """Respuesta de error si el formato no es válido o falta pyarrow; None si se puede generar"""
+    if formato not in formatos:
+        return jsonify({'error': f"Formato no válido, use: {', '.join(formatos)}"}), 400
+    if formato in FORMATOS_COLUMNARES and not columnar_disponible():
+        return jsonify({'error': f'El formato {formato} requiere pyarrow, que no está instalado'}), 501
+    return None
 
 
 # ==================== ENDPOINT 1: Buscar Cliente ====================
-@app.route('/api/buscar-cliente', methods=['POST'])
+@api.route('/api/buscar-cliente', methods=['GET', 'POST'])
+@solo_lectura
+@condicional()
 def buscar_cliente():
     """
     Busca un cliente por tipo y número de documento
     Body: {
         "tipo_documento": "CC",
-        "numero_documento": "1234567890"
+        "numero_documento": "1234567890",
+        "limite": 50, "offset": 0 (opcionales, paginan la lista de compras)
     }
+    Con GET los mismos campos van en la query string; así la respuesta
+    admite peticiones condicionales (ETag / Last-Modified).
     """
     try:
-        data = request.get_json()
+        if request.method == 'GET':
+            data = request.args.to_dict()
+            try:
+                for campo in ('limite', 'offset'):
+                    if campo in data:
+                        data[campo] = int(data[campo])
+            except ValueError:
+                return jsonify({
+                    'error': 'limite debe ser un entero positivo y offset un entero no negativo'
+                }), 400
+        else:
+            data = request.get_json()
         tipo_doc = data.get('tipo_documento')
         numero_doc = data.get('numero_documento')
         
@@ -38,35 +94,107 @@ def buscar_cliente():
                 'error': 'Debe proporcionar tipo_documento y numero_documento'
             }), 400
         
-        # Buscar tipo de documento
-        tipo_documento_obj = TipoDocumento.query.filter_by(codigo=tipo_doc).first()
+        limite = data.get('limite')
+        offset = data.get('offset', 0)
+        # bool es subclase de int: true/false en el JSON no son paginación válida
+        limite_invalido = limite is not None and (
+            isinstance(limite, bool) or not isinstance(limite, int) or limite < 1
+        )
+        offset_invalido = isinstance(offset, bool) or not isinstance(offset, int) or offset < 0
+        if limite_invalido or offset_invalido:
+            return jsonify({
+                'error': 'limite debe ser un entero positivo y offset un entero no negativo'
+            }), 400
+        if limite is not None:
+            limite = min(limite, current_app.config['COMPRAS_LIMITE_MAX'])
+        
+        # Buscar tipo de documento (caché en memoria)
+        tipo_documento_obj = tipos_documento.por_codigo(tipo_doc)
         if not tipo_documento_obj:
             return jsonify({
                 'error': f'Tipo de documento {tipo_doc} no válido'
             }), 400
         
-        # Buscar cliente
-        cliente = Cliente.query.filter_by(
-            tipo_documento_id=tipo_documento_obj.id,
-            numero_documento=numero_doc
+        # Buscar cliente junto con el total y número de compras (SUM/COUNT)
+        fila = db.session.execute(
+            consulta_cliente_con_totales(tipo_documento_obj.id, numero_doc)
         ).first()
         
-        if not cliente:
+        if not fila:
             return jsonify({
                 'error': 'Cliente no encontrado'
             }), 404
         
-        # Obtener compras del cliente
-        compras = [compra.to_dict() for compra in cliente.compras]
+        cliente = fila.Cliente
         
-        # Calcular total de compras
-        total_compras = sum(compra.monto for compra in cliente.compras)
+        # Obtener compras del cliente (página solicitada o todas)
+        compras = [
+            compra.to_dict()
+            for compra in db.session.execute(
+                consulta_compras_cliente(cliente.id, limite, offset)
+            ).scalars()
+        ]
         
         return jsonify({
             'cliente': cliente.to_dict(),
             'compras': compras,
-            'total_compras': total_compras,
-            'numero_compras': len(compras)
+            'total_compras': a_pesos(fila.total_centavos),
+            'numero_compras': fila.numero_compras,
+            'limite': limite,
+            'offset': offset
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ==================== ENDPOINT 1b: Buscar Clientes en Lote ====================
+@api.route('/api/buscar-clientes', methods=['POST'])
+def buscar_clientes():
+    """
+    Busca varios clientes en una sola petición
+    Body: {
+        "documentos": [
+            {"tipo_documento": "CC", "numero_documento": "1234567890"},
+            ...
+        ]
+    }
+    Con ?formato=ndjson (o Accept: application/x-ndjson) la respuesta se
+    envía en streaming, un resultado JSON por línea.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        documentos = data.get('documentos')
+        
+        if not isinstance(documentos, list) or not documentos:
+            return jsonify({
+                'error': 'Debe proporcionar una lista no vacía de documentos'
+            }), 400
+        
+        if len(documentos) > current_app.config['BUSQUEDA_LOTE_MAX']:
+            return jsonify({
+                'error': f"Máximo {current_app.config['BUSQUEDA_LOTE_MAX']} documentos por petición"
+            }), 400
+        
+        ndjson = (
+            request.args.get('formato') == 'ndjson'
+            or request.accept_mimetypes.best == 'application/x-ndjson'
+        )
+        
+        if ndjson:
+            def generar():
+                for resultado in buscar_clientes_lote(documentos):
+                    yield json.dumps(resultado, ensure_ascii=False) + '\n'
+            
+            return Response(stream_with_context(generar()), mimetype='application/x-ndjson')
+        
+        resultados = list(buscar_clientes_lote(documentos))
+        encontrados = sum(1 for r in resultados if r['estado'] == 200)
+        
+        return jsonify({
+            'resultados': resultados,
+            'encontrados': encontrados,
+            'errores': len(resultados) - encontrados
         }), 200
         
     except Exception as e:
@@ -74,14 +202,17 @@ def buscar_cliente():
 
 
 # ==================== ENDPOINT 2: Exportar Datos ====================
-@app.route('/api/exportar-cliente', methods=['POST'])
+@api.route('/api/exportar-cliente', methods=['POST'])
 def exportar_cliente():
     """
-    Exporta los datos de un cliente a CSV o Excel
+    Exporta los datos de un cliente a CSV, Excel, Parquet o Arrow
     Body: {
         "numero_documento": "1234567890",
-        "formato": "csv" o "excel"
+        "formato": "csv", "excel", "parquet" o "arrow",
+        "stream": true (opcional, solo CSV: una fila por compra en streaming)
     }
+    Parquet y Arrow traen las compras con columnas tipadas y los datos del
+    cliente en los metadatos del esquema (llave "cliente").
     """
     try:
         data = request.get_json()
@@ -91,64 +222,75 @@ def exportar_cliente():
         if not numero_doc:
             return jsonify({'error': 'Debe proporcionar numero_documento'}), 400
         
+        if formato in FORMATOS_COLUMNARES:
+            error = _error_formato(formato, FORMATOS_COLUMNARES)
+            if error:
+                return error
+        
         # Buscar cliente
         cliente = Cliente.query.filter_by(numero_documento=numero_doc).first()
         
         if not cliente:
             return jsonify({'error': 'Cliente no encontrado'}), 404
         
-        # Preparar datos con pandas
-        cliente_data = {
-            'Tipo Documento': [cliente.tipo_documento.descripcion],
-            'Número Documento': [cliente.numero_documento],
-            'Nombre': [cliente.nombre],
-            'Apellido': [cliente.apellido],
-            'Correo': [cliente.correo],
-            'Teléfono': [cliente.telefono],
-            'Fecha Registro': [cliente.fecha_registro.strftime('%Y-%m-%d')]
-        }
-        
-        df_cliente = pd.DataFrame(cliente_data)
-        
-        # Preparar datos de compras
-        if cliente.compras:
-            compras_data = []
-            for compra in cliente.compras:
-                compras_data.append({
-                    'Fecha': compra.fecha_compra.strftime('%Y-%m-%d'),
-                    'Monto': compra.monto,
-                    'Descripción': compra.descripcion,
-                    'Número Factura': compra.numero_factura
-                })
-            df_compras = pd.DataFrame(compras_data)
+        # CSV en streaming: sin archivo en disco
+        if formato == 'csv' and data.get('stream'):
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f'cliente_{numero_doc}_{timestamp}.csv'
+            
+            return Response(
+                stream_with_context(
+                    generar_csv_compras(cliente, tipos_documento.por_id(cliente.tipo_documento_id).descripcion)
+                ),
+                mimetype='text/csv',
+                headers={'Content-Disposition': f'attachment; filename={filename}'}
+            )
+        
+        fila_cliente = fila_datos_cliente(cliente, tipos_documento.por_id(cliente.tipo_documento_id).descripcion)
+        
+        def generar_excel(filepath):
+            # Hojas de solo escritura alimentadas por generadores
+            escribir_excel(filepath, [
+                ('Cliente', COLUMNAS_CLIENTE, [fila_cliente]),
+                ('Compras', COLUMNAS_COMPRAS, filas_compras(cliente.id))
+            ])
+            return True
+        
+        def generar_csv(filepath):
+            # Datos del cliente con sus totales (exactos en centavos, sumados en la base de datos)
+            escribir_csv_cliente(filepath, fila_cliente, totales_compras_por_cliente([cliente.id]).get(cliente.id))
+            return True
+        
+        def generar_columnar(filepath):
+            # Un record batch por bloque de compras leído
+            escribir_columnar(
+                filepath, formato, esquemas()['compras_cliente'], lotes_compras_cliente(cliente.id),
+                metadatos={'cliente': dict(zip(COLUMNAS_CLIENTE, fila_cliente))}
+            )
+            return True
+        
+        # Crear archivo según formato (o reutilizarlo si los datos no cambiaron)
+        if formato in FORMATOS_COLUMNARES:
+            extension, mimetype = FORMATOS_COLUMNARES[formato]
+            generar = generar_columnar
+        elif formato == 'excel':
+            extension, mimetype, generar = 'xlsx', None, generar_excel
         else:
-            df_compras = pd.DataFrame()
+            extension, mimetype, generar = 'csv', None, generar_csv
         
-        # Crear archivo según formato
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f'cliente_{numero_doc}_{timestamp}.{extension}'
         
-        if formato == 'excel':
-            filename = f'cliente_{numero_doc}_{timestamp}.xlsx'
-            filepath = os.path.join(app.config['EXPORT_FOLDER'], filename)
-            
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                df_cliente.to_excel(writer, sheet_name='Cliente', index=False)
-                if not df_compras.empty:
-                    df_compras.to_excel(writer, sheet_name='Compras', index=False)
-        
-        else:  # CSV
-            filename = f'cliente_{numero_doc}_{timestamp}.csv'
-            filepath = os.path.join(app.config['EXPORT_FOLDER'], filename)
-            
-            # Combinar datos
-            if not df_compras.empty:
-                df_cliente['Total Compras'] = df_compras['Monto'].sum()
-                df_cliente['Número de Compras'] = len(df_compras)
-            
-            df_cliente.to_csv(filepath, index=False, encoding='utf-8-sig')
+        filepath = cache_artefactos.obtener_o_generar(
+            'exportar-cliente',
+            {'numero_documento': numero_doc, 'formato': extension},
+            extension,
+            generar
+        )
         
         return send_file(
             filepath,
+            mimetype=mimetype,
             as_attachment=True,
             download_name=filename
         )
@@ -158,91 +300,249 @@ def exportar_cliente():
 
 
 # ==================== ENDPOINT 3: Reporte de Fidelización ====================
-@app.route('/api/reporte-fidelizacion', methods=['GET'])
+def obtener_reporte_fidelizacion(progreso=None, formato='excel'):
+    """
+    Retorna la ruta del reporte de fidelización para los datos actuales,
+    desde la caché de artefactos o generándolo. None si no hay clientes.
+    """
+    return cache_artefactos.obtener_o_generar(
+        'reporte-fidelizacion',
+        {**parametros_reporte_fidelizacion(), 'formato': formato},
+        FORMATOS_REPORTE[formato][0],
+        lambda filepath: generar_reporte_fidelizacion(filepath, progreso=progreso, formato=formato)
+    )
+
+
+@api.route('/api/reporte-fidelizacion', methods=['GET'])
+@solo_lectura
 def reporte_fidelizacion():
     """
-    Genera reporte Excel de clientes con compras > 5,000,000 COP en el último mes
+    Genera reporte de clientes con compras > 5,000,000 COP en el último mes
+    (versión síncrona; ver /api/reporte-fidelizacion/trabajos)
+    Query: ?formato=excel (default), parquet o arrow
     """
     try:
-        # Fecha de hace 30 días
-        fecha_limite = datetime.now() - timedelta(days=30)
+        formato = request.args.get('formato', 'excel').lower()
+        error = _error_formato(formato, FORMATOS_REPORTE)
+        if error:
+            return error
         
-        # Obtener todas las compras del último mes
-        compras_recientes = Compra.query.filter(
-            Compra.fecha_compra >= fecha_limite
-        ).all()
+        filepath = obtener_reporte_fidelizacion(formato=formato)
         
-        # Agrupar compras por cliente
-        clientes_compras = {}
-        for compra in compras_recientes:
-            cliente_id = compra.cliente_id
-            if cliente_id not in clientes_compras:
-                clientes_compras[cliente_id] = {
-                    'cliente': compra.cliente,
-                    'compras': [],
-                    'total': 0
-                }
-            clientes_compras[cliente_id]['compras'].append(compra)
-            clientes_compras[cliente_id]['total'] += compra.monto
-        
-        # Filtrar clientes con más de 5,000,000 COP
-        clientes_fidelizar = []
-        for cliente_id, data in clientes_compras.items():
-            if data['total'] > 5_000_000:
-                cliente = data['cliente']
-                clientes_fidelizar.append({
-                    'Tipo Documento': cliente.tipo_documento.descripcion,
-                    'Número Documento': cliente.numero_documento,
-                    'Nombre': cliente.nombre,
-                    'Apellido': cliente.apellido,
-                    'Correo': cliente.correo,
-                    'Teléfono': cliente.telefono,
-                    'Monto Total (COP)': data['total'],
-                    'Número de Compras': len(data['compras'])
-                })
-        
-        if not clientes_fidelizar:
+        if not filepath:
             return jsonify({
-                'mensaje': 'No hay clientes que superen los 5,000,000 COP en el último mes'
+                'mensaje': mensaje_sin_fidelizacion()
             }), 404
         
-        # Crear DataFrame con pandas
-        df = pd.DataFrame(clientes_fidelizar)
-        
-        # Ordenar por monto total (descendente)
-        df = df.sort_values('Monto Total (COP)', ascending=False)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        extension, mimetype = FORMATOS_REPORTE[formato]
         
-        # Formatear monto como moneda
-        df['Monto Total (COP)'] = df['Monto Total (COP)'].apply(
-            lambda x: f"${x:,.2f}"
+        return send_file(
+            filepath,
+            mimetype=mimetype,
+            as_attachment=True,
+            download_name=f'reporte_fidelizacion_{timestamp}.{extension}'
         )
         
-        # Crear archivo Excel
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ==================== Trabajos: Reporte de Fidelización asíncrono ====================
+@solo_lectura
+def _trabajo_reporte_fidelizacion(trabajo):
+    """Genera el reporte dentro de un trabajo de la cola"""
+    def progreso(escritas, total):
+        trabajo.progreso = escritas / total
+        cola_trabajos.guardar(trabajo)
+    
+    formato = trabajo.parametros.get('formato', 'excel')
+    filepath = obtener_reporte_fidelizacion(progreso=progreso, formato=formato)
+    
+    if filepath:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'reporte_fidelizacion_{timestamp}.xlsx'
-        filepath = os.path.join(app.config['EXPORT_FOLDER'], filename)
+        trabajo.filepath = filepath
+        trabajo.filename = f'reporte_fidelizacion_{timestamp}.{FORMATOS_REPORTE[formato][0]}'
+    else:
+        trabajo.mensaje = mensaje_sin_fidelizacion()
+
+
+@api.route('/api/reporte-fidelizacion/trabajos', methods=['POST'])
+def encolar_reporte_fidelizacion():
+    """
+    Encola la generación del reporte de fidelización.
+    Body (opcional): {"formato": "excel" (default), "parquet" o "arrow"}
+    Si ya hay un trabajo idéntico en curso, retorna ese mismo trabajo.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        formato = str(data.get('formato', 'excel')).lower()
+        error = _error_formato(formato, FORMATOS_REPORTE)
+        if error:
+            return error
+        
+        trabajo, nuevo = cola_trabajos.encolar(
+            'reporte-fidelizacion', {'formato': formato}, _trabajo_reporte_fidelizacion
+        )
+        return jsonify(trabajo.to_dict()), 202, {
+            'Location': f'/api/trabajos/{trabajo.id}'
+        }
+    except ColaLlena as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@api.route('/api/trabajos/<trabajo_id>', methods=['GET'])
+def estado_trabajo(trabajo_id):
+    """
+    Consulta el estado y progreso de un trabajo
+    """
+    trabajo = cola_trabajos.obtener(trabajo_id)
+    if not trabajo:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    return jsonify(trabajo.to_dict()), 200
+
+
+@api.route('/api/trabajos/<trabajo_id>/descarga', methods=['GET'])
+def descargar_trabajo(trabajo_id):
+    """
+    Descarga el archivo generado por un trabajo completado
+    """
+    trabajo = cola_trabajos.obtener(trabajo_id)
+    if not trabajo:
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    
+    if trabajo.activo:
+        return jsonify({'error': 'El trabajo aún no ha terminado'}), 409
+    
+    if trabajo.estado == Trabajo.ERROR:
+        return jsonify({'error': trabajo.error}), 500
+    
+    if not trabajo.filepath:
+        return jsonify({'mensaje': trabajo.mensaje}), 404
+    
+    # Abrir antes de responder: una vez abierto, el barrido de retención
+    # puede eliminar el archivo sin cortar la descarga
+    try:
+        archivo = open(trabajo.filepath, 'rb')
+    except FileNotFoundError:
+        return jsonify({
+            'error': 'El archivo del trabajo ya fue eliminado por retención; genere el reporte de nuevo'
+        }), 410
+    
+    return send_file(
+        archivo,
+        mimetype=FORMATOS_REPORTE[trabajo.parametros.get('formato', 'excel')][1],
+        as_attachment=True,
+        download_name=trabajo.filename
+    )
+
+
+# ==================== Ingesta masiva de Compras ====================
+@api.route('/api/compras/lote', methods=['POST'])
+def ingerir_lote_compras():
+    """
+    Registra compras en lote (p. ej. desde el POS), con upsert por numero_factura
+    Body: NDJSON (Content-Type: application/x-ndjson) o CSV con encabezado
+          (Content-Type: text/csv); también ?formato=ndjson|csv
+    Campos: numero_documento, tipo_documento (opcional), fecha_compra (ISO 8601),
+            monto (pesos) o monto_centavos, descripcion, numero_factura
+    Query: ?resultados=errores para devolver solo las filas con error
+    Retorna el estado de cada fila: creada, actualizada, sin_cambios o error.
+    """
+    try:
+        formato = request.args.get('formato') or (
+            'csv' if request.mimetype in ('text/csv', 'application/csv') else 'ndjson'
+        )
+        if formato not in ('ndjson', 'csv'):
+            return jsonify({'error': 'Formato no válido, use: ndjson, csv'}), 400
         
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Clientes a Fidelizar', index=False)
-            
-            # Ajustar ancho de columnas
-            worksheet = writer.sheets['Clientes a Fidelizar']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+        # El cuerpo se lee línea a línea mientras se aplica, sin cargarlo entero
+        lineas = io.TextIOWrapper(
+            io.BufferedReader(request.stream), encoding='utf-8', errors='replace', newline=''
+        )
+        lector = leer_csv if formato == 'csv' else leer_ndjson
+        try:
+            resultados = ingerir_compras(
+                lector(lineas),
+                current_app.config['INGESTA_FILAS_POR_TRANSACCION'],
+                current_app.config['INGESTA_MAX_FILAS']
+            )
+        except LoteDemasiadoGrande as e:
+            return jsonify({
+                'error': f'{e}; se aplicaron las primeras {e.aplicadas:,}',
+                'procesadas': e.aplicadas
+            }), 413
+        
+        if not resultados:
+            return jsonify({'error': 'El lote no contiene compras'}), 400
+        
+        conteo = {}
+        for resultado in resultados:
+            conteo[resultado['estado']] = conteo.get(resultado['estado'], 0) + 1
+        
+        solo_errores = request.args.get('resultados') == 'errores'
+        
+        return jsonify({
+            'procesadas': len(resultados),
+            **{estado: conteo.get(estado, 0) for estado in ESTADOS},
+            'resultados': [
+                {'fila': fila, **resultado}
+                for fila, resultado in enumerate(resultados, start=1)
+                if not solo_errores or resultado['estado'] == ERROR
+            ]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ==================== Exportación de Compras (analítica) ====================
+@api.route('/api/exportar-compras', methods=['GET'])
+@solo_lectura
+def exportar_compras():
+    """
+    Exporta todas las compras en formato columnar, para cargas analíticas
+    Query: ?formato=parquet (default) o arrow
+           &desde=YYYY-MM-DD&hasta=YYYY-MM-DD (opcionales; hasta es exclusivo)
+    Columnas: id, cliente_id, tipo_documento, numero_documento, fecha_compra
+    (timestamp), monto_centavos (int64), descripcion, numero_factura
+    """
+    try:
+        formato = request.args.get('formato', 'parquet').lower()
+        error = _error_formato(formato, FORMATOS_COLUMNARES)
+        if error:
+            return error
+        
+        try:
+            desde, hasta = (
+                datetime.strptime(request.args[nombre], '%Y-%m-%d') if request.args.get(nombre) else None
+                for nombre in ('desde', 'hasta')
+            )
+        except ValueError:
+            return jsonify({'error': 'desde y hasta deben tener formato YYYY-MM-DD'}), 400
+        
+        def generar(filepath):
+            # Un record batch por bloque leído: la memoria no crece con el número de compras
+            escribir_columnar(filepath, formato, esquemas()['compras'], lotes_compras(desde, hasta))
+            return True
+        
+        extension, mimetype = FORMATOS_COLUMNARES[formato]
+        filepath = cache_artefactos.obtener_o_generar(
+            'exportar-compras',
+            {'formato': formato, 'desde': desde, 'hasta': hasta},
+            extension,
+            generar
+        )
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         return send_file(
             filepath,
+            mimetype=mimetype,
             as_attachment=True,
-            download_name=filename
+            download_name=f'compras_{timestamp}.{extension}'
         )
         
     except Exception as e:
@@ -250,70 +550,311 @@ def reporte_fidelizacion():
 
 
 # ==================== ENDPOINT 4: Obtener Tipos de Documento ====================
-@app.route('/api/tipos-documento', methods=['GET'])
+@api.route('/api/tipos-documento', methods=['GET'])
+@solo_lectura
 def obtener_tipos_documento():
     """
     Obtiene la lista de tipos de documento disponibles
+    (desde la caché en memoria, con ETag y Cache-Control)
     """
     try:
-        tipos = TipoDocumento.query.all()
-        return jsonify({
-            'tipos_documento': [
-                {'codigo': tipo.codigo, 'descripcion': tipo.descripcion}
-                for tipo in tipos
-            ]
-        }), 200
+        tipos, etag = tipos_documento.lista()
+        
+        response = jsonify({'tipos_documento': tipos})
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config['CACHE_TIPOS_DOCUMENTO_TTL']
+        
+        # Responde 304 si el cliente ya tiene esta versión
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 
 # ==================== ENDPOINT 5: Listar Todos los Clientes ====================
-@app.route('/api/listar-clientes', methods=['GET'])
+@api.route('/api/listar-clientes', methods=['GET'])
+@solo_lectura
+@condicional(por_dia=True)
 def listar_clientes():
     """
-    Lista todos los clientes registrados
+    Lista los clientes registrados, ordenados por total del último mes,
+    con paginación por cursor
+    Query: ?limite=50&cursor=<next_cursor de la página anterior>
+    """
+    try:
+        limite = request.args.get('limite', current_app.config['LISTAR_CLIENTES_LIMITE'], type=int)
+        limite = max(1, min(limite, current_app.config['LISTAR_CLIENTES_LIMITE_MAX']))
+        
+        cursor = request.args.get('cursor')
+        despues_de = None
+        if cursor:
+            try:
+                despues_de = decodificar_cursor(cursor)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        fecha_limite = datetime.now() - timedelta(days=current_app.config['DIAS_VENTANA_FIDELIZACION'])
+        umbral_centavos = a_centavos(current_app.config['UMBRAL_FIDELIZACION'])
+        
+        # Pedir una fila extra para saber si hay más páginas
+        filas = db.session.execute(
+            consulta_clientes_por_total(fecha_limite, limite + 1, despues_de)
+        ).all()
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+        
+        lista = [
+            {
+                'tipo_documento': fila.tipo_documento,
+                'codigo_tipo': fila.codigo_tipo,
+                'numero_documento': fila.numero_documento,
+                'nombre_completo': f"{fila.nombre} {fila.apellido}",
+                'correo': fila.correo,
+                'telefono': fila.telefono,
+                'total_ultimo_mes': a_pesos(fila.total_centavos),
+                'califica_fidelizacion': fila.total_centavos > umbral_centavos
+            }
+            for fila in filas
+        ]
+        
+        next_cursor = None
+        if hay_mas:
+            ultima = filas[-1]
+            next_cursor = codificar_cursor(ultima.total_centavos, ultima.id)
+        
+        return jsonify({
+            'total': db.session.scalar(select(func.count(Cliente.id))),
+            'clientes': lista,
+            'next_cursor': next_cursor
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# ==================== Búsqueda de Clientes por Texto ====================
+@api.route('/api/clientes/busqueda', methods=['GET'])
+@solo_lectura
+@condicional()
+def busqueda_clientes():
+    """
+    Busca clientes por nombre, apellido, correo o teléfono (índice FTS5).
+    Cada palabra se busca como prefijo, así sirve para búsqueda incremental;
+    los resultados vienen ordenados por relevancia.
+    Query: ?q=juan per&limite=10
+    """
+    try:
+        texto = request.args.get('q', '').strip()
+        limite = request.args.get('limite', current_app.config['BUSQUEDA_CLIENTES_LIMITE'], type=int)
+        limite = max(1, min(limite, current_app.config['BUSQUEDA_CLIENTES_LIMITE_MAX']))
+        
+        minimo = current_app.config['BUSQUEDA_MIN_CARACTERES']
+        if sum(caracter.isalnum() for caracter in texto) < minimo:
+            return jsonify({
+                'error': f'La búsqueda debe tener al menos {minimo} letras o números'
+            }), 400
+        
+        filas = db.session.execute(
+            consulta_busqueda_clientes(
+                texto, limite,
+                current_app.config['BUSQUEDA_MAX_TERMINOS'],
+                current_app.config['BUSQUEDA_MAX_CANDIDATOS']
+            )
+        ).all()
+        
+        return jsonify({
+            'q': texto,
+            'clientes': [
+                {
+                    'tipo_documento': fila.tipo_documento,
+                    'codigo_tipo': fila.codigo_tipo,
+                    'numero_documento': fila.numero_documento,
+                    'nombre_completo': f"{fila.nombre} {fila.apellido}",
+                    'correo': fila.correo,
+                    'telefono': fila.telefono
+                }
+                for fila in filas
+            ],
+            'limite': limite
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# ==================== Segmentación por ventanas y niveles ====================
+def _ventanas_parametro():
+    """Ventanas pedidas en ?ventanas=7,30 (None = todas las configuradas)"""
+    valor = request.args.get('ventanas')
+    if not valor:
+        return None
+    try:
+        return sorted({int(dias) for dias in valor.split(',')})
+    except ValueError:
+        raise ValueError('ventanas debe ser una lista de días separada por comas, p. ej. 7,30,90')
+
+
+@api.route('/api/segmentacion/resumen', methods=['GET'])
+@solo_lectura
+@condicional(por_dia=True)
+def resumen_segmentacion():
+    """
+    Número de clientes y total de compras por ventana y nivel
+    Query: ?ventanas=7,30,90 (opcional, default: todas las configuradas)
     """
     try:
-        clientes = Cliente.query.all()
-        lista = []
+        try:
+            segmentacion = Segmentacion.desde_config(current_app.config, _ventanas_parametro())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        resumen = segmentacion.resumen()
         
-        fecha_limite = datetime.now() - timedelta(days=30)
+        return jsonify({
+            'ventanas': [
+                {
+                    'dias': dias,
+                    'desde': segmentacion.limite(dias).isoformat(),
+                    'niveles': [
+                        {
+                            'nivel': nivel,
+                            'umbral': umbral,
+                            'clientes': resumen[dias][nivel]['clientes'],
+                            'total_compras': a_pesos(resumen[dias][nivel]['total_centavos'])
+                        }
+                        for nivel, umbral in segmentacion.niveles[dias]
+                    ]
+                }
+                for dias in segmentacion.ventanas
+            ]
+        }), 200
         
-        for cliente in clientes:
-            # Calcular compras del último mes
-            compras_recientes = [c for c in cliente.compras if c.fecha_compra >= fecha_limite]
-            total_reciente = sum(c.monto for c in compras_recientes)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@api.route('/api/segmentacion', methods=['GET'])
+@solo_lectura
+@condicional(por_dia=True)
+def listar_segmento():
+    """
+    Lista los clientes de una ventana (y opcionalmente de un nivel), ordenados
+    por su total en esa ventana, con paginación por cursor
+    Query: ?ventana=30&nivel=oro&ventanas=7,30,90&limite=50&cursor=<next_cursor>
+    Cada cliente trae total, número de compras y nivel de todas las ventanas pedidas.
+    """
+    try:
+        limite = request.args.get('limite', current_app.config['SEGMENTACION_LIMITE'], type=int)
+        limite = max(1, min(limite, current_app.config['SEGMENTACION_LIMITE_MAX']))
+        nivel = request.args.get('nivel') or None
+        
+        try:
+            dias = request.args.get('ventana', current_app.config['DIAS_VENTANA_FIDELIZACION'], type=int)
+            ventanas = _ventanas_parametro()
+            if ventanas is not None and dias not in ventanas:
+                ventanas.append(dias)
+            segmentacion = Segmentacion.desde_config(current_app.config, ventanas)
+            
+            cursor = request.args.get('cursor')
+            despues_de = decodificar_cursor(cursor) if cursor else None
             
-            lista.append({
-                'tipo_documento': cliente.tipo_documento.descripcion,
-                'codigo_tipo': cliente.tipo_documento.codigo,
-                'numero_documento': cliente.numero_documento,
-                'nombre_completo': f"{cliente.nombre} {cliente.apellido}",
-                'correo': cliente.correo,
-                'telefono': cliente.telefono,
-                'total_ultimo_mes': total_reciente,
-                'califica_fidelizacion': total_reciente > 5_000_000
-            })
-        
-        # Ordenar por total del último mes (descendente)
-        lista.sort(key=lambda x: x['total_ultimo_mes'], reverse=True)
+            # Pedir una fila extra para saber si hay más páginas
+            filas = db.session.execute(
+                segmentacion.consulta_clientes(dias, nivel, limite + 1, despues_de)
+            ).all()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        hay_mas = len(filas) > limite
+        filas = filas[:limite]
+        
+        lista = [
+            {
+                'tipo_documento': fila.tipo_documento,
+                'codigo_tipo': fila.codigo_tipo,
+                'numero_documento': fila.numero_documento,
+                'nombre_completo': f"{fila.nombre} {fila.apellido}",
+                'correo': fila.correo,
+                'telefono': fila.telefono,
+                'ventanas': {
+                    str(v): {
+                        'total': a_pesos(fila._mapping[f'total_{v}']),
+                        'compras': fila._mapping[f'compras_{v}'],
+                        'nivel': fila._mapping[f'nivel_{v}']
+                    }
+                    for v in segmentacion.ventanas
+                }
+            }
+            for fila in filas
+        ]
+        
+        next_cursor = None
+        if hay_mas:
+            ultima = filas[-1]
+            next_cursor = codificar_cursor(ultima._mapping[f'total_{dias}'], ultima.id)
         
         return jsonify({
-            'total': len(lista),
-            'clientes': lista
+            'ventana': dias,
+            'nivel': nivel,
+            'clientes': lista,
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+
+# ==================== Métricas ====================
+@api.route('/metrics', methods=['GET'])
+def metricas():
+    """
+    Métricas en formato de texto de Prometheus (de todos los workers si
+    METRICAS_FOLDER está configurado)
+    """
+    return registro.exponer(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+# ==================== FÁBRICA DE LA APLICACIÓN ====================
+def create_app(config=Config):
+    """
+    Crea y configura la aplicación Flask
+    """
+    app = Flask(__name__)
+    app.config.from_object(config)
+    if app.config['JSON_RAPIDO'] and orjson_disponible():
+        app.json = ProveedorJSONRapido(app)
+    
+    # Inicializar extensiones
+    conexiones.preparar_config(app)
+    db.init_app(app)
+    conexiones.init_app(app)
+    CORS(app)
+    cola_trabajos.init_app(app)
+    cache_artefactos.init_app(app)
+    retencion.init_app(app)
+    registro.init_app(app)
+    instrumentacion.init_app(app)
+    compresion.init_app(app)
+    tipos_documento.ttl = app.config['CACHE_TIPOS_DOCUMENTO_TTL']
+    
+    # Inicializar carpeta de exportaciones
+    config.init_app(app)
+    
+    app.register_blueprint(api)
+    return app
+
+
 # ==================== FUNCIÓN: Inicializar Base de Datos ====================
-def init_database():
+def init_database(app):
     """
     Inicializa la base de datos y crea las tablas
     """
     with app.app_context():
-        db.create_all()
+        # Crear tablas y aplicar migraciones pendientes del esquema
+        for version, descripcion in preparar_esquema():
+            print(f"✅ Migración {version} aplicada: {descripcion}")
         
         # Insertar tipos de documento si no existen
         if TipoDocumento.query.count() == 0:
@@ -326,10 +867,15 @@ def init_database():
             db.session.commit()
             print("✅ Tipos de documento creados")
         
+        # Precargar la caché de tipos de documento
+        tipos_documento.cargar()
+        
         print("✅ Base de datos inicializada correctamente")
 
 
 # ==================== MAIN ====================
+# Servidor de desarrollo; en producción usar servidor.py (gunicorn)
 if __name__ == '__main__':
-    init_database()
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app = create_app()
+    init_database(app)
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,86 @@
+# backend/busqueda.py
+import re
+from sqlalchemy import select, table, column
+from models import db, TipoDocumento, Cliente, TABLA_BUSQUEDA_CLIENTE, TRIGGERS_BUSQUEDA
+
+# Tabla FTS5 de contenido externo sobre cliente (ver models.TABLA_BUSQUEDA_CLIENTE);
+# la columna oculta con el nombre de la tabla es la que recibe el MATCH
+cliente_busqueda = table(
+    'cliente_busqueda', column('rowid'), column('rank'), column('cliente_busqueda')
+)
+
+
+def expresion_fts(texto, max_terminos=8):
+    """
+    Convierte el texto escrito por el usuario en una expresión FTS5 de
+    búsqueda incremental: cada palabra es una frase entre comillas con
+    prefijo ("juan"* "pe"*), todas obligatorias. Las comillas evitan que
+    la sintaxis de FTS5 (OR, NEAR, -, :) llegue desde la petición; FTS5
+    parte cada frase con el mismo tokenizador del índice, así un correo
+    como juan.perez@ se busca como frase. Retorna None si no hay términos.
+    """
+    palabras = [palabra for palabra in texto.split() if re.search(r'\w', palabra)][:max_terminos]
+    if not palabras:
+        return None
+    return ' '.join('"{}"*'.format(palabra.replace('"', '""')) for palabra in palabras)
+
+
+def consulta_busqueda_clientes(texto, limite, max_terminos=8, max_candidatos=1000):
+    """
+    Construye la consulta de clientes que coinciden con el texto en nombre,
+    apellido, correo o teléfono, ordenados por relevancia (bm25) y limitados.
+
+    El índice entrega las coincidencias en orden de rowid y se detiene tras
+    max_candidatos; solo esas se puntúan y ordenan. Así un prefijo muy común
+    ("ma") no obliga a calcular bm25 sobre cientos de miles de clientes: el
+    orden es exacto mientras haya hasta max_candidatos coincidencias y, por
+    encima, se ordenan las primeras que encuentra el índice. Solo las filas
+    del límite se unen con cliente y tipo_documento.
+    """
+    expresion = expresion_fts(texto, max_terminos)
+    if expresion is None:
+        raise ValueError('La búsqueda debe contener al menos una letra o número')
+
+    candidatos = (
+        select(cliente_busqueda.c.rowid, cliente_busqueda.c.rank)
+        .where(cliente_busqueda.c.cliente_busqueda.op('MATCH')(expresion))
+        .limit(max_candidatos)
+        .subquery()
+    )
+    coincidencias = (
+        select(candidatos.c.rowid.label('cliente_id'), candidatos.c.rank.label('rango'))
+        .order_by(candidatos.c.rank, candidatos.c.rowid)
+        .limit(limite)
+        .subquery()
+    )
+
+    return (
+        select(
+            Cliente.id,
+            TipoDocumento.descripcion.label('tipo_documento'),
+            TipoDocumento.codigo.label('codigo_tipo'),
+            Cliente.numero_documento,
+            Cliente.nombre,
+            Cliente.apellido,
+            Cliente.correo,
+            Cliente.telefono,
+            coincidencias.c.rango
+        )
+        .join(Cliente, Cliente.id == coincidencias.c.cliente_id)
+        .join(TipoDocumento, TipoDocumento.id == Cliente.tipo_documento_id)
+        .order_by(coincidencias.c.rango, Cliente.id)
+    )
+
+
+def reconstruir_busqueda():
+    """
+    Crea (si no existen) el índice de búsqueda y sus triggers y lo reconstruye
+    completo desde la tabla cliente. Necesario tras cargas masivas hechas
+    con los triggers desactivados.
+    """
+    with db.engine.connect() as conn:
+        for sentencia in TABLA_BUSQUEDA_CLIENTE + TRIGGERS_BUSQUEDA:
+            conn.exec_driver_sql(sentencia)
+        conn.exec_driver_sql("INSERT INTO cliente_busqueda (cliente_busqueda) VALUES ('rebuild')")
+        conn.exec_driver_sql("INSERT INTO cliente_busqueda (cliente_busqueda) VALUES ('optimize')")
+        conn.commit()
\ No newline at end of file
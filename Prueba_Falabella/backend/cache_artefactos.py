@@ -0,0 +1,79 @@
+# backend/cache_artefactos.py
+import hashlib
+import json
+import os
+import uuid
+from models import VersionDatos
+from metricas import registro
+from retencion import retencion
+
+aciertos = registro.contador(
+    'cache_artefactos_aciertos_total', 'Artefactos servidos desde la caché', ('endpoint',)
+)
+fallos = registro.contador(
+    'cache_artefactos_fallos_total', 'Artefactos generados por no estar en la caché', ('endpoint',)
+)
+
+
+class CacheArtefactos:
+    """
+    Caché de archivos generados (exportaciones y reportes) en EXPORT_FOLDER.
+    La llave es un hash de (endpoint, parámetros, versión de datos): cuando
+    cambian clientes, compras o tipos de documento la versión avanza y la llave deja de coincidir.
+    Cada acierto actualiza el mtime del archivo; con esa fecha de último uso
+    retencion.py desaloja por edad, cantidad y tamaño total.
+    Con CACHE_ARTEFACTOS desactivado cada llamada genera un archivo nuevo.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.carpeta = app.config['EXPORT_FOLDER']
+        self.activa = app.config['CACHE_ARTEFACTOS']
+
+    @staticmethod
+    def llave(endpoint, parametros, version):
+        crudo = json.dumps([endpoint, parametros, version], sort_keys=True, default=str)
+        return hashlib.sha256(crudo.encode('utf-8')).hexdigest()
+
+    def obtener_o_generar(self, endpoint, parametros, extension, generar):
+        """
+        Retorna la ruta del artefacto para (endpoint, parametros) en la
+        versión de datos actual, generándolo con generar(filepath) si no
+        está en caché. generar debe retornar un valor falso si no hay
+        nada que escribir; en ese caso se retorna None.
+        """
+        llave = self.llave(endpoint, parametros, VersionDatos.actual())
+        if not self.activa:
+            # Llave única: nunca coincide con un artefacto anterior
+            llave = f'{llave}-{uuid.uuid4().hex}'
+        filepath = os.path.join(self.carpeta, f'{llave}.{extension}')
+
+        try:
+            # Marcar como usado recientemente (LRU por mtime); si el barrido
+            # de retención ya lo eliminó, se genera de nuevo
+            os.utime(filepath)
+            aciertos.inc(endpoint=endpoint)
+            return filepath
+        except FileNotFoundError:
+            pass
+
+        fallos.inc(endpoint=endpoint)
+
+        # Generar en un temporal y publicar con un rename atómico
+        temporal = os.path.join(self.carpeta, f'.{llave}.{uuid.uuid4().hex}.tmp')
+        try:
+            if not generar(temporal):
+                return None
+            os.replace(temporal, filepath)
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+
+        retencion.registrar(filepath)
+        return filepath
+
+
+cache_artefactos = CacheArtefactos()
\ No newline at end of file
@@ -0,0 +1,128 @@
+# backend/columnar.py
+# Exportaciones columnares (Parquet y Arrow IPC) para consumo analítico.
+# Las filas se leen por bloques (yield_per) y cada bloque se escribe como un
+# record batch; las fechas van como timestamp y los montos en centavos (int64).
+# pyarrow se importa en el primer uso (ver disponible()).
+import functools
+import importlib.util
+import json
+from sqlalchemy import select
+from models import db, Cliente, Compra, TipoDocumento
+
+# formato: (extensión, tipo MIME)
+FORMATOS_COLUMNARES = {
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file'),
+}
+
+# Filas por record batch (y por row group en Parquet)
+TAMANO_LOTE = 65_536
+
+# Compresión de Parquet; Arrow IPC va sin comprimir para poder mapearlo en memoria
+COMPRESION_PARQUET = 'zstd'
+
+
+def disponible():
+    """True si pyarrow está instalado"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+@functools.cache
+def esquemas():
+    """Esquemas Arrow de cada exportación"""
+    import pyarrow as pa
+
+    def monto(nombre):
+        return pa.field(nombre, pa.int64(), metadata={'unidad': 'centavos COP'})
+
+    return {
+        'compras': pa.schema([
+            pa.field('id', pa.int64(), nullable=False),
+            pa.field('cliente_id', pa.int64(), nullable=False),
+            pa.field('tipo_documento', pa.string()),
+            pa.field('numero_documento', pa.string()),
+            pa.field('fecha_compra', pa.timestamp('us'), nullable=False),
+            monto('monto_centavos'),
+            pa.field('descripcion', pa.string()),
+            pa.field('numero_factura', pa.string()),
+        ]),
+        'compras_cliente': pa.schema([
+            pa.field('id', pa.int64(), nullable=False),
+            pa.field('fecha_compra', pa.timestamp('us'), nullable=False),
+            monto('monto_centavos'),
+            pa.field('descripcion', pa.string()),
+            pa.field('numero_factura', pa.string()),
+        ]),
+        'fidelizacion': pa.schema([
+            pa.field('tipo_documento', pa.string()),
+            pa.field('numero_documento', pa.string()),
+            pa.field('nombre', pa.string()),
+            pa.field('apellido', pa.string()),
+            pa.field('correo', pa.string()),
+            pa.field('telefono', pa.string()),
+            monto('monto_total_centavos'),
+            pa.field('numero_compras', pa.int64()),
+        ]),
+    }
+
+
+def escribir_columnar(filepath, formato, esquema, lotes, metadatos=None):
+    """
+    Escribe lotes de filas (iterable de listas de tuplas, en el orden del
+    esquema) como record batches en Parquet o Arrow IPC (formato de archivo).
+    metadatos: dict opcional que se guarda en el esquema (valores en JSON).
+    Retorna el número de filas escritas.
+    """
+    import pyarrow as pa
+
+    if metadatos:
+        esquema = esquema.with_metadata({
+            clave: json.dumps(valor, ensure_ascii=False, default=str) for clave, valor in metadatos.items()
+        })
+
+    if formato == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(filepath, esquema, compression=COMPRESION_PARQUET)
+    else:
+        writer = pa.ipc.new_file(filepath, esquema)
+
+    filas = 0
+    with writer:
+        for lote in lotes:
+            columnas = zip(*lote)
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(valores, type=campo.type) for valores, campo in zip(columnas, esquema)],
+                schema=esquema
+            ))
+            filas += len(lote)
+    return filas
+
+
+def lotes_compras(desde=None, hasta=None, tamano_lote=TAMANO_LOTE):
+    """Todas las compras (opcionalmente en [desde, hasta)) con el documento del cliente, por bloques"""
+    consulta = (
+        select(
+            Compra.id, Compra.cliente_id, TipoDocumento.codigo, Cliente.numero_documento,
+            Compra.fecha_compra, Compra.monto_centavos, Compra.descripcion, Compra.numero_factura
+        )
+        .join(Cliente, Cliente.id == Compra.cliente_id)
+        .join(TipoDocumento, TipoDocumento.id == Cliente.tipo_documento_id)
+        .order_by(Compra.id)
+        .execution_options(yield_per=tamano_lote)
+    )
+    if desde is not None:
+        consulta = consulta.where(Compra.fecha_compra >= desde)
+    if hasta is not None:
+        consulta = consulta.where(Compra.fecha_compra < hasta)
+    return db.session.execute(consulta).partitions()
+
+
+def lotes_compras_cliente(cliente_id, tamano_lote=TAMANO_LOTE):
+    """Compras de un cliente ordenadas por fecha, por bloques"""
+    consulta = (
+        select(Compra.id, Compra.fecha_compra, Compra.monto_centavos, Compra.descripcion, Compra.numero_factura)
+        .where(Compra.cliente_id == cliente_id)
+        .order_by(Compra.fecha_compra, Compra.id)
+        .execution_options(yield_per=tamano_lote)
+    )
+    return db.session.execute(consulta).partitions()
\ No newline at end of file
@@ -0,0 +1,122 @@
+# backend/conexiones.py
+import functools
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, make_url
+
+
+def _aplicar_pragmas(pragmas):
+    """Listener 'connect' que aplica los PRAGMAs a cada conexión nueva del pool"""
+    def conectar(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nombre, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nombre} = {valor}')
+        cursor.close()
+    return conectar
+
+
+# Opciones de SQLALCHEMY_ENGINE_OPTIONS que solo acepta un pool con cola (QueuePool)
+OPCIONES_POOL = ('pool_size', 'max_overflow', 'pool_timeout')
+
+
+def sqlite_en_memoria(url):
+    """True si la URL es una base SQLite en memoria (sqlite://, :memory: o mode=memory)"""
+    return url.get_backend_name() == 'sqlite' and (
+        url.database in (None, '', ':memory:')
+        or url.database.startswith('file::memory:')
+        or url.query.get('mode') == 'memory'
+    )
+
+
+def url_solo_lectura(url):
+    """URL de SQLite en modo solo lectura (file:ruta?mode=ro&uri=true)"""
+    return url.set(database=f'file:{url.database}', query={**url.query, 'mode': 'ro', 'uri': 'true'})
+
+
+class SesionEnrutada(Session):
+    """
+    Sesión de db.session que envía las consultas al motor de solo lectura
+    cuando la vista o el trabajo en curso se marcó con @solo_lectura
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context() and g.get('solo_lectura'):
+            motor = current_app.extensions.get('motor_lectura')
+            if motor is not None:
+                return motor
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+def solo_lectura(funcion):
+    """Ejecuta la función con las consultas de db.session en la conexión de solo lectura"""
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        g.solo_lectura = True
+        return funcion(*args, **kwargs)
+    return envoltura
+
+
+class Conexiones:
+    """
+    Ajustes de SQLite para producción. A cada conexión se le aplican los
+    PRAGMAs de SQLITE_PRAGMAS (WAL, synchronous, cache, mmap, busy_timeout).
+    Con DB_SOLO_LECTURA se crea además un motor de solo lectura sobre el
+    mismo archivo para las vistas marcadas con @solo_lectura. Con WAL,
+    esos lectores no bloquean al escritor ni son bloqueados por él.
+    Debe llamarse después de db.init_app(app).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    @staticmethod
+    def preparar_config(app):
+        """
+        Quita las opciones de pool de SQLALCHEMY_ENGINE_OPTIONS cuando la base
+        es SQLite en memoria: Flask-SQLAlchemy usa ahí un StaticPool (una sola
+        conexión compartida), que no acepta pool_size ni max_overflow.
+        Debe llamarse antes de db.init_app(app).
+        """
+        if sqlite_en_memoria(make_url(app.config['SQLALCHEMY_DATABASE_URI'])):
+            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+                nombre: valor for nombre, valor in app.config['SQLALCHEMY_ENGINE_OPTIONS'].items()
+                if nombre not in OPCIONES_POOL
+            }
+
+    def init_app(self, app):
+        with app.app_context():
+            motor = app.extensions['sqlalchemy'].engine
+
+        url = motor.url
+        if motor.dialect.name != 'sqlite' or sqlite_en_memoria(url):
+            return
+
+        pragmas = dict(app.config['SQLITE_PRAGMAS'])
+        event.listen(motor, 'connect', _aplicar_pragmas(pragmas))
+
+        if app.config['DB_SOLO_LECTURA'] and not url.query.get('uri'):
+            # journal_mode es del archivo (lo fija el motor principal); query_only por seguridad
+            pragmas_lectura = {nombre: valor for nombre, valor in pragmas.items() if nombre != 'journal_mode'}
+            pragmas_lectura['query_only'] = 1
+
+            lectura = create_engine(url_solo_lectura(url), **app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+            event.listen(lectura, 'connect', _aplicar_pragmas(pragmas_lectura))
+            app.extensions['motor_lectura'] = lectura
+
+    @staticmethod
+    def desechar(app):
+        """
+        Descarta las conexiones heredadas de los pools (principal y de solo
+        lectura) sin cerrarlas: tras un fork, el proceso hijo debe abrir las
+        suyas y no tocar las del proceso padre
+        """
+        with app.app_context():
+            motores = list(app.extensions['sqlalchemy'].engines.values())
+        if 'motor_lectura' in app.extensions:
+            motores.append(app.extensions['motor_lectura'])
+        for motor in motores:
+            motor.dispose(close=False)
+
+
+conexiones = Conexiones()
\ No newline at end of file
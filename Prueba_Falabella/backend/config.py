@@ -3,9 +3,30 @@ import os
 
 class Config:
     # Configuración de la base de datos SQLite
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///database.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///database.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Pool de conexiones (Flask-SQLAlchemy lo aplica al crear el engine; con
+    # SQLite en memoria se omite, ver Conexiones.preparar_config)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': 30,
+    }
+    
+    # PRAGMAs de SQLite aplicados a cada conexión nueva
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),  # lectores y escritor concurrentes
+        'synchronous': 'NORMAL',           # seguro con WAL, sin fsync por transacción
+        'cache_size': -64_000,             # en KB (64 MB por conexión)
+        'mmap_size': 256 * 1024 * 1024,
+        'busy_timeout': 5000,              # ms esperando un bloqueo antes de "database is locked"
+        'temp_store': 'MEMORY',
+    }
+    
+    # Conexión de solo lectura para las vistas que no escriben (@solo_lectura)
+    DB_SOLO_LECTURA = os.environ.get('DB_SOLO_LECTURA', '1') == '1'
+    
     # Configuración de la aplicación
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-falabella-2024'
     
@@ -13,9 +34,94 @@ class Config:
     CORS_HEADERS = 'Content-Type'
     
     # Configuración de archivos de exportación
-    EXPORT_FOLDER = os.path.join(os.path.dirname(__file__), 'exports')
+    EXPORT_FOLDER = os.environ.get('EXPORT_FOLDER') or os.path.join(os.path.dirname(__file__), 'exports')
+    
+    # Reglas de fidelización
+    UMBRAL_FIDELIZACION = 5_000_000  # COP
+    DIAS_VENTANA_FIDELIZACION = 30
+    
+    # Segmentación: por ventana en días, niveles [(nombre, umbral en COP)] de menor a mayor.
+    # El cliente queda en el nivel más alto cuyo umbral supera su total en la ventana.
+    SEGMENTACION_NIVELES = {
+        7: [('bronce', 250_000), ('plata', 600_000), ('oro', 1_200_000)],
+        30: [('bronce', 1_000_000), ('plata', 2_500_000), ('oro', UMBRAL_FIDELIZACION)],
+        90: [('bronce', 3_000_000), ('plata', 7_500_000), ('oro', 15_000_000)],
+    }
+    
+    # Paginación de /api/segmentacion
+    SEGMENTACION_LIMITE = 50
+    SEGMENTACION_LIMITE_MAX = 500
+    
+    # Paginación de /api/listar-clientes
+    LISTAR_CLIENTES_LIMITE = 50
+    LISTAR_CLIENTES_LIMITE_MAX = 500
+    
+    # Máximo de compras por página en /api/buscar-cliente
+    COMPRAS_LIMITE_MAX = 1000
+    
+    # Máximo de documentos por petición en /api/buscar-clientes
+    BUSQUEDA_LOTE_MAX = 10_000
+    
+    # Búsqueda de texto completo en /api/clientes/busqueda
+    BUSQUEDA_CLIENTES_LIMITE = 10
+    BUSQUEDA_CLIENTES_LIMITE_MAX = 100
+    BUSQUEDA_MIN_CARACTERES = 2  # letras o números, sin contar espacios ni signos
+    BUSQUEDA_MAX_TERMINOS = 8
+    BUSQUEDA_MAX_CANDIDATOS = 1_000  # coincidencias que se puntúan con bm25
+    
+    # Ingesta masiva de compras (/api/compras/lote)
+    INGESTA_MAX_FILAS = 200_000
+    INGESTA_FILAS_POR_TRANSACCION = 20_000  # menos commits (y checkpoints del WAL) por lote
+    
+    # Cola de trabajos en segundo plano (reportes)
+    TRABAJOS_MAX_WORKERS = 2
+    TRABAJOS_MAX_PENDIENTES = 20
+    TRABAJOS_RETENCION_SEGUNDOS = 3600
+    # Latido del proceso dueño de cada trabajo activo; sin latido por más de
+    # TRABAJOS_LATIDO_MAX_SEGUNDOS (o con el dueño muerto) el trabajo pasa a error
+    TRABAJOS_LATIDO_SEGUNDOS = 5
+    TRABAJOS_LATIDO_MAX_SEGUNDOS = 30
+    TRABAJOS_FOLDER = os.path.join(EXPORT_FOLDER, 'trabajos')
+    
+    # Caché de exportaciones y reportes generados (cache_artefactos.py);
+    # CACHE_ARTEFACTOS=0 genera siempre (p. ej. para medir la generación)
+    CACHE_ARTEFACTOS = os.environ.get('CACHE_ARTEFACTOS', '1') == '1'
+    
+    # Retención de EXPORT_FOLDER (retencion.py): se eliminan los archivos menos
+    # usados al superar la edad, la cantidad o el tamaño total máximos
+    RETENCION_MAX_EDAD_SEGUNDOS = int(os.environ.get('RETENCION_MAX_EDAD_SEGUNDOS', 24 * 3600))
+    RETENCION_MAX_BYTES = int(os.environ.get('RETENCION_MAX_BYTES', 500 * 1024 * 1024))
+    RETENCION_MAX_ARCHIVOS = int(os.environ.get('RETENCION_MAX_ARCHIVOS', 2_000))
+    # Los archivos usados hace menos de esto no se eliminan (descargas por empezar)
+    RETENCION_GRACIA_SEGUNDOS = 300
+    # Barrido en segundo plano en cada proceso (0 = solo al superar los límites o por CLI)
+    RETENCION_INTERVALO_SEGUNDOS = int(os.environ.get('RETENCION_INTERVALO_SEGUNDOS', 600))
+    
+    # Caché en memoria de tipos de documento y de /api/tipos-documento
+    CACHE_TIPOS_DOCUMENTO_TTL = 300
+    
+    # Importar openpyxl/pyarrow al arrancar cada worker en lugar de en la
+    # primera exportación (por defecto se cargan en el primer uso)
+    PRECARGAR_EXPORTACION = os.environ.get('PRECARGAR_EXPORTACION') == '1'
+    
+    # Respuestas JSON: serializar con orjson (si está instalado) y comprimir con
+    # brotli (si está instalado) o gzip las de al menos COMPRESION_MIN_BYTES
+    JSON_RAPIDO = os.environ.get('JSON_RAPIDO', '1') == '1'
+    COMPRESION = os.environ.get('COMPRESION', '1') == '1'
+    COMPRESION_MIN_BYTES = 1024
+    COMPRESION_NIVEL_GZIP = 6
+    COMPRESION_CALIDAD_BROTLI = 4
+    
+    # Instrumentación por petición (Server-Timing, log JSON e histogramas en /metrics)
+    INSTRUMENTACION = os.environ.get('INSTRUMENTACION') == '1'
+    
+    # Carpeta compartida donde cada proceso vuelca sus métricas para que /metrics
+    # las combine (gunicorn.conf.py la define para los workers); sin carpeta,
+    # /metrics expone solo las del proceso que atiende
+    METRICAS_FOLDER = os.environ.get('METRICAS_FOLDER') or None
+    METRICAS_INTERVALO_SEGUNDOS = 5
     
     @staticmethod
     def init_app(app):
         # Crear carpeta de exportaciones si no existe
-        os.makedirs(Config.EXPORT_FOLDER, exist_ok=True)
\ No newline at end of file
+        os.makedirs(app.config['EXPORT_FOLDER'], exist_ok=True)
\ No newline at end of file
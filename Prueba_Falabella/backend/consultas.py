@@ -0,0 +1,255 @@
+# backend/consultas.py
+import base64
+import json
+from sqlalchemy import select, func, or_, and_
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import UnaryExpression
+from models import db, TipoDocumento, Cliente, Compra, ResumenCompraDiaria, tipos_documento
+from dinero import a_centavos, a_pesos
+
+# Máximo de valores por lista IN en una consulta
+TAMANO_LOTE_IN = 500
+
+
+def agrupar_sin_indice(columna):
+    """
+    Expresión de GROUP BY con el operador unario + de SQLite sobre la columna.
+    Con GROUP BY cliente_id el planificador prefiere recorrer (SCAN) el índice
+    que empieza por cliente_id para no ordenar, aunque la ventana sea un rango
+    de fechas; con +cliente_id ese índice deja de servir para agrupar y usa
+    SEARCH sobre el índice que empieza por la fecha (2-3x más rápido).
+    """
+    return UnaryExpression(columna.expression, operator=operators.custom_op('+'), type_=columna.type)
+
+
+def consulta_totales_ventana(fecha_limite):
+    """
+    Construye la consulta de total (en centavos) y número de compras por
+    cliente desde el día de fecha_limite, leyendo el resumen diario
+    (O(días) por cliente).
+    """
+    return (
+        select(
+            ResumenCompraDiaria.cliente_id.label('cliente_id'),
+            func.sum(ResumenCompraDiaria.total_centavos).label('monto_total_centavos'),
+            func.sum(ResumenCompraDiaria.cantidad).label('numero_compras')
+        )
+        .where(ResumenCompraDiaria.dia >= fecha_limite.date())
+        .group_by(agrupar_sin_indice(ResumenCompraDiaria.cliente_id))
+    )
+
+
+def consulta_totales_compras_ventana(fecha_limite):
+    """
+    Construye la consulta de total (en centavos) y número de compras por
+    cliente desde fecha_limite, leyendo directamente la tabla compra
+    """
+    return (
+        select(
+            Compra.cliente_id.label('cliente_id'),
+            func.sum(Compra.monto_centavos).label('monto_total_centavos'),
+            func.count().label('numero_compras')
+        )
+        .where(Compra.fecha_compra >= fecha_limite)
+        .group_by(agrupar_sin_indice(Compra.cliente_id))
+    )
+
+
+def consulta_clientes_fidelizacion(fecha_limite, umbral):
+    """
+    Construye la consulta agrupada del reporte de fidelización:
+    total y número de compras por cliente desde fecha_limite,
+    filtrando con HAVING los que superan el umbral (en pesos).
+    Retorna filas ordenadas por monto total (descendente).
+    """
+    totales = (
+        consulta_totales_ventana(fecha_limite)
+        .having(func.sum(ResumenCompraDiaria.total_centavos) > a_centavos(umbral))
+        .subquery()
+    )
+
+    return (
+        select(
+            TipoDocumento.descripcion.label('tipo_documento'),
+            Cliente.numero_documento,
+            Cliente.nombre,
+            Cliente.apellido,
+            Cliente.correo,
+            Cliente.telefono,
+            totales.c.monto_total_centavos,
+            totales.c.numero_compras
+        )
+        .join(Cliente, Cliente.id == totales.c.cliente_id)
+        .join(TipoDocumento, TipoDocumento.id == Cliente.tipo_documento_id)
+        .order_by(totales.c.monto_total_centavos.desc(), Cliente.id)
+    )
+
+
+def consulta_clientes_por_total(fecha_limite, limite, despues_de=None):
+    """
+    Construye una página de clientes ordenada por total de compras desde
+    fecha_limite (descendente), con Cliente.id como desempate estable.
+    Los totales salen de una única subconsulta agregada sobre el resumen diario.
+    despues_de: tupla (total_centavos, id) de la última fila de la página anterior.
+    """
+    totales = consulta_totales_ventana(fecha_limite).subquery()
+    total = func.coalesce(totales.c.monto_total_centavos, 0)
+
+    consulta = (
+        select(
+            Cliente.id,
+            TipoDocumento.descripcion.label('tipo_documento'),
+            TipoDocumento.codigo.label('codigo_tipo'),
+            Cliente.numero_documento,
+            Cliente.nombre,
+            Cliente.apellido,
+            Cliente.correo,
+            Cliente.telefono,
+            total.label('total_centavos'),
+            func.coalesce(totales.c.numero_compras, 0).label('numero_compras')
+        )
+        .join(TipoDocumento, TipoDocumento.id == Cliente.tipo_documento_id)
+        .outerjoin(totales, totales.c.cliente_id == Cliente.id)
+    )
+
+    # Paginación por llave (keyset): continuar después de la última fila vista
+    if despues_de is not None:
+        total_cursor, id_cursor = despues_de
+        consulta = consulta.where(or_(
+            total < total_cursor,
+            and_(total == total_cursor, Cliente.id < id_cursor)
+        ))
+
+    return consulta.order_by(total.desc(), Cliente.id.desc()).limit(limite)
+
+
+def codificar_cursor(total, cliente_id):
+    """Codifica la posición (total_centavos, id) como un cursor opaco"""
+    crudo = json.dumps([total, cliente_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii')
+
+
+def decodificar_cursor(cursor):
+    """
+    Decodifica un cursor generado por codificar_cursor.
+    Lanza ValueError si el cursor no es válido.
+    """
+    try:
+        total, cliente_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Cursor inválido')
+    if not isinstance(total, int) or not isinstance(cliente_id, int):
+        raise ValueError('Cursor inválido')
+    return total, cliente_id
+
+
+
+def consulta_cliente_con_totales(tipo_documento_id, numero_documento):
+    """
+    Construye la consulta de un cliente junto con el total en centavos (SUM)
+    y el número (COUNT) de sus compras, en una sola sentencia
+    """
+    return (
+        select(
+            Cliente,
+            func.coalesce(func.sum(Compra.monto_centavos), 0).label('total_centavos'),
+            func.count(Compra.id).label('numero_compras')
+        )
+        .outerjoin(Compra, Compra.cliente_id == Cliente.id)
+        .where(
+            Cliente.tipo_documento_id == tipo_documento_id,
+            Cliente.numero_documento == numero_documento
+        )
+        .group_by(Cliente.id)
+    )
+
+
+def consulta_compras_cliente(cliente_id, limite=None, offset=0):
+    """Construye la consulta de compras de un cliente, opcionalmente paginada"""
+    consulta = select(Compra).where(Compra.cliente_id == cliente_id).order_by(Compra.id)
+    if limite is not None:
+        consulta = consulta.limit(limite)
+    if offset:
+        consulta = consulta.offset(offset)
+    return consulta
+
+
+def totales_compras_por_cliente(cliente_ids):
+    """Retorna {cliente_id: (total_centavos, numero_compras)} con SUM/COUNT en la base de datos"""
+    filas = db.session.execute(
+        select(Compra.cliente_id, func.sum(Compra.monto_centavos), func.count())
+        .where(Compra.cliente_id.in_(cliente_ids))
+        .group_by(Compra.cliente_id)
+    )
+    return {cliente_id: (total, numero) for cliente_id, total, numero in filas}
+
+
+def buscar_clientes_lote(documentos, tamano_lote=TAMANO_LOTE_IN):
+    """
+    Generador que resuelve una lista de documentos
+    [{'tipo_documento': 'CC', 'numero_documento': '...'}, ...]
+    en el mismo orden, con un número constante de consultas por bloque de
+    tamano_lote documentos: clientes (IN), compras (selectinload) y totales.
+    Cada resultado trae cliente, compras y totales, o un error y su estado HTTP.
+    """
+    for inicio in range(0, len(documentos), tamano_lote):
+        bloque = documentos[inicio:inicio + tamano_lote]
+
+        numeros = {
+            str(doc.get('numero_documento'))
+            for doc in bloque
+            if isinstance(doc, dict) and doc.get('numero_documento')
+        }
+        clientes = {}
+        totales = {}
+        if numeros:
+            clientes = {
+                cliente.numero_documento: cliente
+                for cliente in db.session.execute(
+                    select(Cliente)
+                    .where(Cliente.numero_documento.in_(numeros))
+                    .options(selectinload(Cliente.compras))
+                ).scalars()
+            }
+            if clientes:
+                totales = totales_compras_por_cliente([c.id for c in clientes.values()])
+
+        for doc in bloque:
+            yield _resultado_busqueda(doc, clientes, totales)
+
+        # Liberar los objetos del bloque antes de procesar el siguiente
+        db.session.expunge_all()
+
+
+def _resultado_busqueda(doc, clientes, totales):
+    if not isinstance(doc, dict):
+        return {'error': 'Cada documento debe ser un objeto', 'estado': 400}
+
+    tipo_doc = doc.get('tipo_documento')
+    numero_doc = doc.get('numero_documento')
+    resultado = {'tipo_documento': tipo_doc, 'numero_documento': numero_doc}
+
+    if not tipo_doc or not numero_doc:
+        resultado.update(error='Debe proporcionar tipo_documento y numero_documento', estado=400)
+        return resultado
+
+    tipo = tipos_documento.por_codigo(tipo_doc)
+    if not tipo:
+        resultado.update(error=f'Tipo de documento {tipo_doc} no válido', estado=400)
+        return resultado
+
+    cliente = clientes.get(str(numero_doc))
+    if not cliente or cliente.tipo_documento_id != tipo.id:
+        resultado.update(error='Cliente no encontrado', estado=404)
+        return resultado
+
+    total, numero = totales.get(cliente.id, (0, 0))
+    resultado.update(
+        estado=200,
+        cliente=cliente.to_dict(),
+        compras=[compra.to_dict() for compra in cliente.compras],
+        total_compras=a_pesos(total),
+        numero_compras=numero
+    )
+    return resultado
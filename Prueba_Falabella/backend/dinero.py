@@ -0,0 +1,24 @@
+# backend/dinero.py
+from decimal import Decimal, ROUND_HALF_UP
+
+# Los montos se guardan como enteros en centavos de peso (COP)
+CENTAVOS_POR_PESO = 100
+
+
+def a_centavos(pesos):
+    """Convierte un monto en pesos (int, float, str o Decimal) a centavos enteros"""
+    if pesos is None:
+        return None
+    return int((Decimal(str(pesos)) * CENTAVOS_POR_PESO).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def a_pesos(centavos):
+    """Convierte centavos enteros a pesos para mostrar (JSON, exportaciones)"""
+    if centavos is None:
+        return None
+    return centavos / CENTAVOS_POR_PESO
+
+
+def formatear_cop(centavos):
+    """Formatea centavos como moneda: 123456789 -> '$1,234,567.89'"""
+    return f"${Decimal(centavos).scaleb(-2):,.2f}"
\ No newline at end of file
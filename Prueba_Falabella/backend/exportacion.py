@@ -0,0 +1,199 @@
+# backend/exportacion.py
+import csv
+import functools
+import importlib
+import importlib.util
+import io
+from itertools import chain, islice
+from sqlalchemy import select
+from models import db, Compra
+from dinero import a_pesos
+
+# Columnas del CSV en streaming: una fila por compra con los datos del cliente
+COLUMNAS_CSV_COMPRAS = [
+    'Tipo Documento', 'Número Documento', 'Nombre', 'Apellido',
+    'Fecha', 'Monto', 'Descripción', 'Número Factura'
+]
+
+# Columnas de las hojas de Excel del cliente
+COLUMNAS_CLIENTE = [
+    'Tipo Documento', 'Número Documento', 'Nombre', 'Apellido',
+    'Correo', 'Teléfono', 'Fecha Registro'
+]
+COLUMNAS_COMPRAS = ['Fecha', 'Monto', 'Descripción', 'Número Factura']
+
+# Columnas agregadas al CSV del cliente cuando tiene compras
+COLUMNAS_TOTALES_CLIENTE = ['Total Compras', 'Número de Compras']
+
+# Columnas del reporte de fidelización
+COLUMNAS_FIDELIZACION = [
+    'Tipo Documento', 'Número Documento', 'Nombre', 'Apellido',
+    'Correo', 'Teléfono', 'Monto Total (COP)', 'Número de Compras'
+]
+
+# Ajuste de ancho de columnas en Excel: se calcula con una muestra acotada
+MUESTRA_ANCHO_COLUMNAS = 200
+ANCHO_MAXIMO_COLUMNA = 50
+
+# Módulos pesados que solo usan las exportaciones: se importan en el primer
+# uso (o en el arranque del worker con PRECARGAR_EXPORTACION)
+MODULOS_EXPORTACION = ('openpyxl', 'pyarrow')
+
+
+def precargar_exportacion():
+    """Importa por adelantado los módulos de exportación instalados (calentamiento)"""
+    for modulo in MODULOS_EXPORTACION:
+        if importlib.util.find_spec(modulo) is not None:
+            importlib.import_module(modulo)
+
+
+@functools.cache
+def _estilo_encabezado():
+    """Estilo de encabezado (negrita, borde delgado, centrado), como el de pandas.to_excel"""
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    borde_delgado = Side(style='thin')
+    return {
+        'font': Font(bold=True),
+        'border': Border(left=borde_delgado, right=borde_delgado, top=borde_delgado, bottom=borde_delgado),
+        'alignment': Alignment(horizontal='center', vertical='top'),
+    }
+
+
+def fila_datos_cliente(cliente, tipo_documento):
+    """Fila con las COLUMNAS_CLIENTE de un cliente"""
+    return [
+        tipo_documento,
+        cliente.numero_documento,
+        cliente.nombre,
+        cliente.apellido,
+        cliente.correo,
+        cliente.telefono,
+        cliente.fecha_registro.strftime('%Y-%m-%d')
+    ]
+
+
+def filas_compras(cliente_id, tamano_lote=1000):
+    """Generador de filas (Fecha, Monto, Descripción, Número Factura) de un cliente"""
+    consulta = (
+        select(Compra.fecha_compra, Compra.monto_centavos, Compra.descripcion, Compra.numero_factura)
+        .where(Compra.cliente_id == cliente_id)
+        .order_by(Compra.fecha_compra, Compra.id)
+        .execution_options(yield_per=tamano_lote)
+    )
+    for fecha, monto, descripcion, factura in db.session.execute(consulta):
+        yield [fecha.strftime('%Y-%m-%d'), a_pesos(monto), descripcion, factura]
+
+
+def calcular_anchos(encabezados, muestra):
+    """Ancho de cada columna según el texto más largo de la muestra (máx. 50)"""
+    anchos = [len(str(encabezado)) for encabezado in encabezados]
+    for fila in muestra:
+        for i, valor in enumerate(fila):
+            anchos[i] = max(anchos[i], len(str(valor)))
+    return [min(ancho + 2, ANCHO_MAXIMO_COLUMNA) for ancho in anchos]
+
+
+def escribir_excel(filepath, hojas, ajustar_anchos=False):
+    """
+    Escribe un archivo Excel con hojas de solo escritura (write-only):
+    las filas se consumen de un iterable y no se guardan en memoria.
+    hojas: lista de (nombre, encabezados, filas). Las hojas sin filas se omiten.
+    Si ajustar_anchos es True, el ancho de columnas se calcula con las
+    primeras MUESTRA_ANCHO_COLUMNAS filas en lugar de recorrer todas las celdas.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    estilo = _estilo_encabezado()
+    workbook = Workbook(write_only=True)
+
+    for nombre, encabezados, filas in hojas:
+        filas = iter(filas)
+        muestra = list(islice(filas, MUESTRA_ANCHO_COLUMNAS))
+        if not muestra:
+            continue
+
+        worksheet = workbook.create_sheet(nombre)
+
+        # En modo write-only los anchos deben definirse antes de escribir filas
+        if ajustar_anchos:
+            for i, ancho in enumerate(calcular_anchos(encabezados, muestra), start=1):
+                worksheet.column_dimensions[get_column_letter(i)].width = ancho
+
+        encabezado = []
+        for titulo in encabezados:
+            celda = WriteOnlyCell(worksheet, value=titulo)
+            celda.font = estilo['font']
+            celda.border = estilo['border']
+            celda.alignment = estilo['alignment']
+            encabezado.append(celda)
+        worksheet.append(encabezado)
+
+        for fila in chain(muestra, filas):
+            worksheet.append(fila)
+
+    workbook.save(filepath)
+
+
+def escribir_csv(filepath, encabezados, filas):
+    """
+    Escribe un CSV fila a fila con el módulo csv. El formato es el mismo de
+    DataFrame.to_csv(index=False, encoding='utf-8-sig'): BOM, separador
+    coma, fin de línea LF y comillas solo cuando hacen falta.
+    """
+    with open(filepath, 'w', encoding='utf-8-sig', newline='') as archivo:
+        writer = csv.writer(archivo, lineterminator='\n')
+        writer.writerow(encabezados)
+        writer.writerows(filas)
+
+
+def escribir_csv_cliente(filepath, fila_cliente, totales=None):
+    """
+    CSV de una fila con los datos del cliente (COLUMNAS_CLIENTE) y, si tiene
+    compras, sus totales: totales = (total_centavos, numero_compras)
+    """
+    if not totales:
+        escribir_csv(filepath, COLUMNAS_CLIENTE, [fila_cliente])
+        return
+
+    total, numero = totales
+    escribir_csv(
+        filepath,
+        COLUMNAS_CLIENTE + COLUMNAS_TOTALES_CLIENTE,
+        [list(fila_cliente) + [a_pesos(total), numero]]
+    )
+
+
+def generar_csv_compras(cliente, tipo_documento, tamano_lote=1000):
+    """
+    Generador que produce el CSV de compras de un cliente por bloques.
+    Las filas se leen con un cursor del lado del servidor (yield_per),
+    por lo que la memoria no crece con el número de compras.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    # BOM para que Excel reconozca UTF-8 (igual que encoding='utf-8-sig')
+    buffer.write('\ufeff')
+    writer.writerow(COLUMNAS_CSV_COMPRAS)
+    yield buffer.getvalue()
+
+    datos_cliente = [tipo_documento, cliente.numero_documento, cliente.nombre, cliente.apellido]
+
+    consulta = (
+        select(Compra.fecha_compra, Compra.monto_centavos, Compra.descripcion, Compra.numero_factura)
+        .where(Compra.cliente_id == cliente.id)
+        .order_by(Compra.fecha_compra, Compra.id)
+        .execution_options(yield_per=tamano_lote)
+    )
+
+    for lote in db.session.execute(consulta).partitions():
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            datos_cliente + [fecha.strftime('%Y-%m-%d'), a_pesos(monto), descripcion, factura]
+            for fecha, monto, descripcion, factura in lote
+        )
+        yield buffer.getvalue()
\ No newline at end of file
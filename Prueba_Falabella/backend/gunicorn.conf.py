@@ -0,0 +1,70 @@
+# backend/gunicorn.conf.py
+"""
+Configuración de gunicorn para servir la API en producción.
+
+    cd backend && gunicorn -c gunicorn.conf.py
+
+- preload_app: la app (y el esquema de la base) se prepara una vez en el
+  maestro; cada worker descarta las conexiones heredadas en post_fork.
+- max_requests (+ jitter): los workers se reciclan de a uno para acotar
+  el crecimiento de memoria.
+- kill -HUP <pid del maestro> recarga los workers de forma ordenada; los
+  que están atendiendo terminan sus peticiones (graceful_timeout).
+- METRICAS_FOLDER: carpeta donde los workers vuelcan sus métricas para que
+  /metrics exponga las de todos (por defecto una carpeta temporal del maestro).
+
+Todos los valores se pueden ajustar con variables de entorno GUNICORN_*.
+"""
+import multiprocessing
+import os
+import tempfile
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+preload_app = True
+
+# Antes de cargar la app (config.py la lee al importarse). Vacía también
+# toma el valor por defecto: sin carpeta cada worker expondría solo lo suyo
+os.environ['METRICAS_FOLDER'] = (
+    os.environ.get('METRICAS_FOLDER')
+    or os.path.join(tempfile.gettempdir(), f'metricas-gunicorn-{os.getpid()}')
+)
+
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))  # exportaciones grandes
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None  # vacío: sin log de accesos
+errorlog = '-'
+
+
+def on_starting(server):
+    # Los valores de una ejecución anterior no se suman a los contadores
+    from metricas import registro
+    registro.limpiar()
+
+
+def post_fork(server, worker):
+    # Las conexiones SQLite abiertas por el maestro no se comparten con los hijos
+    from conexiones import conexiones
+    from wsgi import app
+    conexiones.desechar(app)
+
+    # Calentamiento opcional de los módulos de exportación en el worker
+    if app.config['PRECARGAR_EXPORTACION']:
+        from exportacion import precargar_exportacion
+        precargar_exportacion()
+
+
+def worker_exit(server, worker):
+    # Último volcado: los valores del worker se conservan en acumulado.json
+    from metricas import registro
+    registro.volcar()
\ No newline at end of file
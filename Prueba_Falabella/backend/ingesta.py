@@ -0,0 +1,284 @@
+# backend/ingesta.py
+import csv
+import json
+from collections import Counter
+from datetime import datetime
+from itertools import chain, islice
+from decimal import Decimal, InvalidOperation
+from models import db, tipos_documento
+from dinero import a_centavos
+from consultas import TAMANO_LOTE_IN
+from metricas import registro
+
+# Estados por fila del resultado de la ingesta
+CREADA = 'creada'
+ACTUALIZADA = 'actualizada'
+SIN_CAMBIOS = 'sin_cambios'
+ERROR = 'error'
+ESTADOS = (CREADA, ACTUALIZADA, SIN_CAMBIOS, ERROR)
+
+filas_ingeridas = registro.contador(
+    'ingesta_compras_filas_total', 'Filas de compras recibidas por ingesta masiva', ('estado',)
+)
+
+# Largos máximos (los de las columnas de compra)
+MAX_LARGO_FACTURA = 50
+MAX_LARGO_DESCRIPCION = 200
+
+# Inserta o, si la factura ya existe, actualiza la compra. Los triggers de
+# compra mantienen el resumen diario y la versión de datos.
+_UPSERT = (
+    'INSERT INTO compra (cliente_id, fecha_compra, monto_centavos, descripcion, numero_factura) '
+    'VALUES (?, ?, ?, ?, ?) '
+    'ON CONFLICT (numero_factura) DO UPDATE SET '
+    'cliente_id = excluded.cliente_id, fecha_compra = excluded.fecha_compra, '
+    'monto_centavos = excluded.monto_centavos, descripcion = excluded.descripcion'
+)
+
+
+# Decimal: los montos no pasan por float. Un solo decodificador para todas
+# las líneas (json.loads con parse_float crea uno nuevo en cada llamada).
+_DECODIFICADOR_JSON = json.JSONDecoder(parse_float=Decimal)
+
+
+class ErrorFila(ValueError):
+    """Fila de la ingesta que no se puede aplicar (se reporta en su resultado)"""
+
+
+class LoteDemasiadoGrande(ValueError):
+    """
+    El lote supera el máximo de filas. Se detecta al leer la fila siguiente
+    al máximo: los bloques anteriores ya quedaron aplicados (aplicadas).
+    """
+
+    def __init__(self, maximo, aplicadas):
+        super().__init__(f'Máximo {maximo:,} compras por lote')
+        self.aplicadas = aplicadas
+
+
+def leer_ndjson(lineas):
+    """
+    Generador de registros (dict) de líneas NDJSON, p. ej. el cuerpo de la
+    petición como archivo de texto; las líneas vacías se ignoran
+    """
+    for linea in lineas:
+        if not linea or linea.isspace():
+            continue
+        try:
+            fila = _DECODIFICADOR_JSON.decode(linea)
+        except ValueError:
+            yield ErrorFila('JSON inválido')
+            continue
+        yield fila if isinstance(fila, dict) else ErrorFila('Cada línea debe ser un objeto JSON')
+
+
+def leer_csv(lineas):
+    """Generador de registros (dict) de las líneas de un CSV con encabezado (con o sin BOM)"""
+    lineas = iter(lineas)
+    primera = next(lineas, '')
+    yield from csv.DictReader(chain([primera.removeprefix('\ufeff')], lineas))
+
+
+def _fecha(valor):
+    if not valor:
+        raise ErrorFila('Debe proporcionar fecha_compra')
+    try:
+        fecha = datetime.fromisoformat(str(valor).strip())
+    except ValueError:
+        raise ErrorFila(f'fecha_compra inválida: {valor}')
+    # Las fechas se guardan en hora local sin zona
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone().replace(tzinfo=None)
+    return fecha
+
+
+def _monto_centavos(fila):
+    try:
+        if fila.get('monto_centavos') not in (None, ''):
+            valor = Decimal(str(fila['monto_centavos']))
+            if valor != valor.to_integral_value():
+                raise ErrorFila('monto_centavos debe ser entero')
+            centavos = int(valor)
+        elif fila.get('monto') not in (None, ''):
+            centavos = a_centavos(fila['monto'])
+        else:
+            raise ErrorFila('Debe proporcionar monto o monto_centavos')
+    except (InvalidOperation, ValueError) as e:
+        if isinstance(e, ErrorFila):
+            raise
+        raise ErrorFila('Monto inválido')
+    if centavos <= 0:
+        raise ErrorFila('El monto debe ser mayor que cero')
+    return centavos
+
+
+def validar_registro(fila):
+    """
+    Normaliza un registro de compra. Retorna (numero_documento, codigo_tipo,
+    fecha_compra, monto_centavos, descripcion, numero_factura).
+    Lanza ErrorFila si falta un campo o tiene un valor inválido.
+    """
+    numero_documento = str(fila.get('numero_documento') or '').strip()
+    if not numero_documento:
+        raise ErrorFila('Debe proporcionar numero_documento')
+
+    numero_factura = str(fila.get('numero_factura') or '').strip()
+    if not numero_factura:
+        raise ErrorFila('Debe proporcionar numero_factura')
+    if len(numero_factura) > MAX_LARGO_FACTURA:
+        raise ErrorFila(f'numero_factura supera {MAX_LARGO_FACTURA} caracteres')
+
+    descripcion = fila.get('descripcion')
+    descripcion = str(descripcion) if descripcion not in (None, '') else None
+    if descripcion and len(descripcion) > MAX_LARGO_DESCRIPCION:
+        raise ErrorFila(f'descripcion supera {MAX_LARGO_DESCRIPCION} caracteres')
+
+    codigo_tipo = str(fila.get('tipo_documento') or '').strip() or None
+
+    return (
+        numero_documento, codigo_tipo, _fecha(fila.get('fecha_compra')),
+        _monto_centavos(fila), descripcion, numero_factura
+    )
+
+
+def _en_bloques(valores, tamano=TAMANO_LOTE_IN):
+    iterador = iter(valores)
+    while bloque := tuple(islice(iterador, tamano)):
+        yield bloque
+
+
+def _clientes_por_documento(conn, numeros):
+    """{numero_documento: (cliente_id, tipo_documento_id)} con consultas IN por bloques"""
+    clientes = {}
+    for bloque in _en_bloques(numeros):
+        marcas = ', '.join('?' * len(bloque))
+        clientes.update(
+            (numero, (cliente_id, tipo_id))
+            for cliente_id, numero, tipo_id in conn.exec_driver_sql(
+                f'SELECT id, numero_documento, tipo_documento_id FROM cliente '
+                f'WHERE numero_documento IN ({marcas})', bloque
+            )
+        )
+    return clientes
+
+
+def _compras_por_factura(conn, facturas):
+    """{numero_factura: (cliente_id, fecha_compra, monto_centavos, descripcion)} de las existentes"""
+    compras = {}
+    for bloque in _en_bloques(facturas):
+        marcas = ', '.join('?' * len(bloque))
+        compras.update(
+            (factura, (cliente_id, fecha, monto, descripcion))
+            for factura, cliente_id, fecha, monto, descripcion in conn.exec_driver_sql(
+                f'SELECT numero_factura, cliente_id, fecha_compra, monto_centavos, descripcion FROM compra '
+                f'WHERE numero_factura IN ({marcas})', bloque
+            )
+        )
+    return compras
+
+
+def _validar_bloque(bloque, resultados):
+    """
+    Valida un bloque [(indice, fila)] antes de abrir la transacción (el
+    bloqueo de escritura dura solo la parte en la base de datos). Escribe
+    el error de las filas inválidas en resultados[indice] y retorna las
+    válidas: [(indice, (numero_documento, tipo_documento_id, fecha_compra,
+    monto_centavos, descripcion, numero_factura))].
+    """
+    validos = []
+    for indice, fila in bloque:
+        try:
+            if isinstance(fila, ErrorFila):
+                raise fila
+            if not isinstance(fila, dict):
+                raise ErrorFila('Cada registro debe ser un objeto')
+            numero, codigo_tipo, fecha, monto, descripcion, factura = validar_registro(fila)
+        except ErrorFila as e:
+            resultados[indice] = {'estado': ERROR, 'error': str(e)}
+            continue
+
+        tipo = tipos_documento.por_codigo(codigo_tipo) if codigo_tipo else None
+        if codigo_tipo and tipo is None:
+            resultados[indice] = {
+                'numero_factura': factura, 'estado': ERROR,
+                'error': f'Tipo de documento {codigo_tipo} no válido'
+            }
+            continue
+        validos.append((indice, (numero, tipo and tipo.id, fecha, monto, descripcion, factura)))
+    return validos
+
+
+def _aplicar_bloque(conn, validos, resultados):
+    """
+    Resuelve clientes, compara con las compras existentes y aplica el upsert
+    de un bloque ya validado (ver _validar_bloque) en una transacción.
+    Escribe el estado de cada fila en resultados[indice].
+    """
+    # BEGIN IMMEDIATE: toma el bloqueo de escritura antes de leer, así la
+    # comparación con las compras existentes no queda obsoleta
+    conn.exec_driver_sql('BEGIN IMMEDIATE')
+    try:
+        clientes = _clientes_por_documento(conn, {datos[0] for _, datos in validos})
+        existentes = _compras_por_factura(conn, {datos[5] for _, datos in validos})
+
+        filas = []
+        for indice, (numero, tipo_id, fecha, monto, descripcion, factura) in validos:
+            cliente = clientes.get(numero)
+            if cliente is None or (tipo_id is not None and tipo_id != cliente[1]):
+                resultados[indice] = {'numero_factura': factura, 'estado': ERROR, 'error': 'Cliente no encontrado'}
+                continue
+
+            valores = (cliente[0], fecha.isoformat(' ', 'microseconds'), monto, descripcion)
+            anterior = existentes.get(factura)
+            if anterior is None:
+                estado = CREADA
+            elif anterior == valores:
+                estado = SIN_CAMBIOS
+            else:
+                estado = ACTUALIZADA
+
+            # Una factura repetida en el mismo lote se compara con su versión anterior del lote
+            existentes[factura] = valores
+            resultados[indice] = {'numero_factura': factura, 'estado': estado}
+            if estado != SIN_CAMBIOS:
+                filas.append((*valores, factura))
+
+        if filas:
+            conn.exec_driver_sql(_UPSERT, filas)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def ingerir_compras(registros, tamano_transaccion, maximo=None):
+    """
+    Aplica registros de compra (dicts, p. ej. de leer_ndjson o leer_csv) con
+    semántica de upsert por numero_factura, en transacciones de
+    tamano_transaccion filas. registros se consume a medida que se aplica:
+    en memoria solo queda un bloque. Retorna una lista con el resultado de
+    cada fila, en el orden recibido: {'numero_factura', 'estado', 'error'?}.
+    Si falla la base de datos, los bloques ya confirmados quedan aplicados.
+    Lanza LoteDemasiadoGrande al leer la fila maximo + 1 (el bloque en curso
+    se descarta).
+    """
+    resultados = []
+    aplicadas = 0
+    try:
+        with db.engine.connect() as conn:
+            bloque = []
+            for fila in registros:
+                if maximo is not None and len(resultados) >= maximo:
+                    raise LoteDemasiadoGrande(maximo, aplicadas)
+                resultados.append(None)
+                bloque.append((len(resultados) - 1, fila))
+                if len(bloque) >= tamano_transaccion:
+                    _aplicar_bloque(conn, _validar_bloque(bloque, resultados), resultados)
+                    aplicadas, bloque = len(resultados), []
+            if bloque:
+                _aplicar_bloque(conn, _validar_bloque(bloque, resultados), resultados)
+                aplicadas = len(resultados)
+    finally:
+        for estado, cantidad in Counter(resultado['estado'] for resultado in resultados[:aplicadas]).items():
+            filas_ingeridas.inc(cantidad, estado=estado)
+    return resultados
\ No newline at end of file
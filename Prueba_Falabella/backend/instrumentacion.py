@@ -0,0 +1,132 @@
+# backend/instrumentacion.py
+import json
+import logging
+import time
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from metricas import registro
+
+logger = logging.getLogger('instrumentacion')
+
+# Cubetas para el número de consultas SQL por petición
+CUBETAS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+# Largo máximo del SQL de la consulta más lenta en el log
+MAX_LARGO_SQL = 300
+
+duracion_peticiones = registro.histograma(
+    'http_peticion_duracion_segundos', 'Duración de las peticiones HTTP', ('metodo', 'ruta', 'estado')
+)
+duracion_db = registro.histograma(
+    'http_peticion_db_segundos', 'Tiempo en la base de datos por petición HTTP', ('metodo', 'ruta')
+)
+consultas_peticion = registro.histograma(
+    'http_peticion_consultas', 'Consultas SQL por petición HTTP', ('metodo', 'ruta'), CUBETAS_CONSULTAS
+)
+
+
+def _antes_consulta(conn, cursor, statement, parameters, context, executemany):
+    # El inicio se guarda en el contexto de la sentencia (no en la conexión):
+    # si la sentencia falla no queda nada pendiente
+    if context is not None and has_request_context() and '_instrumentacion' in g:
+        context._inicio_instrumentacion = time.perf_counter()
+
+
+def _despues_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, '_inicio_instrumentacion', None)
+    if inicio is None or not has_request_context():
+        return
+    duracion = time.perf_counter() - inicio
+    datos = g.get('_instrumentacion')
+    if datos is None:
+        return
+
+    datos['consultas'] += 1
+    datos['db'] += duracion
+    if duracion > datos['mas_lenta']:
+        datos['mas_lenta'] = duracion
+        datos['sql_mas_lenta'] = statement
+
+
+class Instrumentacion:
+    """
+    Instrumentación opcional por petición (INSTRUMENTACION=1): cuenta y
+    cronometra las consultas SQL con eventos del engine y las reporta en
+    el header Server-Timing, en una línea de log JSON y en /metrics.
+    En respuestas en streaming solo se mide hasta que el handler retorna.
+    """
+
+    _eventos_registrados = False
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('INSTRUMENTACION'):
+            return
+
+        # A nivel de clase: cubre todos los engines (también los que se creen después)
+        if not Instrumentacion._eventos_registrados:
+            event.listen(Engine, 'before_cursor_execute', _antes_consulta)
+            event.listen(Engine, 'after_cursor_execute', _despues_consulta)
+            Instrumentacion._eventos_registrados = True
+
+        if not logger.handlers:
+            manejador = logging.StreamHandler()
+            manejador.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(manejador)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+
+        app.before_request(self._antes_peticion)
+        app.after_request(self._despues_peticion)
+
+    @staticmethod
+    def _antes_peticion():
+        g._instrumentacion = {
+            'inicio': time.perf_counter(),
+            'consultas': 0,
+            'db': 0.0,
+            'mas_lenta': 0.0,
+            'sql_mas_lenta': None,
+        }
+
+    @staticmethod
+    def _despues_peticion(response):
+        datos = g.pop('_instrumentacion', None)
+        if datos is None:
+            return response
+
+        total = time.perf_counter() - datos['inicio']
+        ruta = request.url_rule.rule if request.url_rule else 'sin_ruta'
+        metodo = request.method
+
+        response.headers['Server-Timing'] = ', '.join([
+            f'db;dur={datos["db"] * 1000:.1f};desc="{datos["consultas"]} consultas"',
+            f'sql-lenta;dur={datos["mas_lenta"] * 1000:.1f}',
+            f'app;dur={(total - datos["db"]) * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+        duracion_peticiones.observe(total, metodo=metodo, ruta=ruta, estado=response.status_code)
+        duracion_db.observe(datos['db'], metodo=metodo, ruta=ruta)
+        consultas_peticion.observe(datos['consultas'], metodo=metodo, ruta=ruta)
+
+        sql = datos['sql_mas_lenta']
+        logger.info(json.dumps({
+            'metodo': metodo,
+            'ruta': ruta,
+            'estado': response.status_code,
+            'duracion_ms': round(total * 1000, 2),
+            'consultas': datos['consultas'],
+            'db_ms': round(datos['db'] * 1000, 2),
+            'consulta_mas_lenta_ms': round(datos['mas_lenta'] * 1000, 2),
+            'consulta_mas_lenta': ' '.join(sql.split())[:MAX_LARGO_SQL] if sql else None,
+        }, ensure_ascii=False))
+
+        return response
+
+
+instrumentacion = Instrumentacion()
\ No newline at end of file
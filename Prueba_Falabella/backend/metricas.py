@@ -0,0 +1,296 @@
+# backend/metricas.py
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from procesos import HiloPorProceso, bloqueo_archivo, proceso_vivo
+
+
+class Metrica:
+    """Métrica con etiquetas expuesta en formato de texto de Prometheus"""
+    tipo = None
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def _clave(self, etiquetas):
+        return tuple(str(etiquetas.get(nombre, '')) for nombre in self.etiquetas)
+
+    def _formatear_etiquetas(self, clave):
+        if not self.etiquetas:
+            return ''
+        pares = ','.join(f'{nombre}="{valor}"' for nombre, valor in zip(self.etiquetas, clave))
+        return '{' + pares + '}'
+
+    def valor(self, **etiquetas):
+        return self._valores.get(self._clave(etiquetas), 0)
+
+    def instantanea(self):
+        """{clave: valor} serializable para combinarse con los de otros procesos"""
+        with self._lock:
+            return dict(self._valores)
+
+    @staticmethod
+    def combinar(a, b):
+        return a + b
+
+    @staticmethod
+    def valor_combinado(valor):
+        return valor
+
+    def exponer(self, valores=None):
+        """Líneas de la métrica con los valores del proceso o los combinados dados"""
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} {self.tipo}']
+        with self._lock:
+            if valores is None:
+                valores = dict(self._valores)
+            for clave, valor in sorted(valores.items()):
+                lineas.append(f'{self.nombre}{self._formatear_etiquetas(clave)} {self.valor_combinado(valor)}')
+        return lineas
+
+
+class Contador(Metrica):
+    tipo = 'counter'
+
+    def inc(self, cantidad=1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + cantidad
+
+
+class Medidor(Metrica):
+    """Medidor; entre procesos se expone el valor asignado más recientemente"""
+    tipo = 'gauge'
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._momentos = {}
+
+    def set(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = valor
+            self._momentos[clave] = time.time()
+
+    def instantanea(self):
+        with self._lock:
+            return {clave: (valor, self._momentos[clave]) for clave, valor in self._valores.items()}
+
+    @staticmethod
+    def combinar(a, b):
+        return max(a, b, key=lambda valor_momento: valor_momento[1])
+
+    @staticmethod
+    def valor_combinado(valor):
+        return valor[0] if isinstance(valor, (list, tuple)) else valor
+
+
+class Histograma(Metrica):
+    """Histograma acumulativo: cubetas _bucket{le=...}, _sum y _count por etiquetas"""
+    tipo = 'histogram'
+
+    # Cubetas por defecto (segundos), las mismas de los clientes oficiales de Prometheus
+    CUBETAS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, nombre, ayuda, etiquetas=(), cubetas=None):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.cubetas = tuple(sorted(cubetas or self.CUBETAS))
+
+    def observe(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            conteos, suma, total = self._valores.get(clave) or ([0] * len(self.cubetas), 0, 0)
+            for i, limite in enumerate(self.cubetas):
+                if valor <= limite:
+                    conteos[i] += 1
+            self._valores[clave] = (conteos, suma + valor, total + 1)
+
+    def valor(self, **etiquetas):
+        """Número de observaciones"""
+        datos = self._valores.get(self._clave(etiquetas))
+        return datos[2] if datos else 0
+
+    def instantanea(self):
+        with self._lock:
+            return {clave: (list(conteos), suma, total) for clave, (conteos, suma, total) in self._valores.items()}
+
+    @staticmethod
+    def combinar(a, b):
+        return [x + y for x, y in zip(a[0], b[0])], a[1] + b[1], a[2] + b[2]
+
+    def exponer(self, valores=None):
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} {self.tipo}']
+        with self._lock:
+            if valores is None:
+                valores = dict(self._valores)
+            for clave, (conteos, suma, total) in sorted(valores.items()):
+                pares = [f'{nombre}="{valor}"' for nombre, valor in zip(self.etiquetas, clave)]
+                for limite, conteo in zip(self.cubetas, conteos):
+                    etiquetas = ','.join(pares + [f'le="{limite}"'])
+                    lineas.append(f'{self.nombre}_bucket{{{etiquetas}}} {conteo}')
+                etiquetas = ','.join(pares + ['le="+Inf"'])
+                lineas.append(f'{self.nombre}_bucket{{{etiquetas}}} {total}')
+                lineas.append(f'{self.nombre}_sum{self._formatear_etiquetas(clave)} {suma}')
+                lineas.append(f'{self.nombre}_count{self._formatear_etiquetas(clave)} {total}')
+        return lineas
+
+
+class Registro:
+    """
+    Registro de métricas del proceso.
+    Con METRICAS_FOLDER (varios workers de gunicorn) cada proceso vuelca sus
+    valores en <carpeta>/<pid>-<token>.json cada METRICAS_INTERVALO_SEGUNDOS,
+    al ser consultado y al terminar; exponer() combina los de todos los
+    procesos: suma contadores e histogramas y toma el último valor de cada
+    medidor. Los archivos de procesos terminados se acumulan en acumulado.json
+    para que los contadores no retrocedan al reciclar workers.
+    """
+
+    ACUMULADO = 'acumulado.json'
+
+    def __init__(self):
+        self._metricas = {}
+        self.carpeta = None
+        self._hilo = HiloPorProceso(self._bucle, 'metricas')
+        self._pid = None
+        self._archivo = None
+
+    def init_app(self, app):
+        self.carpeta = app.config['METRICAS_FOLDER']
+        self.intervalo = app.config['METRICAS_INTERVALO_SEGUNDOS']
+        if self.carpeta:
+            os.makedirs(self.carpeta, exist_ok=True)
+            # El hilo se inicia con la primera petición de cada worker:
+            # los hilos no sobreviven al fork
+            app.before_request(self._hilo.asegurar)
+
+    def _registrar(self, clase, nombre, ayuda, etiquetas):
+        if nombre not in self._metricas:
+            self._metricas[nombre] = clase(nombre, ayuda, etiquetas)
+        return self._metricas[nombre]
+
+    def contador(self, nombre, ayuda, etiquetas=()):
+        return self._registrar(Contador, nombre, ayuda, etiquetas)
+
+    def medidor(self, nombre, ayuda, etiquetas=()):
+        return self._registrar(Medidor, nombre, ayuda, etiquetas)
+
+    def histograma(self, nombre, ayuda, etiquetas=(), cubetas=None):
+        if nombre not in self._metricas:
+            self._metricas[nombre] = Histograma(nombre, ayuda, etiquetas, cubetas)
+        return self._metricas[nombre]
+
+    def exponer(self):
+        """Texto en formato de exposición de Prometheus"""
+        combinados = self._combinar_carpeta() if self.carpeta else {}
+        lineas = []
+        for nombre, metrica in self._metricas.items():
+            lineas.extend(metrica.exponer(combinados.get(nombre, {}) if self.carpeta else None))
+        return '\n'.join(lineas) + '\n'
+
+    # ==================== Varios procesos ====================
+
+    def limpiar(self):
+        """Elimina los valores de ejecuciones anteriores (al arrancar el servidor)"""
+        if not self.carpeta:
+            return
+        for ruta in glob.glob(os.path.join(self.carpeta, '*.json')):
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+    def volcar(self):
+        """Escribe los valores de este proceso en su archivo de la carpeta"""
+        if not self.carpeta:
+            return
+        if self._pid != os.getpid():
+            # Cada proceso (también tras un fork) escribe en un archivo propio
+            self._pid = os.getpid()
+            self._archivo = os.path.join(self.carpeta, f'{self._pid}-{uuid.uuid4().hex[:8]}.json')
+        instantanea = {
+            nombre: [[list(clave), valor] for clave, valor in metrica.instantanea().items()]
+            for nombre, metrica in self._metricas.items()
+        }
+        temporal = f'{self._archivo}.{threading.get_ident()}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(instantanea, f)
+        os.replace(temporal, self._archivo)
+
+    def _combinar_carpeta(self):
+        """{nombre: {clave: valor}} combinando los archivos de todos los procesos"""
+        self.volcar()
+        combinados, terminados = {}, {}
+        with bloqueo_archivo(os.path.join(self.carpeta, '.lock')):
+            for ruta in glob.glob(os.path.join(self.carpeta, '*.json')):
+                try:
+                    with open(ruta, encoding='utf-8') as f:
+                        instantanea = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                self._fusionar(combinados, instantanea)
+                if ruta != self._archivo and not _proceso_vivo(os.path.basename(ruta)):
+                    terminados[ruta] = instantanea
+
+            if terminados:
+                ruta_acumulado = os.path.join(self.carpeta, self.ACUMULADO)
+                terminados.pop(ruta_acumulado, None)
+                self._compactar(ruta_acumulado, terminados)
+        return combinados
+
+    def _fusionar(self, combinados, instantanea):
+        for nombre, valores in instantanea.items():
+            metrica = self._metricas.get(nombre)
+            if metrica is None:
+                continue
+            destino = combinados.setdefault(nombre, {})
+            for clave, valor in valores:
+                clave = tuple(clave)
+                destino[clave] = metrica.combinar(destino[clave], valor) if clave in destino else valor
+
+    def _compactar(self, ruta_acumulado, terminados):
+        """Suma los archivos de procesos terminados al acumulado y los elimina"""
+        acumulado = {}
+        try:
+            with open(ruta_acumulado, encoding='utf-8') as f:
+                self._fusionar(acumulado, json.load(f))
+        except (OSError, ValueError):
+            pass
+        for instantanea in terminados.values():
+            self._fusionar(acumulado, instantanea)
+
+        temporal = f'{ruta_acumulado}.{os.getpid()}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({
+                nombre: [[list(clave), valor] for clave, valor in valores.items()]
+                for nombre, valores in acumulado.items()
+            }, f)
+        os.replace(temporal, ruta_acumulado)
+        for ruta in terminados:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+    def _bucle(self):
+        while True:
+            try:
+                self.volcar()
+            except OSError:
+                pass
+            time.sleep(self.intervalo)
+
+
+def _proceso_vivo(archivo):
+    """Si sigue vivo el proceso de un archivo <pid>-<token>.json (True si no se puede saber)"""
+    pid = archivo.split('-', 1)[0]
+    return not pid.isdigit() or proceso_vivo(int(pid))
+
+
+registro = Registro()
\ No newline at end of file
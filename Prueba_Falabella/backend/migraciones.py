@@ -0,0 +1,179 @@
+# backend/migraciones.py
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import select, text, inspect
+from models import db, Cliente, TRIGGERS_RESUMEN, TRIGGERS_VERSION, TABLA_BUSQUEDA_CLIENTE, TRIGGERS_BUSQUEDA
+from consultas import (
+    consulta_cliente_con_totales, consulta_compras_cliente, consulta_totales_ventana,
+    consulta_totales_compras_ventana
+)
+from segmentacion import Segmentacion
+from busqueda import consulta_busqueda_clientes
+
+# Migraciones versionadas: (versión, descripción, sentencias).
+# La versión aplicada se guarda en PRAGMA user_version.
+MIGRACIONES = [
+    (1, 'Índices compuestos para los patrones de consulta de la API', [
+        'CREATE INDEX IF NOT EXISTS ix_compra_cliente_fecha ON compra (cliente_id, fecha_compra)',
+        'CREATE INDEX IF NOT EXISTS ix_compra_fecha_cliente_monto ON compra (fecha_compra, cliente_id, monto)',
+        'CREATE INDEX IF NOT EXISTS ix_cliente_tipo_numero ON cliente (tipo_documento_id, numero_documento)',
+    ]),
+    (2, 'Montos de compra como enteros en centavos', [
+        # Los triggers e índices que usan la columna monto se recrean al final
+        'DROP TRIGGER IF EXISTS trg_resumen_compra_insert',
+        'DROP TRIGGER IF EXISTS trg_resumen_compra_delete',
+        'DROP TRIGGER IF EXISTS trg_resumen_compra_update',
+        'DROP INDEX IF EXISTS ix_compra_fecha_cliente_monto',
+        'ALTER TABLE compra ADD COLUMN monto_centavos INTEGER NOT NULL DEFAULT 0',
+        'UPDATE compra SET monto_centavos = CAST(ROUND(monto * 100) AS INTEGER)',
+        'ALTER TABLE compra DROP COLUMN monto',
+        'CREATE INDEX ix_compra_fecha_cliente_monto ON compra (fecha_compra, cliente_id, monto_centavos)',
+        # El resumen diario se recalcula completo con los montos exactos
+        'DROP TABLE IF EXISTS resumen_compra_diaria',
+        """
+        CREATE TABLE resumen_compra_diaria (
+            cliente_id INTEGER NOT NULL,
+            dia DATE NOT NULL,
+            total_centavos INTEGER NOT NULL,
+            cantidad INTEGER NOT NULL,
+            PRIMARY KEY (cliente_id, dia),
+            FOREIGN KEY(cliente_id) REFERENCES cliente (id)
+        )
+        """,
+        'CREATE INDEX ix_resumen_dia_cliente ON resumen_compra_diaria (dia, cliente_id, total_centavos, cantidad)',
+        """
+        INSERT INTO resumen_compra_diaria (cliente_id, dia, total_centavos, cantidad)
+        SELECT cliente_id, date(fecha_compra), SUM(monto_centavos), COUNT(*)
+        FROM compra
+        GROUP BY cliente_id, date(fecha_compra)
+        """,
+        *TRIGGERS_RESUMEN,
+    ]),
+    (3, 'Índice de texto completo (FTS5) para buscar clientes', [
+        *TABLA_BUSQUEDA_CLIENTE,
+        *TRIGGERS_BUSQUEDA,
+        "INSERT INTO cliente_busqueda (cliente_busqueda) VALUES ('rebuild')",
+    ]),
+    (4, 'Versión propia de tipo_documento para su caché en memoria', [
+        # Los triggers de tipo_documento pasan a avanzar también su propia fila
+        *(f'DROP TRIGGER IF EXISTS trg_version_tipo_documento_{operacion}' for operacion in ('insert', 'update', 'delete')),
+        *TRIGGERS_VERSION,
+    ]),
+]
+
+
+def version_actual():
+    return db.session.execute(text('PRAGMA user_version')).scalar()
+
+
+def preparar_esquema():
+    """
+    Crea las tablas que falten y aplica las migraciones pendientes.
+    Una base de datos nueva ya nace con el esquema actual, así que solo
+    se marca con la última versión en lugar de migrarla.
+    """
+    nueva = not inspect(db.engine).has_table('compra')
+    db.create_all()
+
+    if nueva:
+        db.session.execute(text(f'PRAGMA user_version = {int(MIGRACIONES[-1][0])}'))
+        db.session.commit()
+        return []
+    return migrar()
+
+
+def migrar():
+    """
+    Aplica en orden las migraciones pendientes, cada una en su propia
+    transacción. Retorna la lista de versiones aplicadas.
+    """
+    aplicadas = []
+
+    with db.engine.connect() as conn:
+        actual = conn.exec_driver_sql('PRAGMA user_version').scalar()
+
+        for version, descripcion, sentencias in MIGRACIONES:
+            if version <= actual:
+                continue
+            # pysqlite solo abre la transacción implícita antes de un DML; sin
+            # BEGIN explícito cada DDL se confirmaría por separado. user_version
+            # se actualiza en la misma transacción: todo o nada.
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+            try:
+                for sentencia in sentencias:
+                    conn.exec_driver_sql(sentencia)
+                conn.exec_driver_sql(f'PRAGMA user_version = {int(version)}')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            aplicadas.append((version, descripcion))
+
+        if aplicadas:
+            conn.exec_driver_sql('PRAGMA optimize')
+
+    return aplicadas
+
+
+# ==================== Verificación de planes de consulta ====================
+
+def _plan(consulta):
+    """Ejecuta EXPLAIN QUERY PLAN y retorna las líneas de detalle del plan"""
+    compilada = consulta.compile(dialect=db.engine.dialect)
+    parametros = tuple(compilada.params[nombre] for nombre in compilada.positiontup)
+    with db.engine.connect() as conn:
+        filas = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compilada}', parametros)
+        return [fila[3] for fila in filas]
+
+
+def _recorridos(plan):
+    """Tablas recorridas con SCAN en el plan, con o sin índice"""
+    return {m.group(1) for detalle in plan if (m := re.match(r'SCAN (\w+)\b', detalle))}
+
+
+def _indices_buscados(plan):
+    """Índices usados con SEARCH ... USING [COVERING] INDEX en el plan"""
+    return {
+        m.group(1) for detalle in plan
+        if (m := re.match(r'SEARCH \w+ USING (?:COVERING )?INDEX (\w+)', detalle))
+    }
+
+
+def consultas_a_verificar():
+    """
+    Consultas calientes de la API con las tablas que NO deben recorrerse
+    (SCAN, aunque sea sobre un índice) y los índices que deben usarse con
+    SEARCH en su plan de ejecución
+    """
+    fecha_limite = datetime.now() - timedelta(days=30)
+    return [
+        ('buscar-cliente: cliente y totales',
+         consulta_cliente_con_totales(1, '1234567890'), {'cliente', 'compra'}, set()),
+        ('buscar-cliente: compras del cliente',
+         consulta_compras_cliente(1, 50, 0), {'compra'}, set()),
+        ('exportar-cliente: cliente por número',
+         select(Cliente).where(Cliente.numero_documento == '1234567890'), {'cliente'}, set()),
+        ('reporte/listado: ventana sobre el resumen diario',
+         consulta_totales_ventana(fecha_limite), {'resumen_compra_diaria'}, {'ix_resumen_dia_cliente'}),
+        ('búsqueda de clientes: índice de texto completo',
+         consulta_busqueda_clientes('juan per', 20), {'cliente'}, set()),
+        ('segmentación: todas las ventanas sobre el resumen diario',
+         Segmentacion({7: [], 30: [], 90: []}).consulta_totales(),
+         {'resumen_compra_diaria'}, {'ix_resumen_dia_cliente'}),
+        ('ventana de fechas sobre compra',
+         consulta_totales_compras_ventana(fecha_limite), {'compra'}, {'ix_compra_fecha_cliente_monto'}),
+    ]
+
+
+def verificar_planes():
+    """
+    Verifica con EXPLAIN QUERY PLAN que ninguna consulta caliente recorra
+    (SCAN) sus tablas y que use con SEARCH los índices esperados.
+    Retorna una lista de (nombre, plan, ok).
+    """
+    resultados = []
+    for nombre, consulta, prohibidas, indices in consultas_a_verificar():
+        plan = _plan(consulta)
+        ok = not (_recorridos(plan) & prohibidas) and indices <= _indices_buscados(plan)
+        resultados.append((nombre, plan, ok))
+    return resultados
\ No newline at end of file
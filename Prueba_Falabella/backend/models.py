@@ -1,8 +1,18 @@
 # backend/models.py
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, DDL
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.hybrid import hybrid_property
+from collections import namedtuple
 from datetime import datetime
+import hashlib
+import json
+import threading
+import time
+from dinero import a_centavos, a_pesos
+from conexiones import SesionEnrutada
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': SesionEnrutada})
 
 class TipoDocumento(db.Model):
     __tablename__ = 'tipo_documento'
@@ -18,6 +28,112 @@ class TipoDocumento(db.Model):
         return f'<TipoDocumento {self.codigo}>'
 
 
+# Copia inmutable de un TipoDocumento, independiente de la sesión
+TipoDocumentoRef = namedtuple('TipoDocumentoRef', ['id', 'codigo', 'descripcion'])
+
+
+class CacheTiposDocumento:
+    """
+    Caché en memoria (read-through) de la tabla tipo_documento.
+    Se carga al iniciar, se invalida cuando la sesión confirma cambios
+    sobre TipoDocumento y expira tras `ttl` segundos para recoger cambios
+    hechos por otros procesos.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._datos = None
+        self._lock = threading.Lock()
+
+    def cargar(self):
+        """Lee la tabla completa y reemplaza el contenido de la caché"""
+        # La versión se lee antes que la tabla: si cambia entre ambas
+        # lecturas, la próxima sincronización recarga de nuevo
+        version = VersionDatos.actual(VERSION_TIPOS_DOCUMENTO)
+        tipos = [
+            TipoDocumentoRef(tipo.id, tipo.codigo, tipo.descripcion)
+            for tipo in db.session.execute(db.select(TipoDocumento).order_by(TipoDocumento.id)).scalars()
+        ]
+        lista = [{'codigo': tipo.codigo, 'descripcion': tipo.descripcion} for tipo in tipos]
+        etag = hashlib.sha1(
+            json.dumps(lista, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+
+        # Se reemplaza de una vez para que los lectores vean un estado consistente
+        self._datos = {
+            'por_id': {tipo.id: tipo for tipo in tipos},
+            'por_codigo': {tipo.codigo: tipo for tipo in tipos},
+            'lista': lista,
+            'etag': etag,
+            'version': version,
+            'cargado': time.monotonic()
+        }
+        return self._datos
+
+    def sincronizar(self, version):
+        """
+        Recarga la caché si version (la fila VERSION_TIPOS_DOCUMENTO de
+        version_datos) no es la que tenía al cargarse
+        """
+        datos = self._datos
+        if datos is None or datos['version'] != version:
+            with self._lock:
+                datos = self._datos
+                if datos is None or datos['version'] != version:
+                    self.cargar()
+
+    def invalidar(self):
+        self._datos = None
+
+    def _obtener(self):
+        datos = self._datos
+        if datos is None or time.monotonic() - datos['cargado'] > self.ttl:
+            with self._lock:
+                datos = self._datos
+                if datos is None or time.monotonic() - datos['cargado'] > self.ttl:
+                    datos = self.cargar()
+        return datos
+
+    def por_codigo(self, codigo):
+        return self._obtener()['por_codigo'].get(codigo)
+
+    def por_id(self, tipo_id):
+        tipo = self._obtener()['por_id'].get(tipo_id)
+        if tipo is None:
+            # Puede ser un tipo recién creado en otro proceso: recargar una vez
+            with self._lock:
+                tipo = self.cargar()['por_id'].get(tipo_id)
+        return tipo
+
+    def lista(self):
+        """Lista de {'codigo', 'descripcion'} y su ETag"""
+        datos = self._obtener()
+        return datos['lista'], datos['etag']
+
+
+tipos_documento = CacheTiposDocumento()
+
+
+@event.listens_for(TipoDocumento, 'after_insert')
+@event.listens_for(TipoDocumento, 'after_update')
+@event.listens_for(TipoDocumento, 'after_delete')
+def _marcar_tipos_documento_modificados(mapper, connection, target):
+    sesion = Session.object_session(target)
+    if sesion is not None:
+        sesion.info['tipos_documento_modificados'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_tipos_documento(sesion):
+    if sesion.info.pop('tipos_documento_modificados', False):
+        tipos_documento.invalidar()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_tipos_documento_modificados(sesion):
+    sesion.info.pop('tipos_documento_modificados', None)
+
+
 class Cliente(db.Model):
     __tablename__ = 'cliente'
     
@@ -33,10 +149,15 @@ class Cliente(db.Model):
     # Relación
     compras = db.relationship('Compra', backref='cliente', lazy=True)
     
+    __table_args__ = (
+        # Búsqueda por tipo y número de documento (ver migraciones.py)
+        db.Index('ix_cliente_tipo_numero', 'tipo_documento_id', 'numero_documento'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
-            'tipo_documento': self.tipo_documento.descripcion,
+            'tipo_documento': tipos_documento.por_id(self.tipo_documento_id).descripcion,
             'numero_documento': self.numero_documento,
             'nombre': self.nombre,
             'apellido': self.apellido,
@@ -55,10 +176,30 @@ class Compra(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     cliente_id = db.Column(db.Integer, db.ForeignKey('cliente.id'), nullable=False)
     fecha_compra = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    monto = db.Column(db.Float, nullable=False)
+    monto_centavos = db.Column(db.Integer, nullable=False)  # COP en centavos (exacto)
     descripcion = db.Column(db.String(200))
     numero_factura = db.Column(db.String(50), unique=True)
     
+    __table_args__ = (
+        # Compras de un cliente, opcionalmente por rango de fechas
+        db.Index('ix_compra_cliente_fecha', 'cliente_id', 'fecha_compra'),
+        # Ventanas de fechas de todos los clientes sin leer la tabla (índice de cobertura)
+        db.Index('ix_compra_fecha_cliente_monto', 'fecha_compra', 'cliente_id', 'monto_centavos'),
+    )
+    
+    @hybrid_property
+    def monto(self):
+        """Monto en pesos, derivado de monto_centavos"""
+        return a_pesos(self.monto_centavos)
+    
+    @monto.setter
+    def monto(self, valor):
+        self.monto_centavos = a_centavos(valor)
+    
+    @monto.expression
+    def monto(cls):
+        return cls.monto_centavos / 100.0
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -69,4 +210,175 @@ class Compra(db.Model):
         }
     
     def __repr__(self):
-        return f'<Compra {self.numero_factura}>'
\ No newline at end of file
+        return f'<Compra {self.numero_factura}>'
+
+
+class ResumenCompraDiaria(db.Model):
+    """
+    Acumulado diario de compras por cliente. Se mantiene con triggers
+    sobre la tabla compra, de modo que cualquier escritura (ORM o SQL)
+    lo actualiza. Se puede reconstruir con data/reconstruir_resumen.py.
+    """
+    __tablename__ = 'resumen_compra_diaria'
+    
+    cliente_id = db.Column(db.Integer, db.ForeignKey('cliente.id'), primary_key=True)
+    dia = db.Column(db.Date, primary_key=True)
+    total_centavos = db.Column(db.Integer, nullable=False, default=0)
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        # Índice de cobertura para sumar una ventana de días de todos los clientes
+        db.Index('ix_resumen_dia_cliente', 'dia', 'cliente_id', 'total_centavos', 'cantidad'),
+    )
+    
+    def __repr__(self):
+        return f'<ResumenCompraDiaria {self.cliente_id} {self.dia}>'
+
+
+# Triggers que mantienen resumen_compra_diaria al insertar, actualizar o borrar compras
+TRIGGERS_RESUMEN = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_resumen_compra_insert
+    AFTER INSERT ON compra
+    BEGIN
+        INSERT INTO resumen_compra_diaria (cliente_id, dia, total_centavos, cantidad)
+        VALUES (NEW.cliente_id, date(NEW.fecha_compra), NEW.monto_centavos, 1)
+        ON CONFLICT (cliente_id, dia) DO UPDATE SET
+            total_centavos = total_centavos + excluded.total_centavos,
+            cantidad = cantidad + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_resumen_compra_delete
+    AFTER DELETE ON compra
+    BEGIN
+        UPDATE resumen_compra_diaria
+        SET total_centavos = total_centavos - OLD.monto_centavos, cantidad = cantidad - 1
+        WHERE cliente_id = OLD.cliente_id AND dia = date(OLD.fecha_compra);
+        DELETE FROM resumen_compra_diaria
+        WHERE cliente_id = OLD.cliente_id AND dia = date(OLD.fecha_compra) AND cantidad <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_resumen_compra_update
+    AFTER UPDATE OF cliente_id, fecha_compra, monto_centavos ON compra
+    BEGIN
+        UPDATE resumen_compra_diaria
+        SET total_centavos = total_centavos - OLD.monto_centavos, cantidad = cantidad - 1
+        WHERE cliente_id = OLD.cliente_id AND dia = date(OLD.fecha_compra);
+        DELETE FROM resumen_compra_diaria
+        WHERE cliente_id = OLD.cliente_id AND dia = date(OLD.fecha_compra) AND cantidad <= 0;
+        INSERT INTO resumen_compra_diaria (cliente_id, dia, total_centavos, cantidad)
+        VALUES (NEW.cliente_id, date(NEW.fecha_compra), NEW.monto_centavos, 1)
+        ON CONFLICT (cliente_id, dia) DO UPDATE SET
+            total_centavos = total_centavos + excluded.total_centavos,
+            cantidad = cantidad + 1;
+    END
+    """,
+]
+
+
+
+# Filas de version_datos: la global avanza con cada cambio en cliente, compra
+# o tipo_documento; la de tipo_documento solo con cambios en esa tabla
+VERSION_DATOS = 1
+VERSION_TIPOS_DOCUMENTO = 2
+
+
+class VersionDatos(db.Model):
+    """
+    Marcadores de versión de los datos: contadores que avanzan con cada
+    cambio en sus tablas (vía triggers), ver VERSION_DATOS y
+    VERSION_TIPOS_DOCUMENTO. Sirven como llave barata para cachés
+    derivadas de esos datos.
+    """
+    __tablename__ = 'version_datos'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    actualizado_en = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @staticmethod
+    def actual(fila=VERSION_DATOS):
+        """Retorna la versión actual de los datos (o de la fila indicada)"""
+        return db.session.scalar(db.select(VersionDatos.version).where(VersionDatos.id == fila)) or 0
+    
+    def __repr__(self):
+        return f'<VersionDatos {self.version}>'
+
+
+def _triggers_version(tabla, filas=(VERSION_DATOS,)):
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_version_{tabla}_{operacion.lower()}
+        AFTER {operacion} ON {tabla}
+        BEGIN
+            UPDATE version_datos
+            SET version = version + 1, actualizado_en = CURRENT_TIMESTAMP
+            WHERE id IN ({', '.join(str(fila) for fila in filas)});
+        END
+        """
+        for operacion in ('INSERT', 'UPDATE', 'DELETE')
+    ]
+
+
+# Filas de version_datos y triggers que las avanzan
+TRIGGERS_VERSION = [
+    *(
+        f"INSERT OR IGNORE INTO version_datos (id, version, actualizado_en) VALUES ({fila}, 0, CURRENT_TIMESTAMP)"
+        for fila in (VERSION_DATOS, VERSION_TIPOS_DOCUMENTO)
+    ),
+    *_triggers_version('cliente'),
+    *_triggers_version('compra'),
+    *_triggers_version('tipo_documento', (VERSION_DATOS, VERSION_TIPOS_DOCUMENTO)),
+]
+
+# Índice de texto completo (FTS5) sobre los datos de contacto del cliente.
+# Tabla de contenido externo: solo guarda el índice y lee las columnas de
+# cliente por rowid. unicode61 con remove_diacritics hace que "perez" encuentre
+# "Pérez"; prefix='2 3' indexa los prefijos cortos de la búsqueda incremental.
+# El rango por defecto es bm25 con más peso para nombre y apellido.
+TABLA_BUSQUEDA_CLIENTE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS cliente_busqueda USING fts5(
+        nombre, apellido, correo, telefono,
+        content='cliente', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    "INSERT INTO cliente_busqueda (cliente_busqueda, rank) VALUES ('rank', 'bm25(4.0, 4.0, 2.0, 1.0)')",
+]
+
+# Triggers que mantienen cliente_busqueda al insertar, actualizar o borrar clientes
+TRIGGERS_BUSQUEDA = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_busqueda_cliente_insert
+    AFTER INSERT ON cliente
+    BEGIN
+        INSERT INTO cliente_busqueda (rowid, nombre, apellido, correo, telefono)
+        VALUES (NEW.id, NEW.nombre, NEW.apellido, NEW.correo, NEW.telefono);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_busqueda_cliente_delete
+    AFTER DELETE ON cliente
+    BEGIN
+        INSERT INTO cliente_busqueda (cliente_busqueda, rowid, nombre, apellido, correo, telefono)
+        VALUES ('delete', OLD.id, OLD.nombre, OLD.apellido, OLD.correo, OLD.telefono);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_busqueda_cliente_update
+    AFTER UPDATE OF id, nombre, apellido, correo, telefono ON cliente
+    BEGIN
+        INSERT INTO cliente_busqueda (cliente_busqueda, rowid, nombre, apellido, correo, telefono)
+        VALUES ('delete', OLD.id, OLD.nombre, OLD.apellido, OLD.correo, OLD.telefono);
+        INSERT INTO cliente_busqueda (rowid, nombre, apellido, correo, telefono)
+        VALUES (NEW.id, NEW.nombre, NEW.apellido, NEW.correo, NEW.telefono);
+    END
+    """,
+]
+
+# Se crean después de todas las tablas (IF NOT EXISTS: también en bases existentes)
+for _trigger in TRIGGERS_RESUMEN + TRIGGERS_VERSION + TABLA_BUSQUEDA_CLIENTE + TRIGGERS_BUSQUEDA:
+    event.listen(db.metadata, 'after_create', DDL(_trigger))
\ No newline at end of file
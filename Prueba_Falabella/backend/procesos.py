@@ -0,0 +1,92 @@
+# backend/procesos.py
+# Utilidades para el estado compartido entre procesos (p. ej. workers de
+# gunicorn) de trabajos.py, metricas.py y retencion.py: un hilo de fondo por
+# proceso, bloqueo de un archivo entre procesos y si un pid sigue vivo. Aquí
+# se resuelven el fork (los hilos no sobreviven) y Windows (sin fcntl ni
+# os.kill(pid, 0)).
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Sin flock (Windows) los bloqueos solo excluyen a los hilos del proceso
+    fcntl = None
+
+# Un lock por archivo: flock no excluye dos aperturas del mismo proceso en
+# todas las plataformas, y sin fcntl es la única exclusión disponible
+_locks_archivos = {}
+_lock_registro = threading.Lock()
+
+
+class HiloPorProceso:
+    """
+    Hilo daemon que se inicia a lo sumo una vez por proceso. Tras un fork
+    el hijo hereda el objeto pero no el hilo: asegurar() lo inicia de nuevo
+    la primera vez que se llama en el hijo.
+    """
+
+    def __init__(self, objetivo, nombre):
+        self._objetivo = objetivo
+        self._nombre = nombre
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._pid = None
+
+    def activo(self):
+        """True si el hilo está corriendo en este proceso"""
+        return self._pid == os.getpid() and self._hilo is not None and self._hilo.is_alive()
+
+    def asegurar(self):
+        """Inicia el hilo si no está corriendo en este proceso"""
+        if self.activo():
+            return
+        if self._pid != os.getpid():
+            # El lock heredado pudo quedar tomado por un hilo del padre
+            self._lock = threading.Lock()
+        with self._lock:
+            if self.activo():
+                return
+            self._pid = os.getpid()
+            self._hilo = threading.Thread(target=self._objetivo, name=self._nombre, daemon=True)
+            self._hilo.start()
+
+
+@contextmanager
+def bloqueo_archivo(ruta):
+    """
+    Exclusión entre los hilos del proceso y, con flock, entre los procesos
+    que comparten ruta (el archivo se crea si no existe)
+    """
+    ruta = os.path.abspath(ruta)
+    with _lock_registro:
+        lock = _locks_archivos.setdefault(ruta, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        with open(ruta, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def proceso_vivo(pid):
+    """
+    Si existe un proceso con ese pid en esta máquina. Cuando no se puede
+    saber (pid desconocido o Windows, donde os.kill terminaría el proceso)
+    retorna True: el llamador no debe dar por muerto lo que no pudo verificar.
+    """
+    if not pid or os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Existe, pero es de otro usuario
+        return True
+    return True
\ No newline at end of file
@@ -0,0 +1,84 @@
+# backend/reportes.py
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, func
+from models import db
+from dinero import formatear_cop
+from consultas import consulta_clientes_fidelizacion
+from exportacion import COLUMNAS_FIDELIZACION, escribir_excel
+from columnar import FORMATOS_COLUMNARES, escribir_columnar, esquemas
+
+# Cada cuántas filas se reporta el progreso
+INTERVALO_PROGRESO = 1000
+
+
+def _fecha_limite():
+    return datetime.now() - timedelta(days=current_app.config['DIAS_VENTANA_FIDELIZACION'])
+
+
+def parametros_reporte_fidelizacion():
+    """
+    Parámetros que determinan el contenido del reporte (además de los datos):
+    el primer día de la ventana y el umbral. Se usan como llave de caché.
+    """
+    return {
+        'desde': _fecha_limite().date().isoformat(),
+        'umbral': current_app.config['UMBRAL_FIDELIZACION']
+    }
+
+
+def generar_reporte_fidelizacion(filepath, progreso=None, formato='excel'):
+    """
+    Genera el reporte (Excel, Parquet o Arrow) de clientes que superan el
+    umbral de fidelización en la ventana configurada.
+    progreso: función opcional progreso(filas_escritas, total_filas).
+    Retorna el número de clientes escritos; si es 0 no se crea el archivo.
+    """
+    consulta = consulta_clientes_fidelizacion(_fecha_limite(), current_app.config['UMBRAL_FIDELIZACION'])
+
+    total = db.session.scalar(select(func.count()).select_from(consulta.subquery()))
+    if not total:
+        return 0
+
+    # Agrupar y filtrar en la base de datos (GROUP BY + HAVING),
+    # ya ordenado por monto total (descendente)
+    filas = db.session.execute(consulta.execution_options(yield_per=1000))
+
+    if formato in FORMATOS_COLUMNARES:
+        # Columnas tipadas (monto en centavos), un record batch por bloque leído
+        def lotes():
+            escritas = 0
+            for lote in filas.partitions():
+                yield lote
+                escritas += len(lote)
+                if progreso:
+                    progreso(escritas, total)
+
+        return escribir_columnar(filepath, formato, esquemas()['fidelizacion'], lotes())
+
+    def clientes_fidelizar():
+        for escritas, fila in enumerate(filas, start=1):
+            # Formatear monto como moneda
+            yield [
+                fila.tipo_documento,
+                fila.numero_documento,
+                fila.nombre,
+                fila.apellido,
+                fila.correo,
+                fila.telefono,
+                formatear_cop(fila.monto_total_centavos),
+                fila.numero_compras
+            ]
+            if progreso and escritas % INTERVALO_PROGRESO == 0:
+                progreso(escritas, total)
+
+    # Crear archivo Excel (ancho de columnas calculado con una muestra)
+    escribir_excel(
+        filepath,
+        [('Clientes a Fidelizar', COLUMNAS_FIDELIZACION, clientes_fidelizar())],
+        ajustar_anchos=True
+    )
+
+    if progreso:
+        progreso(total, total)
+    return total
\ No newline at end of file
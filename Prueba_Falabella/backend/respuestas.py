@@ -0,0 +1,230 @@
+# backend/respuestas.py
+# Respuestas HTTP de los endpoints JSON: peticiones condicionales (ETag y
+# Last-Modified derivados de version_datos), compresión gzip/brotli según
+# Accept-Encoding y serialización con orjson. brotli y orjson son opcionales:
+# sin ellos se usa solo gzip y el serializador por defecto de Flask.
+import functools
+import gzip
+import hashlib
+import importlib.util
+import json
+from datetime import datetime, date, time, timezone
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import is_resource_modified
+from models import db, VersionDatos, VERSION_DATOS, VERSION_TIPOS_DOCUMENTO, tipos_documento
+from metricas import registro
+
+# Tipos de contenido que se comprimen (respuestas en memoria, no en streaming)
+TIPOS_COMPRIMIBLES = ('application/json',)
+
+respuestas_no_modificadas = registro.contador(
+    'http_respuestas_no_modificadas_total', 'Respuestas 304 por endpoint', ('endpoint',)
+)
+respuestas_comprimidas = registro.contador(
+    'http_respuestas_comprimidas_total', 'Respuestas comprimidas por codificación', ('codificacion',)
+)
+bytes_respuestas = registro.contador(
+    'http_respuestas_comprimidas_bytes_total', 'Bytes de las respuestas comprimidas antes y después',
+    ('codificacion', 'etapa')
+)
+
+
+def brotli_disponible():
+    """True si el módulo brotli está instalado"""
+    return importlib.util.find_spec('brotli') is not None
+
+
+def orjson_disponible():
+    """True si orjson está instalado"""
+    return importlib.util.find_spec('orjson') is not None
+
+
+# ==================== Peticiones condicionales ====================
+
+def _version_datos():
+    """
+    (versión, fecha de la última modificación en UTC, versión de
+    tipo_documento) de version_datos, en una sola consulta
+    """
+    filas = {
+        fila.id: fila for fila in db.session.execute(
+            db.select(VersionDatos.id, VersionDatos.version, VersionDatos.actualizado_en)
+            .where(VersionDatos.id.in_((VERSION_DATOS, VERSION_TIPOS_DOCUMENTO)))
+        )
+    }
+    datos, tipos = filas.get(VERSION_DATOS), filas.get(VERSION_TIPOS_DOCUMENTO)
+    version_tipos = tipos.version if tipos is not None else 0
+    if datos is None:
+        return 0, None, version_tipos
+    actualizado_en = datos.actualizado_en.replace(tzinfo=timezone.utc) if datos.actualizado_en else None
+    return datos.version, actualizado_en, version_tipos
+
+
+def _huella_config(app):
+    """Hash de la configuración de la aplicación (umbrales, límites, etc.), calculado una vez"""
+    huella = app.extensions.get('huella_config')
+    if huella is None:
+        crudo = json.dumps(sorted((nombre, repr(valor)) for nombre, valor in app.config.items()))
+        huella = app.extensions['huella_config'] = hashlib.sha1(crudo.encode('utf-8')).hexdigest()
+    return huella
+
+
+def condicional(por_dia=False):
+    """
+    Soporte de If-None-Match / If-Modified-Since para vistas GET cuyo
+    resultado depende solo de los datos de cliente, compra y tipo_documento.
+    El ETag (débil) se calcula antes de ejecutar la vista a partir de la
+    versión de los datos (version_datos, igual en todos los procesos), la
+    configuración y, con por_dia, el día actual (ventanas relativas a hoy);
+    la URL ya distingue los parámetros. Si el cliente tiene esa versión se
+    responde 304 sin ejecutar las consultas. Si no, la caché de tipos de
+    documento se recarga solo si cambió la versión de tipo_documento.
+    Debe aplicarse después de @solo_lectura.
+    """
+    def decorador(vista):
+        @functools.wraps(vista)
+        def envoltura(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return vista(*args, **kwargs)
+
+            version, modificado, version_tipos = _version_datos()
+            partes = [request.endpoint, version, _huella_config(current_app)]
+            if por_dia:
+                hoy = date.today()
+                partes.append(hoy.isoformat())
+                # La respuesta cambia a medianoche aunque los datos no cambien
+                medianoche = datetime.combine(hoy, time()).astimezone(timezone.utc)
+                modificado = max(modificado, medianoche) if modificado else medianoche
+            etag = hashlib.sha1(json.dumps(partes, default=str).encode('utf-8')).hexdigest()[:32]
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=modificado):
+                respuesta = current_app.response_class(status=304)
+                respuestas_no_modificadas.inc(endpoint=request.endpoint)
+            else:
+                tipos_documento.sincronizar(version_tipos)
+                respuesta = current_app.make_response(vista(*args, **kwargs))
+                if respuesta.status_code != 200:
+                    return respuesta
+
+            respuesta.set_etag(etag, weak=True)
+            if modificado is not None:
+                respuesta.last_modified = modificado
+            # El navegador guarda la respuesta pero la revalida en cada uso
+            respuesta.cache_control.private = True
+            respuesta.cache_control.no_cache = True
+            return respuesta
+        return envoltura
+    return decorador
+
+
+# ==================== Compresión ====================
+
+class Compresion:
+    """
+    Comprime las respuestas JSON en memoria de al menos COMPRESION_MIN_BYTES
+    con brotli (si está instalado y el cliente lo acepta) o gzip, según
+    Accept-Encoding. Las respuestas en streaming y los archivos se envían
+    tal cual. Un ETag fuerte pasa a débil, ya que el cuerpo deja de ser
+    idéntico byte a byte.
+    """
+
+    def __init__(self, app=None):
+        self.brotli = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config['COMPRESION']:
+            return
+        if brotli_disponible():
+            import brotli
+            self.brotli = brotli
+        app.after_request(self._comprimir)
+
+    def codificacion(self, aceptadas):
+        """Codificación preferida por el cliente entre las disponibles (o None)"""
+        calidad_br = aceptadas.quality('br') if self.brotli is not None else 0
+        calidad_gzip = aceptadas.quality('gzip')
+        if calidad_br > 0 and calidad_br >= calidad_gzip:
+            return 'br'
+        if calidad_gzip > 0:
+            return 'gzip'
+        return None
+
+    def _comprimir(self, response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.mimetype not in TIPOS_COMPRIMIBLES
+                or not 200 <= response.status_code < 300 or response.status_code == 204
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        cuerpo = response.get_data()
+        if len(cuerpo) < current_app.config['COMPRESION_MIN_BYTES']:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        codificacion = self.codificacion(request.accept_encodings)
+        if codificacion is None:
+            return response
+
+        if codificacion == 'br':
+            comprimido = self.brotli.compress(cuerpo, quality=current_app.config['COMPRESION_CALIDAD_BROTLI'])
+        else:
+            comprimido = gzip.compress(cuerpo, compresslevel=current_app.config['COMPRESION_NIVEL_GZIP'], mtime=0)
+
+        response.set_data(comprimido)
+        response.headers['Content-Encoding'] = codificacion
+        etag, debil = response.get_etag()
+        if etag and not debil:
+            response.set_etag(etag, weak=True)
+
+        respuestas_comprimidas.inc(codificacion=codificacion)
+        bytes_respuestas.inc(len(cuerpo), codificacion=codificacion, etapa='original')
+        bytes_respuestas.inc(len(comprimido), codificacion=codificacion, etapa='comprimido')
+        return response
+
+
+compresion = Compresion()
+
+
+# ==================== Serialización JSON ====================
+
+class ProveedorJSONRapido(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask que serializa con orjson. Mantiene el orden de
+    llaves (sort_keys) y la conversión de fechas, Decimal, UUID y dataclasses
+    del proveedor por defecto; la salida va en UTF-8 en lugar de escapes
+    ASCII. Si orjson no puede serializar un valor (p. ej. enteros de más de
+    64 bits) o se piden opciones de json.dumps, usa el proveedor por defecto.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        import orjson
+        self._orjson = orjson
+        self._opciones = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            self._opciones |= orjson.OPT_SORT_KEYS
+
+    def _serializar(self, obj):
+        """bytes de obj en JSON compacto, o None si orjson no puede serializarlo"""
+        try:
+            return self._orjson.dumps(obj, default=self.default, option=self._opciones)
+        except self._orjson.JSONEncodeError:
+            return None
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            datos = self._serializar(obj)
+            if datos is not None:
+                return datos.decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        compacto = self.compact if self.compact is not None else not self._app.debug
+        datos = self._serializar(obj) if compacto else None
+        if datos is None:
+            return super().response(obj)
+        return self._app.response_class(datos + b'\n', mimetype=self.mimetype)
\ No newline at end of file
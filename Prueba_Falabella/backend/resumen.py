@@ -0,0 +1,55 @@
+# backend/resumen.py
+from sqlalchemy import text, func, select
+from models import db, Cliente, TRIGGERS_RESUMEN
+
+
+def asegurar_triggers():
+    """Crea (si no existen) los triggers que mantienen el resumen diario"""
+    for trigger in TRIGGERS_RESUMEN:
+        db.session.execute(text(trigger))
+    db.session.commit()
+
+
+def reconstruir_resumen(tamano_lote=10_000, progreso=None):
+    """
+    Reconstruye resumen_compra_diaria desde la tabla compra por lotes de
+    clientes. Cada lote se borra y se recalcula en su propia transacción,
+    así las compras que entren durante la reconstrucción no se pierden
+    ni se cuentan dos veces.
+    Retorna el número de filas de resumen generadas.
+    """
+    asegurar_triggers()
+
+    max_id = db.session.scalar(select(func.max(Cliente.id))) or 0
+    filas = 0
+
+    for desde in range(0, max_id + 1, tamano_lote):
+        hasta = desde + tamano_lote
+        db.session.execute(
+            text('DELETE FROM resumen_compra_diaria WHERE cliente_id >= :desde AND cliente_id < :hasta'),
+            {'desde': desde, 'hasta': hasta}
+        )
+        resultado = db.session.execute(
+            text("""
+                INSERT INTO resumen_compra_diaria (cliente_id, dia, total_centavos, cantidad)
+                SELECT cliente_id, date(fecha_compra), SUM(monto_centavos), COUNT(*)
+                FROM compra
+                WHERE cliente_id >= :desde AND cliente_id < :hasta
+                GROUP BY cliente_id, date(fecha_compra)
+            """),
+            {'desde': desde, 'hasta': hasta}
+        )
+        db.session.commit()
+        filas += resultado.rowcount
+
+        if progreso:
+            progreso(min(hasta, max_id), max_id)
+
+    # Quitar filas huérfanas de clientes que ya no existen
+    db.session.execute(
+        text('DELETE FROM resumen_compra_diaria WHERE cliente_id > :max_id'),
+        {'max_id': max_id}
+    )
+    db.session.commit()
+
+    return filas
\ No newline at end of file
@@ -0,0 +1,235 @@
+# backend/retencion.py
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from metricas import registro
+from procesos import HiloPorProceso
+
+logger = logging.getLogger('retencion')
+
+# Archivos en escritura (cache_artefactos) y lápidas de un borrado interrumpido
+SUFIJO_TEMPORAL = '.tmp'
+SUFIJO_LAPIDA = '.borrando'
+
+# Motivos de eliminación, en el orden en que se aplican
+MOTIVOS = ('temporal', 'edad', 'cantidad', 'tamano')
+
+archivos_eliminados = registro.contador(
+    'retencion_archivos_eliminados_total', 'Archivos eliminados de la carpeta de exportaciones', ('motivo',)
+)
+bytes_liberados = registro.contador(
+    'retencion_bytes_liberados_total', 'Bytes liberados en la carpeta de exportaciones', ('motivo',)
+)
+barridos = registro.contador(
+    'retencion_barridos_total', 'Barridos de la carpeta de exportaciones', ('origen',)
+)
+duracion_barridos = registro.histograma(
+    'retencion_barrido_duracion_segundos', 'Duración de los barridos de la carpeta de exportaciones'
+)
+bytes_carpeta = registro.medidor(
+    'retencion_bytes', 'Bytes ocupados en la carpeta de exportaciones'
+)
+archivos_carpeta = registro.medidor(
+    'retencion_archivos', 'Archivos en la carpeta de exportaciones'
+)
+
+
+class Retencion:
+    """
+    Retención de la carpeta de exportaciones (EXPORT_FOLDER). Cada barrido
+    elimina, del menos al más recientemente usado (mtime):
+      - temporales y lápidas abandonados (más viejos que la edad máxima)
+      - archivos más viejos que RETENCION_MAX_EDAD_SEGUNDOS
+      - los que sobran sobre RETENCION_MAX_ARCHIVOS y RETENCION_MAX_BYTES
+    Los usados hace menos de RETENCION_GRACIA_SEGUNDOS nunca se eliminan por
+    cantidad o tamaño: pueden estar a punto de descargarse en otro worker.
+    Los subdirectorios (p. ej. TRABAJOS_FOLDER) no se tocan.
+
+    Con RETENCION_INTERVALO_SEGUNDOS > 0 cada proceso que atiende peticiones
+    barre en un hilo de fondo; además registrar() pide un barrido cuando la
+    estimación de la carpeta supera los límites. data/limpiar_exportaciones.py
+    barre desde la línea de comandos.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._lock_estimacion = threading.Lock()
+        self._despertar = threading.Event()
+        self._hilo = HiloPorProceso(self._bucle, 'retencion')
+        # Estimación de la carpeta desde el último barrido (None = desconocida)
+        self._bytes = None
+        self._archivos = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.carpeta = app.config['EXPORT_FOLDER']
+        self.max_edad = app.config['RETENCION_MAX_EDAD_SEGUNDOS']
+        self.max_bytes = app.config['RETENCION_MAX_BYTES']
+        self.max_archivos = app.config['RETENCION_MAX_ARCHIVOS']
+        self.gracia = app.config['RETENCION_GRACIA_SEGUNDOS']
+        self.intervalo = app.config['RETENCION_INTERVALO_SEGUNDOS']
+
+        if self.intervalo > 0:
+            # En el primer request de cada proceso: con preload_app el maestro
+            # no atiende peticiones y los hilos no sobreviven al fork
+            app.before_request(self._hilo.asegurar)
+
+    # ==================== Hilo de fondo ====================
+
+    def _bucle(self):
+        while True:
+            # Con variación aleatoria para que los workers no barran a la vez
+            self._despertar.wait(self.intervalo * random.uniform(0.9, 1.1))
+            self._despertar.clear()
+            try:
+                self.barrer(origen='hilo')
+            except Exception:
+                logger.exception('Error al barrer %s', self.carpeta)
+
+    def registrar(self, ruta):
+        """
+        Suma un archivo recién publicado a la estimación de la carpeta. Si la
+        estimación supera los límites (o aún no se conoce) pide un barrido al
+        hilo de fondo, o lo hace en el momento si el hilo no está activo.
+        """
+        try:
+            tamano = os.path.getsize(ruta)
+        except OSError:
+            return
+
+        with self._lock_estimacion:
+            if self._bytes is None:
+                excedido = True
+            else:
+                self._bytes += tamano
+                self._archivos += 1
+                excedido = self._bytes > self.max_bytes or self._archivos > self.max_archivos
+
+        if not excedido:
+            return
+        if self._hilo.activo():
+            self._despertar.set()
+        else:
+            self.barrer(origen='limite')
+
+    # ==================== Barrido ====================
+
+    def _listar(self):
+        """(archivos, temporales) de la carpeta como listas de (mtime, tamaño, ruta)"""
+        archivos, temporales = [], []
+        try:
+            entradas = list(os.scandir(self.carpeta))
+        except FileNotFoundError:
+            return archivos, temporales
+
+        for entrada in entradas:
+            try:
+                if not entrada.is_file(follow_symlinks=False):
+                    continue
+                info = entrada.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            destino = temporales if entrada.name.endswith((SUFIJO_TEMPORAL, SUFIJO_LAPIDA)) else archivos
+            destino.append((info.st_mtime, info.st_size, entrada.path))
+
+        archivos.sort()
+        return archivos, temporales
+
+    def barrer(self, origen='manual', simular=False):
+        """
+        Aplica los límites a la carpeta. Con simular=True solo calcula qué se
+        eliminaría. Retorna {'eliminados': {motivo: (archivos, bytes)},
+        'archivos': restantes, 'bytes': bytes restantes, 'duracion': segundos}.
+        """
+        with self._lock:
+            inicio = time.perf_counter()
+            ahora = time.time()
+            archivos, temporales = self._listar()
+            eliminados = {motivo: [0, 0] for motivo in MOTIVOS}
+
+            def eliminar(mtime, tamano, ruta, motivo):
+                if not simular and not self._eliminar(ruta, mtime):
+                    return False
+                eliminados[motivo][0] += 1
+                eliminados[motivo][1] += tamano
+                return True
+
+            # Temporales en curso no se tocan salvo que estén abandonados
+            for mtime, tamano, ruta in temporales:
+                if ahora - mtime > self.max_edad:
+                    eliminar(mtime, tamano, ruta, 'temporal')
+
+            restantes = []
+            for mtime, tamano, ruta in archivos:
+                if not (ahora - mtime > self.max_edad and eliminar(mtime, tamano, ruta, 'edad')):
+                    restantes.append((mtime, tamano, ruta))
+
+            # Del menos al más recientemente usado mientras se superen los límites
+            cantidad = len(restantes)
+            total = sum(tamano for _, tamano, _ in restantes)
+            for mtime, tamano, ruta in restantes:
+                if cantidad > self.max_archivos:
+                    motivo = 'cantidad'
+                elif total > self.max_bytes:
+                    motivo = 'tamano'
+                else:
+                    break
+                if ahora - mtime <= self.gracia:
+                    break
+                if eliminar(mtime, tamano, ruta, motivo):
+                    cantidad -= 1
+                    total -= tamano
+
+            duracion = time.perf_counter() - inicio
+            if not simular:
+                for motivo, (archivos_motivo, liberados) in eliminados.items():
+                    if archivos_motivo:
+                        archivos_eliminados.inc(archivos_motivo, motivo=motivo)
+                        bytes_liberados.inc(liberados, motivo=motivo)
+                barridos.inc(origen=origen)
+                duracion_barridos.observe(duracion)
+                bytes_carpeta.set(total)
+                archivos_carpeta.set(cantidad)
+                with self._lock_estimacion:
+                    self._bytes, self._archivos = total, cantidad
+
+            return {
+                'eliminados': {motivo: tuple(valores) for motivo, valores in eliminados.items()},
+                'archivos': cantidad,
+                'bytes': total,
+                'duracion': duracion,
+            }
+
+    @staticmethod
+    def _eliminar(ruta, mtime):
+        """
+        Elimina ruta si no se usó desde que se listó. Primero la renombra a
+        una lápida (rename atómico): desde ahí nadie puede abrirla por su
+        nombre y quien ya la tenía abierta (una descarga en curso) sigue
+        leyéndola. Si el mtime cambió entre el listado y el rename (un acierto
+        de caché la marcó como usada), se restaura. Retorna True si se eliminó.
+        """
+        directorio, nombre = os.path.split(ruta)
+        lapida = os.path.join(directorio, f'.{nombre}.{uuid.uuid4().hex}{SUFIJO_LAPIDA}')
+        try:
+            os.rename(ruta, lapida)
+        except OSError:
+            # Ya no existe, o está abierta y el sistema no permite renombrarla
+            return False
+
+        try:
+            if os.stat(lapida).st_mtime != mtime:
+                os.replace(lapida, ruta)
+                return False
+            os.remove(lapida)
+        except OSError:
+            # La lápida queda y se elimina como temporal en un barrido posterior
+            return False
+        return True
+
+
+retencion = Retencion()
\ No newline at end of file
@@ -0,0 +1,159 @@
+# backend/segmentacion.py
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, case, or_, and_
+from models import db, TipoDocumento, Cliente, ResumenCompraDiaria
+from dinero import a_centavos
+from consultas import agrupar_sin_indice
+
+
+class Segmentacion:
+    """
+    Segmentación de clientes por ventanas de días y niveles de gasto.
+    niveles: {dias: [(nivel, umbral en COP), ...]} (ver SEGMENTACION_NIVELES).
+    Un cliente queda en el nivel más alto cuyo umbral supera su total.
+
+    Todas las ventanas se calculan en una sola pasada sobre el resumen
+    diario: un GROUP BY por cliente acotado por la ventana más larga, con
+    un SUM(CASE ...) por ventana, y el nivel se asigna con un CASE en SQL.
+    Agregar ventanas o niveles agrega columnas, no recorridos.
+    """
+
+    def __init__(self, niveles, ahora=None):
+        if not niveles:
+            raise ValueError('Debe configurar al menos una ventana')
+        self.niveles = {}
+        for dias, lista in niveles.items():
+            if not isinstance(dias, int) or dias <= 0:
+                raise ValueError(f'Ventana inválida: {dias}')
+            umbrales = [umbral for _, umbral in lista]
+            if umbrales != sorted(set(umbrales)):
+                raise ValueError(f'Los umbrales de la ventana {dias} deben ser crecientes')
+            self.niveles[dias] = list(lista)
+        self.ventanas = sorted(self.niveles)
+        self.ahora = ahora or datetime.now()
+
+    @classmethod
+    def desde_config(cls, config, ventanas=None):
+        """Segmentación con SEGMENTACION_NIVELES, opcionalmente solo con algunas ventanas"""
+        niveles = config['SEGMENTACION_NIVELES']
+        if ventanas:
+            faltantes = [dias for dias in ventanas if dias not in niveles]
+            if faltantes:
+                raise ValueError(
+                    f"Ventanas no configuradas: {', '.join(map(str, faltantes))} "
+                    f"(disponibles: {', '.join(map(str, sorted(niveles)))})"
+                )
+            niveles = {dias: niveles[dias] for dias in ventanas}
+        return cls(niveles)
+
+    def limite(self, dias):
+        """Primer día incluido en la ventana de dias días"""
+        return (self.ahora - timedelta(days=dias)).date()
+
+    def nombres_niveles(self, dias):
+        return [nivel for nivel, _ in self.niveles[dias]]
+
+    def consulta_totales(self):
+        """Total en centavos y número de compras por cliente y ventana (total_<dias>, compras_<dias>)"""
+        resumen = ResumenCompraDiaria
+        columnas = [resumen.cliente_id.label('cliente_id')]
+        for dias in self.ventanas:
+            en_ventana = resumen.dia >= self.limite(dias)
+            columnas += [
+                func.sum(case((en_ventana, resumen.total_centavos), else_=0)).label(f'total_{dias}'),
+                func.sum(case((en_ventana, resumen.cantidad), else_=0)).label(f'compras_{dias}'),
+            ]
+        return (
+            select(*columnas)
+            .where(resumen.dia >= self.limite(self.ventanas[-1]))
+            .group_by(agrupar_sin_indice(resumen.cliente_id))
+        )
+
+    def consulta_segmentos(self):
+        """Totales por ventana más el nivel de cada una (nivel_<dias>, NULL si no alcanza ninguno)"""
+        totales = self.consulta_totales().subquery()
+        columnas = [totales.c.cliente_id]
+        for dias in self.ventanas:
+            total = totales.c[f'total_{dias}']
+            # Del umbral más alto al más bajo: gana el primero que se supera
+            nivel = case(
+                *[(total > a_centavos(umbral), nombre) for nombre, umbral in reversed(self.niveles[dias])],
+                else_=None
+            )
+            columnas += [total, totales.c[f'compras_{dias}'], nivel.label(f'nivel_{dias}')]
+        return select(*columnas)
+
+    def resumen(self):
+        """
+        {dias: {nivel: {'clientes': n, 'total_centavos': suma}}} de todas las
+        ventanas con una sola consulta (agrupada por combinación de niveles)
+        """
+        segmentos = self.consulta_segmentos().subquery()
+        niveles = [segmentos.c[f'nivel_{dias}'] for dias in self.ventanas]
+        consulta = select(
+            *niveles,
+            func.count().label('clientes'),
+            *[func.sum(segmentos.c[f'total_{dias}']) for dias in self.ventanas]
+        ).group_by(*niveles)
+
+        resultado = {
+            dias: {nivel: {'clientes': 0, 'total_centavos': 0} for nivel in self.nombres_niveles(dias)}
+            for dias in self.ventanas
+        }
+        n = len(self.ventanas)
+        for fila in db.session.execute(consulta):
+            for i, dias in enumerate(self.ventanas):
+                nivel = fila[i]
+                if nivel is not None:
+                    resultado[dias][nivel]['clientes'] += fila.clientes
+                    resultado[dias][nivel]['total_centavos'] += fila[n + 1 + i]
+        return resultado
+
+    def consulta_clientes(self, dias, nivel=None, limite=50, despues_de=None):
+        """
+        Página de clientes con compras en la ventana dias (opcionalmente solo
+        los del nivel dado), ordenada por su total en esa ventana (descendente)
+        con Cliente.id como desempate. Cada fila trae todas las ventanas.
+        despues_de: tupla (total_centavos, id) de la última fila de la página anterior.
+        """
+        if dias not in self.niveles:
+            raise ValueError(f'Ventana no configurada: {dias}')
+        if nivel is not None and nivel not in self.nombres_niveles(dias):
+            raise ValueError(
+                f"Nivel inválido para la ventana {dias}: {nivel} "
+                f"(disponibles: {', '.join(self.nombres_niveles(dias))})"
+            )
+
+        segmentos = self.consulta_segmentos().subquery()
+        total = segmentos.c[f'total_{dias}']
+
+        consulta = (
+            select(
+                Cliente.id,
+                TipoDocumento.descripcion.label('tipo_documento'),
+                TipoDocumento.codigo.label('codigo_tipo'),
+                Cliente.numero_documento,
+                Cliente.nombre,
+                Cliente.apellido,
+                Cliente.correo,
+                Cliente.telefono,
+                *[columna for columna in segmentos.c if columna.name != 'cliente_id']
+            )
+            .join(Cliente, Cliente.id == segmentos.c.cliente_id)
+            .join(TipoDocumento, TipoDocumento.id == Cliente.tipo_documento_id)
+        )
+
+        if nivel is not None:
+            consulta = consulta.where(segmentos.c[f'nivel_{dias}'] == nivel)
+        else:
+            consulta = consulta.where(segmentos.c[f'compras_{dias}'] > 0)
+
+        # Paginación por llave (keyset): continuar después de la última fila vista
+        if despues_de is not None:
+            total_cursor, id_cursor = despues_de
+            consulta = consulta.where(or_(
+                total < total_cursor,
+                and_(total == total_cursor, Cliente.id < id_cursor)
+            ))
+
+        return consulta.order_by(total.desc(), Cliente.id.desc()).limit(limite)
\ No newline at end of file
@@ -0,0 +1,45 @@
+# backend/servidor.py
+"""
+Lanza la API con gunicorn usando gunicorn.conf.py.
+
+Uso:
+    python servidor.py --workers 4 --threads 2 --bind 0.0.0.0:5000
+
+Para desarrollo sigue disponible `python app.py` (servidor de Flask).
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor de producción (gunicorn)')
+    parser.add_argument('--workers', type=int, help='Procesos worker (default: 2 x CPU + 1)')
+    parser.add_argument('--threads', type=int, help='Hilos por worker (default: 1)')
+    parser.add_argument('--bind', help='Dirección de escucha (default: 0.0.0.0:5000)')
+    parser.add_argument('--max-requests', type=int, help='Peticiones antes de reciclar un worker (default: 1000)')
+    args = parser.parse_args()
+
+    if importlib.util.find_spec('gunicorn') is None:
+        print('❌ gunicorn no está instalado (pip install -r requirements.txt)')
+        sys.exit(1)
+
+    opciones = {
+        'GUNICORN_WORKERS': args.workers,
+        'GUNICORN_THREADS': args.threads,
+        'GUNICORN_BIND': args.bind,
+        'GUNICORN_MAX_REQUESTS': args.max_requests,
+    }
+    for nombre, valor in opciones.items():
+        if valor is not None:
+            os.environ[nombre] = str(valor)
+
+    os.chdir(DIRECTORIO)
+    os.execvp(sys.executable, [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'])
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,291 @@
+# backend/trabajos.py
+import json
+import hashlib
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from procesos import HiloPorProceso, bloqueo_archivo, proceso_vivo
+
+
+class ColaLlena(Exception):
+    """Se lanza cuando la cola de trabajos alcanzó su capacidad máxima"""
+
+
+class Trabajo:
+    PENDIENTE = 'pendiente'
+    EJECUTANDO = 'ejecutando'
+    COMPLETADO = 'completado'
+    ERROR = 'error'
+
+    def __init__(self, tipo, parametros, clave):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.parametros = parametros
+        self.clave = clave
+        self.estado = Trabajo.PENDIENTE
+        self.progreso = 0.0
+        self.creado = time.time()
+        self.terminado = None
+        self.filepath = None
+        self.filename = None
+        self.mensaje = None
+        self.error = None
+        # Proceso dueño y último latido, para detectar trabajos huérfanos
+        self.pid = os.getpid()
+        self.host = socket.gethostname()
+        self.latido = self.creado
+
+    @property
+    def activo(self):
+        return self.estado in (Trabajo.PENDIENTE, Trabajo.EJECUTANDO)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tipo': self.tipo,
+            'estado': self.estado,
+            'progreso': round(self.progreso, 3),
+            'mensaje': self.mensaje,
+            'error': self.error,
+            'disponible': self.estado == Trabajo.COMPLETADO and self.filepath is not None
+        }
+
+    # Atributos guardados en el archivo de estado del trabajo
+    _PERSISTENTES = (
+        'id', 'tipo', 'parametros', 'clave', 'estado', 'progreso', 'creado',
+        'terminado', 'filepath', 'filename', 'mensaje', 'error', 'pid', 'host', 'latido'
+    )
+
+    def a_estado(self):
+        return {nombre: getattr(self, nombre) for nombre in self._PERSISTENTES}
+
+    @classmethod
+    def desde_estado(cls, estado):
+        trabajo = cls.__new__(cls)
+        for nombre in cls._PERSISTENTES:
+            setattr(trabajo, nombre, estado.get(nombre))
+        return trabajo
+
+    def __repr__(self):
+        return f'<Trabajo {self.tipo} {self.id} {self.estado}>'
+
+
+class ColaTrabajos:
+    """
+    Cola de trabajos en segundo plano sobre un pool de hilos local.
+    - Acotada: como máximo TRABAJOS_MAX_PENDIENTES trabajos activos.
+    - Deduplicada: una solicitud idéntica (mismo tipo y parámetros) a un
+      trabajo activo de cualquier proceso devuelve ese mismo trabajo.
+    - Los trabajos terminados se conservan TRABAJOS_RETENCION_SEGUNDOS.
+    - El estado de cada trabajo se guarda en TRABAJOS_FOLDER, así cualquier
+      proceso (p. ej. otro worker de gunicorn) puede consultarlo.
+    - El proceso dueño renueva el latido de sus trabajos activos cada
+      TRABAJOS_LATIDO_SEGUNDOS; un trabajo activo cuyo dueño murió o dejó de
+      latir por TRABAJOS_LATIDO_MAX_SEGUNDOS se marca como error al leerlo.
+    """
+
+    def __init__(self, app=None):
+        self._trabajos = {}
+        self._lock = threading.Lock()
+        self._lock_guardar = threading.Lock()
+        self._executor = None
+        # El latido corre en el proceso que ejecuta los trabajos
+        self._latido = HiloPorProceso(self._latir, 'trabajos-latido')
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.max_pendientes = app.config['TRABAJOS_MAX_PENDIENTES']
+        self.retencion = app.config['TRABAJOS_RETENCION_SEGUNDOS']
+        self.carpeta = app.config['TRABAJOS_FOLDER']
+        self.intervalo_latido = app.config['TRABAJOS_LATIDO_SEGUNDOS']
+        self.latido_max = app.config['TRABAJOS_LATIDO_MAX_SEGUNDOS']
+        # Un archivo por clave activa (contiene el id del trabajo), compartido
+        # entre procesos; _purgar solo recorre los archivos de self.carpeta
+        self.carpeta_claves = os.path.join(self.carpeta, 'claves')
+        os.makedirs(self.carpeta_claves, exist_ok=True)
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config['TRABAJOS_MAX_WORKERS'],
+            thread_name_prefix='trabajos'
+        )
+
+    def encolar(self, tipo, parametros, funcion):
+        """
+        Encola funcion(trabajo) para ejecutarse en el pool.
+        Retorna (trabajo, nuevo); nuevo es False si se reutilizó un trabajo activo.
+        Lanza ColaLlena si no hay capacidad.
+        """
+        clave = f'{tipo}:{json.dumps(parametros, sort_keys=True)}'
+        ruta_clave = self._ruta_clave(clave)
+        self._latido.asegurar()
+
+        with self._bloqueo():
+            self._purgar()
+
+            activos = self._activos()
+            if ruta_clave in activos:
+                return activos[ruta_clave], False
+
+            if len(activos) >= self.max_pendientes:
+                raise ColaLlena('La cola de trabajos está llena, intente más tarde')
+
+            trabajo = Trabajo(tipo, parametros, clave)
+            self._trabajos[trabajo.id] = trabajo
+            self.guardar(trabajo)
+            self._escribir(ruta_clave, trabajo.id)
+
+        self._executor.submit(self._ejecutar, trabajo, funcion)
+        return trabajo, True
+
+    def obtener(self, trabajo_id):
+        """
+        Trabajo de este proceso o, si lo creó otro, el último estado guardado.
+        Un trabajo activo huérfano (dueño muerto o sin latido) se marca como error.
+        """
+        trabajo = self._trabajos.get(trabajo_id)
+        if trabajo is not None:
+            return trabajo
+        try:
+            with open(self._ruta(trabajo_id), encoding='utf-8') as f:
+                trabajo = Trabajo.desde_estado(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+        if self._huerfano(trabajo):
+            trabajo.estado = Trabajo.ERROR
+            trabajo.error = 'El proceso que ejecutaba el trabajo terminó antes de completarlo'
+            trabajo.terminado = time.time()
+            self.guardar(trabajo)
+        return trabajo
+
+    def guardar(self, trabajo):
+        """
+        Escribe el estado del trabajo de forma atómica (archivo temporal + rename).
+        Si el trabajo es de este proceso, renueva además su latido.
+        """
+        ruta = self._ruta(trabajo.id)
+        temporal = f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+        # Serializado: el hilo de latido no debe pisar un estado más nuevo
+        with self._lock_guardar:
+            if trabajo.id in self._trabajos:
+                trabajo.latido = time.time()
+            self._escribir(ruta, json.dumps(trabajo.a_estado()), temporal)
+
+    @staticmethod
+    def _escribir(ruta, contenido, temporal=None):
+        temporal = temporal or f'{ruta}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(contenido)
+        os.replace(temporal, ruta)
+
+    @contextmanager
+    def _bloqueo(self):
+        """Exclusión entre hilos y, con flock, entre procesos que comparten la carpeta"""
+        with self._lock, bloqueo_archivo(os.path.join(self.carpeta_claves, '.lock')):
+            yield
+
+    def _ruta_clave(self, clave):
+        return os.path.join(self.carpeta_claves, hashlib.sha1(clave.encode('utf-8')).hexdigest())
+
+    def _activos(self):
+        """
+        {ruta de la clave: trabajo} de los trabajos activos de todos los procesos.
+        Elimina las claves de trabajos terminados o huérfanos (requiere _bloqueo).
+        """
+        activos = {}
+        with os.scandir(self.carpeta_claves) as entradas:
+            for entrada in entradas:
+                if entrada.name.startswith('.'):
+                    continue
+                try:
+                    with open(entrada.path, encoding='utf-8') as f:
+                        trabajo = self.obtener(f.read())
+                    if trabajo is not None and trabajo.activo:
+                        activos[entrada.path] = trabajo
+                    else:
+                        os.remove(entrada.path)
+                except OSError:
+                    pass
+        return activos
+
+    def _huerfano(self, trabajo):
+        """Trabajo activo de otro proceso que terminó o dejó de renovar su latido"""
+        if not trabajo.activo:
+            return False
+        if trabajo.host == socket.gethostname():
+            # Con el pid de este proceso pero sin estar en memoria: es de un
+            # proceso anterior que tuvo el mismo pid (p. ej. un contenedor reiniciado)
+            if trabajo.pid == os.getpid() or not proceso_vivo(trabajo.pid):
+                return True
+        return time.time() - (trabajo.latido or trabajo.creado or 0) > self.latido_max
+
+    # ==================== Latido ====================
+
+    def _latir(self):
+        while True:
+            time.sleep(self.intervalo_latido)
+            with self._lock:
+                activos = [trabajo for trabajo in self._trabajos.values() if trabajo.activo]
+            for trabajo in activos:
+                try:
+                    self.guardar(trabajo)
+                except OSError:
+                    self.app.logger.exception('No se pudo renovar el latido del trabajo %s', trabajo.id)
+
+    def _ruta(self, trabajo_id):
+        # Los ids son hex (uuid4); cualquier otro valor no corresponde a un archivo
+        if not trabajo_id.isalnum():
+            trabajo_id = '_'
+        return os.path.join(self.carpeta, f'{trabajo_id}.json')
+
+    def _ejecutar(self, trabajo, funcion):
+        trabajo.estado = Trabajo.EJECUTANDO
+        self.guardar(trabajo)
+        try:
+            with self.app.app_context():
+                funcion(trabajo)
+            trabajo.progreso = 1.0
+            trabajo.estado = Trabajo.COMPLETADO
+        except Exception as e:
+            self.app.logger.exception('Error en trabajo %s', trabajo.id)
+            trabajo.error = str(e)
+            trabajo.estado = Trabajo.ERROR
+        finally:
+            trabajo.terminado = time.time()
+            self.guardar(trabajo)
+            ruta_clave = self._ruta_clave(trabajo.clave)
+            with self._bloqueo():
+                try:
+                    with open(ruta_clave, encoding='utf-8') as f:
+                        propia = f.read() == trabajo.id
+                    if propia:
+                        os.remove(ruta_clave)
+                except OSError:
+                    pass
+
+    def _purgar(self):
+        """Descarta trabajos terminados más antiguos que la retención"""
+        limite = time.time() - self.retencion
+        vencidos = [
+            trabajo_id for trabajo_id, trabajo in self._trabajos.items()
+            if trabajo.terminado is not None and trabajo.terminado < limite
+        ]
+        for trabajo_id in vencidos:
+            del self._trabajos[trabajo_id]
+
+        # Estados guardados (de cualquier proceso) más antiguos que la retención
+        with os.scandir(self.carpeta) as entradas:
+            for entrada in entradas:
+                try:
+                    if entrada.is_file() and entrada.stat().st_mtime < limite:
+                        os.remove(entrada.path)
+                except OSError:
+                    pass
+
+
+cola_trabajos = ColaTrabajos()
\ No newline at end of file
@@ -0,0 +1,10 @@
+# backend/wsgi.py
+"""
+Punto de entrada WSGI para producción (gunicorn wsgi:app).
+Con preload_app la aplicación se crea una sola vez en el proceso maestro
+y los workers la heredan al hacer fork.
+"""
+from app import create_app, init_database
+
+app = create_app()
+init_database(app)
\ No newline at end of file
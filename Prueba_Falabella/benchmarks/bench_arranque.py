@@ -0,0 +1,109 @@
+# benchmarks/bench_arranque.py
+"""
+Tiempo de arranque del backend medido con `python -X importtime`.
+
+Ejecuta en un proceso nuevo la ruta de solo consulta (importar app,
+create_app() y una petición a /api/buscar-cliente) y suma el tiempo de
+importación de los módulos de primer nivel. Falla (código 1) si:
+  - el tiempo de importación (mediana de las repeticiones) supera el presupuesto, o
+  - se cargó alguno de los módulos pesados de exportación (openpyxl, pyarrow).
+
+Uso:
+    python benchmarks/bench_arranque.py --presupuesto-ms 800 --repeticiones 5
+"""
+import sys
+import os
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(RAIZ, 'backend'))
+
+from exportacion import MODULOS_EXPORTACION
+
+# Ruta de solo consulta ejecutada en el proceso medido
+RUTA_CONSULTA = """
+from app import create_app, init_database
+app = create_app()
+init_database(app)
+app.test_client().post('/api/buscar-cliente', json={'tipo_documento': 'CC', 'numero_documento': '1'})
+"""
+
+
+def medir(entorno):
+    """
+    Retorna ({módulo de primer nivel: microsegundos acumulados}, nombres de
+    todos los módulos importados) de una ejecución
+    """
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', RUTA_CONSULTA],
+        cwd=os.path.join(RAIZ, 'backend'), env=entorno, capture_output=True, text=True
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(proceso.stderr[-2000:])
+
+    modulos, importados = {}, set()
+    for linea in proceso.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        importados.add(nombre.strip())
+        # Solo los de primer nivel: los anidados ya están en el acumulado del padre
+        if not nombre.startswith('  '):
+            modulos[nombre.strip()] = int(acumulado)
+    return modulos, importados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--presupuesto-ms', type=float, default=800,
+                        help='Tiempo máximo de importación en ms (default: 800)')
+    parser.add_argument('--repeticiones', type=int, default=5, help='Ejecuciones a medir (default: 5)')
+    parser.add_argument('--top', type=int, default=10, help='Módulos más costosos a mostrar (default: 10)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        entorno = {
+            **os.environ,
+            'DATABASE_URL': f"sqlite:///{os.path.join(carpeta, 'arranque.db')}",
+            'EXPORT_FOLDER': os.path.join(carpeta, 'exports'),
+            'PRECARGAR_EXPORTACION': '0',
+        }
+        medidas = [medir(entorno) for _ in range(args.repeticiones)]
+
+    totales = [sum(modulos.values()) / 1000 for modulos, _ in medidas]
+    total = statistics.median(totales)
+    ultima, importados = medidas[-1]
+    pesados = sorted({
+        modulo.split('.')[0] for modulo in importados
+        if modulo.split('.')[0] in MODULOS_EXPORTACION
+    })
+
+    print(f"⏱  Importación en la ruta de consulta: mediana {total:.0f} ms "
+          f"(min {min(totales):.0f}, max {max(totales):.0f}; {args.repeticiones} ejecuciones)\n")
+    for modulo, acumulado in sorted(ultima.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {acumulado / 1000:8.1f} ms  {modulo}")
+    print()
+
+    fallas = 0
+    if total > args.presupuesto_ms:
+        print(f"❌ Supera el presupuesto de {args.presupuesto_ms:.0f} ms")
+        fallas += 1
+    else:
+        print(f"✅ Dentro del presupuesto de {args.presupuesto_ms:.0f} ms")
+    if pesados:
+        print(f"❌ Módulos de exportación cargados: {', '.join(pesados)}")
+        fallas += 1
+    else:
+        print(f"✅ Sin módulos de exportación ({', '.join(MODULOS_EXPORTACION)})")
+
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
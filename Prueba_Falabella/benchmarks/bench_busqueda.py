@@ -0,0 +1,101 @@
+# benchmarks/bench_busqueda.py
+"""
+Latencia de la búsqueda de clientes por texto (/api/clientes/busqueda).
+
+Sobre una base generada con data/populate_db.py mide, con el cliente de
+pruebas de Flask, la latencia de consultas de búsqueda incremental (prefijos
+cortos y comunes, nombre y apellido, correo, teléfono) contra el índice FTS5.
+Como referencia mide LIKE '%palabra%' (primera palabra) sobre las columnas de
+cliente, la única alternativa sin índice de texto completo: sin orden por
+relevancia y con LIMIT, así que solo es rápida cuando las primeras filas de la
+tabla ya coinciden; en otro caso recorre la tabla completa.
+
+Uso:
+    python benchmarks/bench_busqueda.py --clientes 1000000 --repeticiones 20
+"""
+import sys
+import os
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(RAIZ, 'backend'))
+
+# (nombre, texto) de búsquedas típicas de un agente mientras escribe
+CONSULTAS = [
+    ('prefijo común', 'ma'),
+    ('nombre', 'juan'),
+    ('nombre y apellido', 'juan pérez'),
+    ('apellidos parciales', 'rodri mend'),
+    ('correo', 'juan.perez@'),
+    ('correo generado', 'cliente123456'),
+    ('teléfono', '310123'),
+    ('sin coincidencias', 'zzyzx'),
+]
+
+
+def percentiles(tiempos):
+    cortes = statistics.quantiles(tiempos, n=20, method='inclusive') if len(tiempos) > 1 else tiempos * 19
+    return statistics.median(tiempos) * 1000, cortes[18] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clientes', type=int, default=1_000_000)
+    parser.add_argument('--repeticiones', type=int, default=20, help='Peticiones por consulta (default: 20)')
+    parser.add_argument('--limite', type=int, default=10)
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_db = os.path.join(carpeta, 'bench.db')
+        os.environ['DATABASE_URL'] = f'sqlite:///{ruta_db}'
+        os.environ['EXPORT_FOLDER'] = os.path.join(carpeta, 'exports')
+
+        print(f"📦 Generando {args.clientes:,} clientes...")
+        subprocess.run(
+            [sys.executable, os.path.join(RAIZ, 'data', 'populate_db.py'), '--limpiar',
+             '--clientes', str(args.clientes), '--compras', '1000', '--semilla', str(args.semilla)],
+            check=True, capture_output=True
+        )
+
+        from app import create_app
+        from models import db, Cliente
+        from sqlalchemy import select, or_
+
+        app = create_app()
+        cliente = app.test_client()
+
+        print(f"\n⏱  {len(CONSULTAS)} búsquedas × {args.repeticiones} peticiones, límite {args.limite}\n")
+        print(f"  {'consulta':<20} {'texto':<15} {'resultados':>10} {'p50 FTS':>10} {'p95 FTS':>10} {'p50 LIKE':>10}")
+
+        for nombre, texto in CONSULTAS:
+            tiempos = []
+            for _ in range(args.repeticiones):
+                inicio = time.perf_counter()
+                respuesta = cliente.get('/api/clientes/busqueda', query_string={'q': texto, 'limite': args.limite})
+                tiempos.append(time.perf_counter() - inicio)
+            resultados = len(respuesta.get_json()['clientes'])
+            p50, p95 = percentiles(tiempos)
+
+            # Referencia: LIKE sobre las cuatro columnas (recorre la tabla completa)
+            with app.app_context():
+                patron = f'%{texto.split()[0]}%'
+                consulta = select(Cliente.id).where(or_(
+                    Cliente.nombre.like(patron), Cliente.apellido.like(patron),
+                    Cliente.correo.like(patron), Cliente.telefono.like(patron)
+                )).limit(args.limite)
+                inicio = time.perf_counter()
+                db.session.execute(consulta).all()
+                like = (time.perf_counter() - inicio) * 1000
+
+            print(f"  {nombre:<20} {texto:<15} {resultados:>10} {p50:>8.1f}ms {p95:>8.1f}ms {like:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
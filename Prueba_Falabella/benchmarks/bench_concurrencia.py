@@ -0,0 +1,215 @@
+# benchmarks/bench_concurrencia.py
+"""
+Lectores concurrentes mientras un escritor masivo inserta compras.
+
+Compara dos configuraciones de SQLite sobre la misma base generada:
+  - legado:   journal_mode=DELETE y todas las vistas en la conexión principal
+  - ajustado: WAL + PRAGMAs de Config.SQLITE_PRAGMAS + motor de solo lectura
+
+En cada una, un proceso escritor inserta lotes de compras (cada lote en su
+propia transacción, con los triggers activos) mientras varios hilos lectores
+llaman a listar-clientes, buscar-cliente y reporte-fidelizacion con el cliente
+de pruebas de Flask. Se reportan latencias, errores "database is locked" y
+el ritmo del escritor.
+
+Uso:
+    python benchmarks/bench_concurrencia.py --clientes 20000 --compras 200000 --segundos 10
+"""
+import sys
+import os
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(RAIZ, 'backend'))
+
+MODOS = {
+    'legado': {'SQLITE_JOURNAL_MODE': 'DELETE', 'DB_SOLO_LECTURA': '0'},
+    'ajustado': {'SQLITE_JOURNAL_MODE': 'WAL', 'DB_SOLO_LECTURA': '1'},
+}
+
+
+def escritor(args):
+    """Inserta lotes de compras durante args.segundos; imprime el resumen en JSON"""
+    from app import create_app
+    from models import db
+
+    app = create_app()
+
+    rnd = random.Random(args.semilla)
+    filas = errores = 0
+    inicio = time.perf_counter()
+
+    with app.app_context():
+        with db.engine.connect() as conn:
+            max_cliente = conn.exec_driver_sql('SELECT MAX(id) FROM cliente').scalar()
+            siguiente = conn.exec_driver_sql('SELECT MAX(id) FROM compra').scalar() + 1
+
+            while time.perf_counter() - inicio < args.segundos:
+                ahora = datetime.now()
+                lote = [
+                    (i, rnd.randint(1, max_cliente),
+                     (ahora - timedelta(days=rnd.uniform(0, 60))).isoformat(' ', 'microseconds'),
+                     rnd.randint(5_000_000, 200_000_000), 'Producto', f'BENCH-{i}')
+                    for i in range(siguiente, siguiente + args.lote)
+                ]
+                try:
+                    conn.exec_driver_sql(
+                        'INSERT INTO compra (id, cliente_id, fecha_compra, monto_centavos, '
+                        'descripcion, numero_factura) VALUES (?, ?, ?, ?, ?, ?)', lote
+                    )
+                    conn.commit()
+                    filas += len(lote)
+                    siguiente += args.lote
+                except Exception:
+                    conn.rollback()
+                    errores += 1
+
+    duracion = time.perf_counter() - inicio
+    print(json.dumps({'filas': filas, 'filas_s': filas / duracion, 'errores': errores}))
+
+
+def lectores(args):
+    """Lanza el escritor y mide a los lectores mientras está activo"""
+    import sqlite3
+    from app import create_app
+
+    app = create_app()
+
+    conn = sqlite3.connect(args.db)
+    documentos = conn.execute(
+        'SELECT t.codigo, c.numero_documento FROM cliente c '
+        'JOIN tipo_documento t ON t.id = c.tipo_documento_id'
+    ).fetchall()
+    conn.close()
+
+    proceso = subprocess.Popen(
+        [sys.executable, __file__, '--hijo', 'escritor', '--segundos', str(args.segundos),
+         '--lote', str(args.lote), '--semilla', str(args.semilla)],
+        stdout=subprocess.PIPE, text=True
+    )
+
+    latencias, por_escenario, bloqueos, errores = [], {}, [0], [0]
+    lock = threading.Lock()
+
+    def leer(numero):
+        rnd = random.Random(args.semilla + numero)
+        cliente = app.test_client()
+        while proceso.poll() is None:
+            escenario = rnd.choice(('listar', 'buscar', 'reporte'))
+            inicio = time.perf_counter()
+            if escenario == 'listar':
+                respuesta = cliente.get('/api/listar-clientes?limite=50')
+            elif escenario == 'buscar':
+                codigo, numero_doc = rnd.choice(documentos)
+                respuesta = cliente.post('/api/buscar-cliente', json={
+                    'tipo_documento': codigo, 'numero_documento': numero_doc
+                })
+            else:
+                respuesta = cliente.get('/api/reporte-fidelizacion')
+            cuerpo = respuesta.get_data(as_text=respuesta.mimetype == 'application/json')
+            duracion = time.perf_counter() - inicio
+
+            with lock:
+                latencias.append(duracion)
+                por_escenario.setdefault(escenario, []).append(duracion)
+                if respuesta.status_code >= 500:
+                    if 'locked' in str(cuerpo):
+                        bloqueos[0] += 1
+                    else:
+                        errores[0] += 1
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=leer, args=(i,)) for i in range(args.lectores)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+
+    resultado_escritor = json.loads(proceso.communicate()[0].strip().splitlines()[-1])
+    cortes = statistics.quantiles(latencias, n=100, method='inclusive') if len(latencias) > 1 else [0] * 99
+    print(json.dumps({
+        'lecturas': len(latencias),
+        'lecturas_s': len(latencias) / duracion,
+        'bloqueos': bloqueos[0],
+        'errores': errores[0],
+        'p50_ms': cortes[49] * 1000,
+        'p95_ms': cortes[94] * 1000,
+        'p99_ms': cortes[98] * 1000,
+        'max_ms': max(latencias, default=0) * 1000,
+        'p95_ms_por_escenario': {
+            escenario: statistics.quantiles(valores, n=20, method='inclusive')[18] * 1000
+            for escenario, valores in por_escenario.items() if len(valores) > 1
+        },
+        'escritor': resultado_escritor,
+    }))
+
+
+def medir(args, modo):
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_db = os.path.join(carpeta, 'bench.db')
+        entorno = {
+            **os.environ,
+            **MODOS[modo],
+            'DATABASE_URL': f'sqlite:///{ruta_db}',
+            'EXPORT_FOLDER': os.path.join(carpeta, 'exports'),
+        }
+        subprocess.run(
+            [sys.executable, os.path.join(RAIZ, 'data', 'populate_db.py'), '--limpiar',
+             '--clientes', str(args.clientes), '--compras', str(args.compras), '--semilla', str(args.semilla)],
+            env=entorno, check=True, capture_output=True
+        )
+        salida = subprocess.run(
+            [sys.executable, __file__, '--hijo', 'lectores', '--db', ruta_db,
+             '--segundos', str(args.segundos), '--lectores', str(args.lectores),
+             '--lote', str(args.lote), '--semilla', str(args.semilla)],
+            env=entorno, check=True, capture_output=True, text=True
+        ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clientes', type=int, default=20_000)
+    parser.add_argument('--compras', type=int, default=200_000)
+    parser.add_argument('--segundos', type=float, default=10, help='Duración del escritor (default: 10)')
+    parser.add_argument('--lectores', type=int, default=4, help='Hilos lectores (default: 4)')
+    parser.add_argument('--lote', type=int, default=5_000, help='Compras por transacción del escritor')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--hijo', choices=['lectores', 'escritor'], help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo == 'escritor':
+        escritor(args)
+        return
+    if args.hijo == 'lectores':
+        lectores(args)
+        return
+
+    print(f"⏱  {args.lectores} lectores durante {args.segundos:.0f} s de escritura masiva "
+          f"({args.clientes:,} clientes, {args.compras:,} compras)\n")
+    for modo in MODOS:
+        r = medir(args, modo)
+        e = r['escritor']
+        print(f"  {modo:<9} lecturas {r['lecturas']:6,} ({r['lecturas_s']:6.1f}/s)  "
+              f"p50 {r['p50_ms']:7.1f} ms  p95 {r['p95_ms']:7.1f} ms  p99 {r['p99_ms']:7.1f} ms  "
+              f"max {r['max_ms']:7.1f} ms  bloqueos {r['bloqueos']:4}  errores {r['errores']:3}  |  "
+              f"escritor {e['filas_s']:9,.0f} filas/s ({e['errores']} lotes fallidos)")
+        print('            p95 por endpoint: ' + '  '.join(
+            f"{escenario} {valor:.1f} ms" for escenario, valor in sorted(r['p95_ms_por_escenario'].items())
+        ))
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
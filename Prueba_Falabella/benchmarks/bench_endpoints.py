@@ -0,0 +1,406 @@
+# benchmarks/bench_endpoints.py
+"""
+Benchmark de carga de los endpoints de la API.
+
+Por cada tamaño de datos:
+  1. Genera una base temporal con data/populate_db.py (semilla fija).
+  2. Cliente de pruebas de Flask: latencia p50/p95/p99, consultas SQL por
+     petición y pico de memoria de una petición (tracemalloc).
+  3. Servidor WSGI real (werkzeug con hilos, en otro proceso) con clientes
+     concurrentes: latencia, peticiones por segundo y pico de RSS del servidor.
+
+Los endpoints que generan archivos (exportar-cliente, reporte-fidelizacion)
+se miden dos veces: con la caché de artefactos caliente (todas las
+peticiones medidas ya se generaron antes) y sin caché (-sin-cache,
+CACHE_ARTEFACTOS=0: cada petición genera el archivo).
+
+Los resultados se guardan en JSON para comparar una ejecución con otra.
+
+Uso:
+    python benchmarks/bench_endpoints.py --tamanos pequeno,mediano --salida linea_base.json
+    python benchmarks/bench_endpoints.py --comparar linea_base.json
+"""
+import sys
+import os
+import argparse
+import json
+import platform
+import random
+import resource
+import socket
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(RAIZ, 'backend'))
+
+# (clientes, compras) por tamaño de datos
+TAMANOS = {
+    'pequeno': (1_000, 20_000),
+    'mediano': (20_000, 400_000),
+    'grande': (200_000, 4_000_000),
+}
+
+ESCENARIOS = [
+    'tipos-documento',
+    'listar-clientes',
+    'buscar-cliente',
+    'exportar-cliente',
+    'exportar-cliente-sin-cache',
+    'reporte-fidelizacion',
+    'reporte-fidelizacion-sin-cache',
+]
+
+# Escenarios medidos con la caché de artefactos desactivada
+SIN_CACHE = '-sin-cache'
+
+# Documentos de clientes usados en las peticiones
+TAMANO_MUESTRA = 500
+
+
+def peticion(escenario, documento):
+    """Retorna (método, ruta, cuerpo JSON) de una petición del escenario"""
+    codigo, numero = documento
+    escenario = escenario.removesuffix(SIN_CACHE)
+    if escenario == 'tipos-documento':
+        return 'GET', '/api/tipos-documento', None
+    if escenario == 'listar-clientes':
+        return 'GET', '/api/listar-clientes?limite=50', None
+    if escenario == 'buscar-cliente':
+        return 'POST', '/api/buscar-cliente', {'tipo_documento': codigo, 'numero_documento': numero}
+    if escenario == 'exportar-cliente':
+        return 'POST', '/api/exportar-cliente', {'numero_documento': numero, 'formato': 'excel'}
+    return 'GET', '/api/reporte-fidelizacion', None
+
+
+def muestra_documentos(ruta_db, semilla):
+    conn = sqlite3.connect(ruta_db)
+    documentos = conn.execute(
+        'SELECT t.codigo, c.numero_documento FROM cliente c '
+        'JOIN tipo_documento t ON t.id = c.tipo_documento_id ORDER BY c.id'
+    ).fetchall()
+    conn.close()
+    return random.Random(semilla).sample(documentos, min(TAMANO_MUESTRA, len(documentos)))
+
+
+def percentiles(latencias):
+    """p50/p95/p99 en milisegundos"""
+    if len(latencias) < 2:
+        valor = latencias[0] * 1000 if latencias else 0
+        return {'p50_ms': valor, 'p95_ms': valor, 'p99_ms': valor}
+    cortes = statistics.quantiles(latencias, n=100, method='inclusive')
+    return {'p50_ms': cortes[49] * 1000, 'p95_ms': cortes[94] * 1000, 'p99_ms': cortes[98] * 1000}
+
+
+def _distintas(solicitudes):
+    """Solicitudes sin repetir, en orden"""
+    return list({json.dumps(solicitud): solicitud for solicitud in solicitudes}.values())
+
+
+# ==================== Procesos hijo ====================
+
+def fase_cliente_pruebas(args):
+    """Mide cada escenario con app.test_client() en este proceso"""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from app import create_app
+    from cache_artefactos import cache_artefactos
+
+    app = create_app()
+
+    consultas = [0]
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def contar(*_):
+        consultas[0] += 1
+
+    cliente = app.test_client()
+    documentos = muestra_documentos(args.db, args.semilla)
+    rnd = random.Random(args.semilla)
+    resultados = {}
+
+    def ejecutar(solicitud):
+        metodo, ruta, cuerpo = solicitud
+        respuesta = cliente.open(ruta, method=metodo, json=cuerpo)
+        respuesta.get_data()
+        return respuesta.status_code
+
+    for escenario in ESCENARIOS:
+        cache_artefactos.activa = not escenario.endswith(SIN_CACHE)
+        solicitudes = [peticion(escenario, rnd.choice(documentos)) for _ in range(args.peticiones)]
+        # Calentamiento; con caché, de todas las peticiones que se medirán
+        for solicitud in (_distintas(solicitudes) if cache_artefactos.activa else solicitudes[:1]):
+            ejecutar(solicitud)
+
+        latencias, por_peticion, estados = [], [], {}
+        inicio_total = time.perf_counter()
+        for solicitud in solicitudes:
+            antes = consultas[0]
+            inicio = time.perf_counter()
+            estado = ejecutar(solicitud)
+            latencias.append(time.perf_counter() - inicio)
+            por_peticion.append(consultas[0] - antes)
+            estados[estado] = estados.get(estado, 0) + 1
+        duracion = time.perf_counter() - inicio_total
+
+        # Pico de memoria de una petición (fuera del cronómetro: tracemalloc es lento)
+        tracemalloc.start()
+        ejecutar(solicitudes[0])
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        resultados[escenario] = {
+            **percentiles(latencias),
+            'peticiones_s': args.peticiones / duracion,
+            'consultas_promedio': statistics.mean(por_peticion),
+            'consultas_max': max(por_peticion),
+            'memoria_pico_kb': pico / 1024,
+            'estados': {str(codigo): n for codigo, n in sorted(estados.items())},
+        }
+
+    # ru_maxrss está en KB en Linux
+    resultados['rss_pico_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(resultados))
+
+
+def fase_servidor(args):
+    """Sirve la app con el servidor WSGI de werkzeug (con hilos) hasta ser terminado"""
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    app = create_app()
+    make_server('127.0.0.1', args.puerto, app, threaded=True).serve_forever()
+
+
+# ==================== Servidor WSGI real ====================
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _rss_pico_mb(pid):
+    """Pico de memoria residente de un proceso (VmHWM, solo Linux)"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for linea in f:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _http(base, metodo, ruta, cuerpo):
+    datos = json.dumps(cuerpo).encode() if cuerpo is not None else None
+    solicitud = urllib.request.Request(
+        base + ruta, data=datos, method=metodo, headers={'Content-Type': 'application/json'}
+    )
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(solicitud, timeout=120) as respuesta:
+            respuesta.read()
+            estado = respuesta.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        estado = e.code
+    return time.perf_counter() - inicio, estado
+
+
+def medir_servidor(args, entorno, ruta_db, escenarios):
+    puerto = _puerto_libre()
+    base = f'http://127.0.0.1:{puerto}'
+    servidor = subprocess.Popen(
+        [sys.executable, __file__, '--hijo', 'servidor', '--puerto', str(puerto)],
+        env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(100):
+            try:
+                _http(base, 'GET', '/api/tipos-documento', None)
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError('El servidor no respondió')
+
+        documentos = muestra_documentos(ruta_db, args.semilla)
+        rnd = random.Random(args.semilla)
+        resultados = {}
+
+        for escenario in escenarios:
+            solicitudes = [peticion(escenario, rnd.choice(documentos)) for _ in range(args.peticiones)]
+            # Calentamiento; con caché, de todas las peticiones que se medirán
+            con_cache = not escenario.endswith(SIN_CACHE)
+            for solicitud in (_distintas(solicitudes) if con_cache else solicitudes[:1]):
+                _http(base, *solicitud)
+
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrencia) as pool:
+                medidas = list(pool.map(lambda s: _http(base, *s), solicitudes))
+            duracion = time.perf_counter() - inicio
+
+            estados = {}
+            for _, estado in medidas:
+                estados[estado] = estados.get(estado, 0) + 1
+            resultados[escenario] = {
+                **percentiles([latencia for latencia, _ in medidas]),
+                'peticiones_s': args.peticiones / duracion,
+                'estados': {str(codigo): n for codigo, n in sorted(estados.items())},
+            }
+
+        resultados['rss_pico_mb'] = _rss_pico_mb(servidor.pid)
+        return resultados
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+# ==================== Orquestación ====================
+
+def ejecutar_tamano(args, nombre):
+    num_clientes, num_compras = TAMANOS[nombre]
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_db = os.path.join(carpeta, 'bench.db')
+        entorno = {
+            **os.environ,
+            'DATABASE_URL': f'sqlite:///{ruta_db}',
+            'EXPORT_FOLDER': os.path.join(carpeta, 'exports'),
+        }
+
+        print(f"\n📦 [{nombre}] Generando {num_clientes:,} clientes y {num_compras:,} compras...")
+        inicio = time.perf_counter()
+        subprocess.run(
+            [sys.executable, os.path.join(RAIZ, 'data', 'populate_db.py'), '--limpiar',
+             '--clientes', str(num_clientes), '--compras', str(num_compras), '--semilla', str(args.semilla)],
+            env=entorno, check=True, capture_output=True
+        )
+        print(f"   listo en {time.perf_counter() - inicio:.1f} s")
+
+        print(f"⏱  [{nombre}] Cliente de pruebas ({args.peticiones} peticiones por endpoint)")
+        salida = subprocess.run(
+            [sys.executable, __file__, '--hijo', 'cliente', '--db', ruta_db,
+             '--peticiones', str(args.peticiones), '--semilla', str(args.semilla)],
+            env=entorno, check=True, capture_output=True, text=True
+        ).stdout
+        cliente = json.loads(salida.strip().splitlines()[-1])
+        imprimir_tabla(cliente, con_consultas=True)
+
+        print(f"⏱  [{nombre}] Servidor WSGI ({args.concurrencia} clientes concurrentes)")
+        servidor = medir_servidor(
+            args, entorno, ruta_db, [e for e in ESCENARIOS if not e.endswith(SIN_CACHE)]
+        )
+        # Los escenarios sin caché, en un servidor con la caché de artefactos desactivada
+        sin_cache = medir_servidor(
+            args, {**entorno, 'CACHE_ARTEFACTOS': '0'}, ruta_db, [e for e in ESCENARIOS if e.endswith(SIN_CACHE)]
+        )
+        sin_cache.pop('rss_pico_mb', None)
+        servidor.update(sin_cache)
+        imprimir_tabla(servidor)
+
+    return {'clientes': num_clientes, 'compras': num_compras,
+            'cliente_pruebas': cliente, 'servidor': servidor}
+
+
+def imprimir_tabla(resultados, con_consultas=False):
+    for escenario in ESCENARIOS:
+        r = resultados[escenario]
+        linea = (f"  {escenario:<30} p50 {r['p50_ms']:8.1f} ms  p95 {r['p95_ms']:8.1f} ms  "
+                 f"p99 {r['p99_ms']:8.1f} ms  {r['peticiones_s']:8.1f} req/s")
+        if con_consultas:
+            linea += f"  {r['consultas_promedio']:5.1f} consultas  {r['memoria_pico_kb']:9.0f} KB"
+        print(linea)
+    if resultados.get('rss_pico_mb'):
+        print(f"  pico RSS: {resultados['rss_pico_mb']:.1f} MB")
+
+
+def comparar(base, actual, tolerancia):
+    """
+    Compara p95 y peticiones/s con una línea base; retorna el número de
+    regresiones que superan la tolerancia (fracción)
+    """
+    print(f"\n📊 Comparación con la línea base (tolerancia {tolerancia:.0%})")
+    regresiones = 0
+    for tamano, fases in actual['resultados'].items():
+        for fase in ('cliente_pruebas', 'servidor'):
+            previas = base.get('resultados', {}).get(tamano, {}).get(fase, {})
+            for escenario in ESCENARIOS:
+                if escenario not in previas:
+                    continue
+                antes, ahora = previas[escenario], fases[fase][escenario]
+                cambio_p95 = ahora['p95_ms'] / antes['p95_ms'] - 1 if antes['p95_ms'] else 0
+                cambio_rps = ahora['peticiones_s'] / antes['peticiones_s'] - 1 if antes['peticiones_s'] else 0
+                regresion = cambio_p95 > tolerancia or cambio_rps < -tolerancia
+                regresiones += regresion
+                print(f"  {'❌' if regresion else '✅'} {tamano}/{fase}/{escenario:<30} "
+                      f"p95 {cambio_p95:+7.1%}  req/s {cambio_rps:+7.1%}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanos', default='pequeno',
+                        help=f"Tamaños separados por coma: {', '.join(TAMANOS)} (default: pequeno)")
+    parser.add_argument('--peticiones', type=int, default=200, help='Peticiones por endpoint (default: 200)')
+    parser.add_argument('--concurrencia', type=int, default=8, help='Clientes concurrentes (default: 8)')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+    parser.add_argument('--comparar', help='Línea base JSON contra la cual comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help='Regresión permitida en p95 y req/s antes de fallar (default: 0.2)')
+    parser.add_argument('--hijo', choices=['cliente', 'servidor'], help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    parser.add_argument('--puerto', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo == 'cliente':
+        fase_cliente_pruebas(args)
+        return
+    if args.hijo == 'servidor':
+        fase_servidor(args)
+        return
+
+    tamanos = [t.strip() for t in args.tamanos.split(',') if t.strip()]
+    desconocidos = set(tamanos) - set(TAMANOS)
+    if desconocidos:
+        parser.error(f"Tamaños desconocidos: {', '.join(sorted(desconocidos))}")
+
+    actual = {
+        'meta': {
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'peticiones': args.peticiones,
+            'concurrencia': args.concurrencia,
+            'semilla': args.semilla,
+        },
+        'resultados': {nombre: ejecutar_tamano(args, nombre) for nombre in tamanos},
+    }
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(actual, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)
+        regresiones = comparar(base, actual, args.tolerancia)
+        if regresiones:
+            print(f"\n❌ {regresiones} regresión(es) sobre la línea base")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,126 @@
+# benchmarks/bench_excel.py
+"""
+Compara la escritura del reporte de fidelización en Excel:
+  - legado: DataFrame + .apply para formatear + pd.ExcelWriter y ajuste de
+            anchos recorriendo todas las celdas
+  - nuevo:  hojas write-only de openpyxl alimentadas por un generador y
+            anchos calculados con una muestra (exportacion.escribir_excel)
+
+Cada ruta se ejecuta en un proceso aparte para medir su pico de memoria (RSS).
+Requiere pandas (solo para el legado):
+    pip install -r backend/requirements-bench.txt
+
+Uso:
+    python benchmarks/bench_excel.py --filas 500000
+"""
+import sys
+import os
+import argparse
+import importlib.util
+import json
+import random
+import resource
+import subprocess
+import tempfile
+import time
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+
+def generar_filas(num_filas, semilla=42):
+    """Genera filas sintéticas del reporte ya ordenadas por monto (descendente)"""
+    rnd = random.Random(semilla)
+    montos = sorted((rnd.uniform(5_000_001, 80_000_000) for _ in range(num_filas)), reverse=True)
+    for i, monto in enumerate(montos):
+        yield (
+            'Cédula de Ciudadanía', str(1_000_000_000 + i), f'Nombre{i}', f'Apellido Apellido{i}',
+            f'cliente{i}@email.com', f'3{i:09d}', monto, rnd.randint(1, 40)
+        )
+
+
+def escribir_legado(filepath, num_filas):
+    import pandas as pd
+    from exportacion import COLUMNAS_FIDELIZACION
+
+    df = pd.DataFrame(
+        [dict(zip(COLUMNAS_FIDELIZACION, fila)) for fila in generar_filas(num_filas)]
+    )
+    df = df.sort_values('Monto Total (COP)', ascending=False)
+    df['Monto Total (COP)'] = df['Monto Total (COP)'].apply(lambda x: f"${x:,.2f}")
+
+    with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Clientes a Fidelizar', index=False)
+        worksheet = writer.sheets['Clientes a Fidelizar']
+        for column in worksheet.columns:
+            max_length = 0
+            column_letter = column[0].column_letter
+            for cell in column:
+                if len(str(cell.value)) > max_length:
+                    max_length = len(str(cell.value))
+            worksheet.column_dimensions[column_letter].width = min(max_length + 2, 50)
+
+
+def escribir_nuevo(filepath, num_filas):
+    from exportacion import COLUMNAS_FIDELIZACION, escribir_excel
+
+    filas = (
+        list(fila[:6]) + [f"${fila[6]:,.2f}", fila[7]]
+        for fila in generar_filas(num_filas)
+    )
+    escribir_excel(
+        filepath,
+        [('Clientes a Fidelizar', COLUMNAS_FIDELIZACION, filas)],
+        ajustar_anchos=True
+    )
+
+
+def ejecutar_hijo(modo, num_filas):
+    """Ejecuta una ruta en este proceso e imprime tiempo y pico de RSS en JSON"""
+    with tempfile.TemporaryDirectory() as carpeta:
+        filepath = os.path.join(carpeta, 'reporte.xlsx')
+        inicio = time.perf_counter()
+        (escribir_legado if modo == 'legado' else escribir_nuevo)(filepath, num_filas)
+        duracion = time.perf_counter() - inicio
+        tamano = os.path.getsize(filepath)
+
+    # ru_maxrss está en KB en Linux
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({'tiempo_s': duracion, 'rss_mb': rss_mb, 'bytes': tamano}))
+
+
+def medir(modo, num_filas):
+    salida = subprocess.run(
+        [sys.executable, __file__, '--hijo', modo, '--filas', str(num_filas)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=500_000)
+    parser.add_argument('--hijo', choices=['legado', 'nuevo'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        ejecutar_hijo(args.hijo, args.filas)
+        return
+
+    if importlib.util.find_spec('pandas') is None:
+        print('❌ Se necesita pandas para ejecutar la implementación anterior (pip install -r backend/requirements-bench.txt)')
+        sys.exit(1)
+
+    print(f"⏱  Reporte de fidelización en Excel con {args.filas:,} filas\n")
+    resultados = {modo: medir(modo, args.filas) for modo in ('legado', 'nuevo')}
+
+    for modo, r in resultados.items():
+        print(f"  {modo:<8} {r['tiempo_s']:8.2f} s   pico RSS {r['rss_mb']:8.1f} MB   {r['bytes'] / 1e6:6.1f} MB en disco")
+
+    legado, nuevo = resultados['legado'], resultados['nuevo']
+    print(f"\n🚀 Tiempo: {legado['tiempo_s'] / nuevo['tiempo_s']:.1f}x   "
+          f"Memoria: {legado['rss_mb'] / nuevo['rss_mb']:.1f}x menos")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,220 @@
+# benchmarks/bench_exportacion.py
+"""
+Costo por petición de las exportaciones sin pandas.
+
+Compara, sobre una base generada con data/populate_db.py:
+  - legado: DataFrames + to_csv / to_excel (la implementación anterior)
+  - nuevo:  módulo csv y hojas write-only de openpyxl (exportacion.py)
+
+Costo: tiempo por petición (p50) y pico de memoria (tracemalloc). La
+paridad entre ambas (CSV idéntico byte a byte, Excel con los mismos
+valores) se verifica en tests/test_exportacion.py, que usa estas mismas
+implementaciones.
+
+Requiere pandas (solo para el legado):
+    pip install -r backend/requirements-bench.txt
+
+Uso:
+    python benchmarks/bench_exportacion.py --clientes 2000 --compras 100000 --muestra 50
+"""
+import sys
+import os
+import argparse
+import importlib.util
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(RAIZ, 'backend'))
+
+
+# ==================== Implementación anterior (pandas) ====================
+
+def csv_cliente_legado(filepath, cliente, fila_cliente):
+    import pandas as pd
+    from dinero import a_pesos
+    from consultas import totales_compras_por_cliente
+    from exportacion import COLUMNAS_CLIENTE, COLUMNAS_COMPRAS, filas_compras
+
+    df_cliente = pd.DataFrame([fila_cliente], columns=COLUMNAS_CLIENTE)
+    df_compras = pd.DataFrame(list(filas_compras(cliente.id)), columns=COLUMNAS_COMPRAS)
+
+    if not df_compras.empty:
+        total, numero = totales_compras_por_cliente([cliente.id])[cliente.id]
+        df_cliente['Total Compras'] = a_pesos(total)
+        df_cliente['Número de Compras'] = numero
+
+    df_cliente.to_csv(filepath, index=False, encoding='utf-8-sig')
+
+
+def excel_cliente_legado(filepath, cliente, fila_cliente):
+    import pandas as pd
+    from exportacion import COLUMNAS_CLIENTE, COLUMNAS_COMPRAS, filas_compras
+
+    df_cliente = pd.DataFrame([fila_cliente], columns=COLUMNAS_CLIENTE)
+    df_compras = pd.DataFrame(list(filas_compras(cliente.id)), columns=COLUMNAS_COMPRAS)
+
+    with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+        df_cliente.to_excel(writer, sheet_name='Cliente', index=False)
+        if not df_compras.empty:
+            df_compras.to_excel(writer, sheet_name='Compras', index=False)
+
+
+def reporte_legado(filepath):
+    import pandas as pd
+    from flask import current_app
+    from models import db
+    from dinero import a_pesos
+    from consultas import consulta_clientes_fidelizacion
+    from exportacion import COLUMNAS_FIDELIZACION
+    from reportes import _fecha_limite
+
+    consulta = consulta_clientes_fidelizacion(_fecha_limite(), current_app.config['UMBRAL_FIDELIZACION'])
+    df = pd.DataFrame(
+        [
+            [fila.tipo_documento, fila.numero_documento, fila.nombre, fila.apellido, fila.correo,
+             fila.telefono, a_pesos(fila.monto_total_centavos), fila.numero_compras]
+            for fila in db.session.execute(consulta)
+        ],
+        columns=COLUMNAS_FIDELIZACION
+    )
+    df = df.sort_values('Monto Total (COP)', ascending=False, kind='stable')
+    df['Monto Total (COP)'] = df['Monto Total (COP)'].apply(lambda x: f"${x:,.2f}")
+
+    with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Clientes a Fidelizar', index=False)
+        worksheet = writer.sheets['Clientes a Fidelizar']
+        for column in worksheet.columns:
+            max_length = max(len(str(cell.value)) for cell in column)
+            worksheet.column_dimensions[column[0].column_letter].width = min(max_length + 2, 50)
+
+
+# ==================== Implementación actual ====================
+
+def csv_cliente_nuevo(filepath, cliente, fila_cliente):
+    from consultas import totales_compras_por_cliente
+    from exportacion import escribir_csv_cliente
+
+    escribir_csv_cliente(filepath, fila_cliente, totales_compras_por_cliente([cliente.id]).get(cliente.id))
+
+
+def excel_cliente_nuevo(filepath, cliente, fila_cliente):
+    from exportacion import COLUMNAS_CLIENTE, COLUMNAS_COMPRAS, escribir_excel, filas_compras
+
+    escribir_excel(filepath, [
+        ('Cliente', COLUMNAS_CLIENTE, [fila_cliente]),
+        ('Compras', COLUMNAS_COMPRAS, filas_compras(cliente.id))
+    ])
+
+
+def reporte_nuevo(filepath):
+    from reportes import generar_reporte_fidelizacion
+
+    generar_reporte_fidelizacion(filepath)
+
+
+# ==================== Comparación ====================
+
+def contenido_excel(filepath):
+    """
+    {hoja: (filas de valores, encabezado en negrita)}; los .xlsx incluyen la
+    fecha de creación, así que no se comparan por bytes
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(filepath, read_only=True)
+    contenido = {}
+    for hoja in libro.worksheets:
+        filas = list(hoja.iter_rows())
+        contenido[hoja.title] = (
+            [[celda.value for celda in fila] for fila in filas],
+            all(celda.font.b for celda in filas[0]) if filas else None,
+        )
+    libro.close()
+    return contenido
+
+
+def medir(funcion, filepath, *args):
+    inicio = time.perf_counter()
+    funcion(filepath, *args)
+    duracion = time.perf_counter() - inicio
+
+    # Pico de memoria en una segunda ejecución (fuera del cronómetro)
+    tracemalloc.start()
+    funcion(filepath, *args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracion, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clientes', type=int, default=2_000)
+    parser.add_argument('--compras', type=int, default=100_000)
+    parser.add_argument('--muestra', type=int, default=50, help='Clientes a exportar por formato (default: 50)')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    if importlib.util.find_spec('pandas') is None:
+        print('❌ Se necesita pandas para ejecutar la implementación anterior (pip install -r backend/requirements-bench.txt)')
+        sys.exit(1)
+
+    carpeta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(carpeta, 'bench.db')}"
+    os.environ['EXPORT_FOLDER'] = os.path.join(carpeta, 'exports')
+
+    print(f"📦 Generando {args.clientes:,} clientes y {args.compras:,} compras...")
+    subprocess.run(
+        [sys.executable, os.path.join(RAIZ, 'data', 'populate_db.py'), '--limpiar',
+         '--clientes', str(args.clientes), '--compras', str(args.compras), '--semilla', str(args.semilla)],
+        check=True, capture_output=True
+    )
+
+    from app import create_app
+    from models import Cliente, tipos_documento
+    from exportacion import fila_datos_cliente
+
+    app = create_app()
+    tiempos = {}
+
+    def registrar(caso, implementacion, medida):
+        tiempos.setdefault(caso, {}).setdefault(implementacion, []).append(medida)
+
+    with app.app_context():
+        clientes = Cliente.query.order_by(Cliente.id).all()
+        muestra = random.Random(args.semilla).sample(clientes, min(args.muestra, len(clientes)))
+
+        for cliente in muestra:
+            fila = fila_datos_cliente(cliente, tipos_documento.por_id(cliente.tipo_documento_id).descripcion)
+
+            legado, nuevo = os.path.join(carpeta, 'legado.csv'), os.path.join(carpeta, 'nuevo.csv')
+            registrar('csv-cliente', 'legado', medir(csv_cliente_legado, legado, cliente, fila))
+            registrar('csv-cliente', 'nuevo', medir(csv_cliente_nuevo, nuevo, cliente, fila))
+
+            legado, nuevo = os.path.join(carpeta, 'legado.xlsx'), os.path.join(carpeta, 'nuevo.xlsx')
+            registrar('excel-cliente', 'legado', medir(excel_cliente_legado, legado, cliente, fila))
+            registrar('excel-cliente', 'nuevo', medir(excel_cliente_nuevo, nuevo, cliente, fila))
+
+        registrar('reporte-fidelizacion', 'legado', medir(reporte_legado, legado))
+        registrar('reporte-fidelizacion', 'nuevo', medir(reporte_nuevo, nuevo))
+
+    print(f"\n⏱  Costo por petición ({len(muestra)} clientes)\n")
+    for caso, implementaciones in tiempos.items():
+        p50 = {nombre: statistics.median(d for d, _ in medidas) * 1000 for nombre, medidas in implementaciones.items()}
+        pico = {nombre: max(p for _, p in medidas) / 1024 for nombre, medidas in implementaciones.items()}
+        print(f"  {caso:<22} legado {p50['legado']:8.2f} ms {pico['legado']:9.0f} KB  |  "
+              f"nuevo {p50['nuevo']:8.2f} ms {pico['nuevo']:9.0f} KB  |  "
+              f"x{p50['legado'] / p50['nuevo']:5.1f} más rápido")
+
+    shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
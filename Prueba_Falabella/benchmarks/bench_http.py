@@ -0,0 +1,127 @@
+# benchmarks/bench_http.py
+"""
+Bytes en la red y CPU del servidor por petición en los endpoints JSON.
+
+Sobre una base generada con data/populate_db.py compara, con el cliente de
+pruebas de Flask, varias configuraciones de respuesta:
+  - legado:    json del proveedor por defecto de Flask, sin compresión
+  - orjson:    ProveedorJSONRapido (JSON_RAPIDO=1)
+  - gzip / br: orjson + compresión negociada con Accept-Encoding
+               (br solo si el módulo brotli está instalado)
+  - 304:       revalidación con If-None-Match de una respuesta ya vista
+
+Para cada endpoint reporta bytes del cuerpo enviado y CPU del proceso
+(time.process_time) por petición. Como en los listados domina la consulta,
+al final se mide aparte la serialización y la compresión del cuerpo de
+listar-clientes (500).
+
+Uso:
+    python benchmarks/bench_http.py --clientes 50000 --repeticiones 50
+"""
+import sys
+import os
+import argparse
+import gzip
+import subprocess
+import tempfile
+import time
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(RAIZ, 'backend'))
+
+ENDPOINTS = [
+    ('listar-clientes (500)', '/api/listar-clientes?limite=500'),
+    ('listar-clientes (50)', '/api/listar-clientes?limite=50'),
+    ('buscar-cliente', '/api/buscar-cliente?tipo_documento=CC&numero_documento=1234567890'),
+    ('segmentacion (500)', '/api/segmentacion?limite=500'),
+    ('busqueda de texto', '/api/clientes/busqueda?q=juan&limite=50'),
+]
+
+
+def medir(cliente, url, repeticiones, encabezados):
+    """(bytes del cuerpo, ms de CPU por petición, estado) de repeticiones peticiones"""
+    respuesta = cliente.get(url, headers=encabezados)
+    inicio = time.process_time()
+    for _ in range(repeticiones):
+        respuesta = cliente.get(url, headers=encabezados)
+    cpu = (time.process_time() - inicio) / repeticiones * 1000
+    return len(respuesta.get_data()), cpu, respuesta.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clientes', type=int, default=50_000)
+    parser.add_argument('--compras', type=int, default=500_000)
+    parser.add_argument('--repeticiones', type=int, default=50, help='Peticiones por medición (default: 50)')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_db = os.path.join(carpeta, 'bench.db')
+        os.environ['DATABASE_URL'] = f'sqlite:///{ruta_db}'
+        os.environ['EXPORT_FOLDER'] = os.path.join(carpeta, 'exports')
+
+        print(f"📦 Generando {args.clientes:,} clientes y {args.compras:,} compras...")
+        subprocess.run(
+            [sys.executable, os.path.join(RAIZ, 'data', 'populate_db.py'), '--limpiar',
+             '--clientes', str(args.clientes), '--compras', str(args.compras), '--semilla', str(args.semilla)],
+            check=True, capture_output=True
+        )
+
+        from app import create_app
+        from config import Config
+        from respuestas import brotli_disponible
+
+        def aplicacion(**ajustes):
+            return create_app(type('ConfigBench', (Config,), ajustes)).test_client()
+
+        legado = aplicacion(JSON_RAPIDO=False, COMPRESION=False)
+        rapido = aplicacion(JSON_RAPIDO=True, COMPRESION=True)
+
+        modos = [
+            ('legado', legado, {}),
+            ('orjson', rapido, {}),
+            ('orjson+gzip', rapido, {'Accept-Encoding': 'gzip'}),
+        ]
+        if brotli_disponible():
+            modos.append(('orjson+br', rapido, {'Accept-Encoding': 'br, gzip'}))
+        else:
+            print("ℹ️  brotli no está instalado: se omite la medición con br")
+
+        print(f"\n⏱  {args.repeticiones} peticiones por medición\n")
+        for nombre, url in ENDPOINTS:
+            print(f"  {nombre}")
+            base = None
+            for modo, cliente, encabezados in modos:
+                tamano, cpu, estado = medir(cliente, url, args.repeticiones, encabezados)
+                base = base or (tamano, cpu)
+                print(f"    {modo:<12} {estado}  {tamano:>9,} B ({tamano / base[0]:6.1%})  "
+                      f"{cpu:7.2f} ms CPU ({cpu / base[1]:6.1%})")
+
+            etag = rapido.get(url).headers['ETag']
+            tamano, cpu, estado = medir(rapido, url, args.repeticiones, {'If-None-Match': etag})
+            print(f"    {'304':<12} {estado}  {tamano:>9,} B ({tamano / base[0]:6.1%})  "
+                  f"{cpu:7.2f} ms CPU ({cpu / base[1]:6.1%})\n")
+
+        # Solo serialización y compresión, sin la consulta
+        datos = legado.get(ENDPOINTS[0][1]).get_json()
+        print(f"  serialización de listar-clientes (500), {args.repeticiones * 10} veces")
+        for modo, cliente in (('legado', legado), ('orjson', rapido)):
+            app = cliente.application
+            with app.app_context():
+                inicio = time.process_time()
+                for _ in range(args.repeticiones * 10):
+                    cuerpo = app.json.response(datos).get_data()
+                cpu = (time.process_time() - inicio) / (args.repeticiones * 10) * 1000
+            print(f"    {modo:<12} {len(cuerpo):>9,} B  {cpu:7.3f} ms CPU")
+        inicio = time.process_time()
+        for _ in range(args.repeticiones):
+            comprimido = gzip.compress(cuerpo, compresslevel=Config.COMPRESION_NIVEL_GZIP, mtime=0)
+        cpu = (time.process_time() - inicio) / args.repeticiones * 1000
+        print(f"    {'gzip':<12} {len(comprimido):>9,} B  {cpu:7.3f} ms CPU")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,141 @@
+# benchmarks/bench_ingesta.py
+"""
+Rendimiento de la ingesta masiva de compras (/api/compras/lote).
+
+Sobre una base generada con data/populate_db.py envía lotes con el cliente de
+pruebas de Flask y mide filas por segundo (incluye parseo, resolución de
+clientes, upsert, triggers del resumen diario y la respuesta JSON):
+  - ndjson / csv:   compras nuevas
+  - reenvío:        el mismo lote otra vez (todas sin_cambios)
+  - actualización:  el mismo lote con montos distintos (todas actualizadas)
+  - orm:            referencia, una compra por session.add + commit
+
+Uso:
+    python benchmarks/bench_ingesta.py --filas 100000 --transaccion 5000
+"""
+import sys
+import os
+import argparse
+import csv
+import io
+import json
+import random
+import sqlite3
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(RAIZ, 'backend'))
+
+CAMPOS = ['numero_documento', 'fecha_compra', 'monto', 'descripcion', 'numero_factura']
+
+
+def generar_compras(documentos, cantidad, prefijo, semilla):
+    rnd = random.Random(semilla)
+    ahora = datetime.now()
+    return [
+        {
+            'numero_documento': rnd.choice(documentos),
+            'fecha_compra': (ahora - timedelta(seconds=rnd.randint(0, 90 * 86400))).isoformat(timespec='seconds'),
+            'monto': f'{rnd.randint(1_000, 5_000_000)}.{rnd.randint(0, 99):02d}',
+            'descripcion': f'Producto {rnd.randint(1, 500)}',
+            'numero_factura': f'{prefijo}-{i}',
+        }
+        for i in range(cantidad)
+    ]
+
+
+def como_ndjson(compras):
+    return '\n'.join(json.dumps(compra) for compra in compras)
+
+
+def como_csv(compras):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CAMPOS, lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(compras)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clientes', type=int, default=10_000)
+    parser.add_argument('--filas', type=int, default=50_000, help='Compras por lote (default: 50000)')
+    parser.add_argument('--transaccion', type=int, help='Filas por transacción (default: INGESTA_FILAS_POR_TRANSACCION)')
+    parser.add_argument('--orm', type=int, default=2_000, help='Compras de la referencia ORM (default: 2000)')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_db = os.path.join(carpeta, 'bench.db')
+        os.environ['DATABASE_URL'] = f'sqlite:///{ruta_db}'
+        os.environ['EXPORT_FOLDER'] = os.path.join(carpeta, 'exports')
+
+        print(f"📦 Generando {args.clientes:,} clientes...")
+        subprocess.run(
+            [sys.executable, os.path.join(RAIZ, 'data', 'populate_db.py'), '--limpiar',
+             '--clientes', str(args.clientes), '--compras', str(args.clientes * 10), '--semilla', str(args.semilla)],
+            check=True, capture_output=True
+        )
+
+        conn = sqlite3.connect(ruta_db)
+        documentos = [fila[0] for fila in conn.execute('SELECT numero_documento FROM cliente')]
+        conn.close()
+
+        from app import create_app
+        from models import db, Cliente, Compra
+        from dinero import a_centavos
+
+        app = create_app()
+        if args.transaccion:
+            app.config['INGESTA_FILAS_POR_TRANSACCION'] = args.transaccion
+        cliente = app.test_client()
+
+        def enviar(nombre, cuerpo, tipo, filas, esperado):
+            inicio = time.perf_counter()
+            respuesta = cliente.post('/api/compras/lote?resultados=errores', data=cuerpo, content_type=tipo)
+            duracion = time.perf_counter() - inicio
+            datos = respuesta.get_json()
+            ok = respuesta.status_code == 200 and datos[esperado] == filas
+            print(f"  {nombre:<15} {filas:8,} filas  {duracion:7.2f} s  {filas / duracion:10,.0f} filas/s  "
+                  f"{'✅' if ok else '❌ ' + json.dumps({k: v for k, v in datos.items() if k != 'resultados'})}")
+            return ok
+
+        nuevas = generar_compras(documentos, args.filas, 'ND', args.semilla)
+        nuevas_csv = generar_compras(documentos, args.filas, 'CSV', args.semilla + 1)
+        modificadas = [{**compra, 'monto': '1.00'} for compra in nuevas]
+
+        print(f"\n⏱  Ingesta de {args.filas:,} compras por lote "
+              f"({app.config['INGESTA_FILAS_POR_TRANSACCION']:,} filas por transacción)\n")
+        resultados = [
+            enviar('ndjson', como_ndjson(nuevas), 'application/x-ndjson', args.filas, 'creada'),
+            enviar('csv', como_csv(nuevas_csv), 'text/csv', args.filas, 'creada'),
+            enviar('reenvío', como_ndjson(nuevas), 'application/x-ndjson', args.filas, 'sin_cambios'),
+            enviar('actualización', como_ndjson(modificadas), 'application/x-ndjson', args.filas, 'actualizada'),
+        ]
+
+        # Referencia: una compra por transacción con el ORM
+        with app.app_context():
+            ids = dict(db.session.execute(db.select(Cliente.numero_documento, Cliente.id)).all())
+            inicio = time.perf_counter()
+            for compra in generar_compras(documentos, args.orm, 'ORM', args.semilla + 2):
+                db.session.add(Compra(
+                    cliente_id=ids[compra['numero_documento']],
+                    fecha_compra=datetime.fromisoformat(compra['fecha_compra']),
+                    monto_centavos=a_centavos(compra['monto']),
+                    descripcion=compra['descripcion'],
+                    numero_factura=compra['numero_factura'],
+                ))
+                db.session.commit()
+            duracion = time.perf_counter() - inicio
+        print(f"  {'orm (fila a fila)':<15} {args.orm:8,} filas  {duracion:7.2f} s  {args.orm / duracion:10,.0f} filas/s")
+
+    sys.exit(0 if all(resultados) else 1)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
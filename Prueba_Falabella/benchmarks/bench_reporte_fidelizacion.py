@@ -0,0 +1,156 @@
+# benchmarks/bench_reporte_fidelizacion.py
+"""
+Compara la agregación del reporte de fidelización:
+  - legado: carga todas las compras del último mes con .all() y agrupa en Python
+  - sql:    una sola consulta con GROUP BY / HAVING sobre el resumen diario (consultas.py)
+
+Uso:
+    python benchmarks/bench_reporte_fidelizacion.py --clientes 50000 --compras 1000000
+"""
+import sys
+import os
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from flask import Flask
+from config import Config
+from models import db, Compra
+from consultas import consulta_clientes_fidelizacion
+from dinero import a_centavos
+
+
+def crear_app(ruta_db):
+    """Crea una app mínima apuntando a una base de datos temporal"""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{ruta_db}'
+    db.init_app(app)
+    return app
+
+
+def generar_datos(ruta_db, num_clientes, num_compras, semilla):
+    """Inserta clientes y compras sintéticas directamente con sqlite3"""
+    rnd = random.Random(semilla)
+    ahora = datetime.now()
+
+    conn = sqlite3.connect(ruta_db)
+    conn.execute('PRAGMA journal_mode=OFF')
+    conn.execute('PRAGMA synchronous=OFF')
+
+    conn.executemany(
+        'INSERT INTO tipo_documento (id, codigo, descripcion) VALUES (?, ?, ?)',
+        [(1, 'CC', 'Cédula de Ciudadanía'), (2, 'NIT', 'NIT'), (3, 'PA', 'Pasaporte')]
+    )
+    conn.executemany(
+        'INSERT INTO cliente (id, tipo_documento_id, numero_documento, nombre, apellido, '
+        'correo, telefono, fecha_registro) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        (
+            (i, rnd.randint(1, 3), str(1_000_000_000 + i), f'Nombre{i}', f'Apellido{i}',
+             f'cliente{i}@email.com', f'3{i:09d}', ahora - timedelta(days=365))
+            for i in range(1, num_clientes + 1)
+        )
+    )
+    conn.executemany(
+        'INSERT INTO compra (id, cliente_id, fecha_compra, monto_centavos, descripcion, numero_factura) '
+        'VALUES (?, ?, ?, ?, ?, ?)',
+        (
+            (i, rnd.randint(1, num_clientes),
+             ahora - timedelta(days=rnd.uniform(0, 60)),
+             rnd.randint(5_000_000, 200_000_000), 'Producto', f'FC-{i}')
+            for i in range(1, num_compras + 1)
+        )
+    )
+    conn.commit()
+    conn.close()
+
+
+def reporte_legado(fecha_limite, umbral):
+    """Réplica de la agregación original en Python (N+1 sobre las relaciones)"""
+    compras_recientes = Compra.query.filter(Compra.fecha_compra >= fecha_limite).all()
+
+    clientes_compras = {}
+    for compra in compras_recientes:
+        datos = clientes_compras.setdefault(
+            compra.cliente_id, {'cliente': compra.cliente, 'compras': 0, 'total': 0}
+        )
+        datos['compras'] += 1
+        datos['total'] += compra.monto_centavos
+
+    resultado = []
+    for datos in clientes_compras.values():
+        if datos['total'] > a_centavos(umbral):
+            cliente = datos['cliente']
+            resultado.append((
+                cliente.tipo_documento.descripcion, cliente.numero_documento,
+                datos['total'], datos['compras']
+            ))
+    return resultado
+
+
+def reporte_sql(fecha_limite, umbral):
+    """Agregación con una sola consulta agrupada"""
+    return [
+        (fila.tipo_documento, fila.numero_documento, fila.monto_total_centavos, fila.numero_compras)
+        for fila in db.session.execute(consulta_clientes_fidelizacion(fecha_limite, umbral))
+    ]
+
+
+def medir(nombre, funcion, *args):
+    db.session.expunge_all()
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    duracion = time.perf_counter() - inicio
+    print(f"  {nombre:<8} {duracion:8.3f} s  ({len(resultado)} clientes)")
+    return duracion, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clientes', type=int, default=50_000)
+    parser.add_argument('--compras', type=int, default=1_000_000)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--sin-legado', action='store_true', help='Omitir la ruta original')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_db = os.path.join(carpeta, 'bench.db')
+        app = crear_app(ruta_db)
+
+        with app.app_context():
+            db.create_all()
+
+        print(f"📦 Generando {args.clientes:,} clientes y {args.compras:,} compras...")
+        inicio = time.perf_counter()
+        generar_datos(ruta_db, args.clientes, args.compras, args.semilla)
+        print(f"   listo en {time.perf_counter() - inicio:.1f} s\n")
+
+        # La ventana se cuenta en días completos (como el resumen diario)
+        fecha_limite = (datetime.now() - timedelta(days=Config.DIAS_VENTANA_FIDELIZACION)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        umbral = Config.UMBRAL_FIDELIZACION
+
+        with app.app_context():
+            print("⏱  Reporte de fidelización")
+            t_sql, filas_sql = medir('sql', reporte_sql, fecha_limite, umbral)
+
+            if not args.sin_legado:
+                t_legado, filas_legado = medir('legado', reporte_legado, fecha_limite, umbral)
+
+                # Montos en centavos enteros: la comparación es exacta
+                esperado = {fila[1]: (fila[2], fila[3]) for fila in filas_legado}
+                obtenido = {fila[1]: (fila[2], fila[3]) for fila in filas_sql}
+                assert esperado == obtenido, 'Los resultados de ambas rutas no coinciden'
+
+                print(f"\n🚀 Aceleración: {t_legado / t_sql:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
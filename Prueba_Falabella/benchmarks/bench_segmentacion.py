@@ -0,0 +1,125 @@
+# benchmarks/bench_segmentacion.py
+"""
+Costo de la segmentación por ventanas y niveles al crecer la configuración.
+
+Compara, sobre una base generada con data/populate_db.py:
+  - por variante: una consulta agrupada sobre el resumen diario por cada
+                  (ventana, nivel), como el reporte de fidelización
+  - motor:        Segmentacion.resumen(), una sola pasada para todas
+Verifica además que ambos den los mismos conteos.
+
+Uso:
+    python benchmarks/bench_segmentacion.py --clientes 50000 --compras 1000000
+"""
+import sys
+import os
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import timedelta
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(RAIZ, 'backend'))
+
+# Configuraciones a medir: ventanas (días) con tres niveles cada una
+CONFIGURACIONES = [
+    (30,),
+    (7, 30, 90),
+    (7, 14, 30, 60, 90, 180),
+    (1, 3, 7, 14, 21, 30, 45, 60, 90, 120, 180, 365),
+]
+
+# Umbral en COP por día de ventana para bronce, plata y oro
+UMBRALES_DIARIOS = (30_000, 80_000, 160_000)
+
+
+def niveles(ventanas):
+    return {
+        dias: [(nombre, umbral * dias) for nombre, umbral in zip(('bronce', 'plata', 'oro'), UMBRALES_DIARIOS)]
+        for dias in ventanas
+    }
+
+
+def por_variante(segmentacion):
+    """Un GROUP BY + HAVING sobre el resumen por cada (ventana, nivel)"""
+    from sqlalchemy import select, func
+    from models import db, ResumenCompraDiaria
+    from consultas import consulta_totales_ventana
+    from dinero import a_centavos
+
+    resultado = {}
+    for dias in segmentacion.ventanas:
+        resultado[dias] = {}
+        umbrales = segmentacion.niveles[dias]
+        for i, (nivel, umbral) in enumerate(umbrales):
+            consulta = consulta_totales_ventana(segmentacion.ahora - timedelta(days=dias))
+            total = func.sum(ResumenCompraDiaria.total_centavos)
+            consulta = consulta.having(total > a_centavos(umbral))
+            if i + 1 < len(umbrales):
+                consulta = consulta.having(total <= a_centavos(umbrales[i + 1][1]))
+            resultado[dias][nivel] = db.session.scalar(select(func.count()).select_from(consulta.subquery()))
+    return resultado
+
+
+def cronometrar(funcion, repeticiones):
+    tiempos, resultado = [], None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clientes', type=int, default=20_000)
+    parser.add_argument('--compras', type=int, default=400_000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(carpeta, 'bench.db')}"
+        os.environ['EXPORT_FOLDER'] = os.path.join(carpeta, 'exports')
+
+        print(f"📦 Generando {args.clientes:,} clientes y {args.compras:,} compras...")
+        subprocess.run(
+            [sys.executable, os.path.join(RAIZ, 'data', 'populate_db.py'), '--limpiar',
+             '--clientes', str(args.clientes), '--compras', str(args.compras),
+             '--semilla', str(args.semilla)],
+            check=True, capture_output=True
+        )
+
+        from app import create_app
+        from segmentacion import Segmentacion
+
+        app = create_app()
+        diferencias = 0
+
+        print(f"\n⏱  Mediana de {args.repeticiones} ejecuciones\n")
+        with app.app_context():
+            for ventanas in CONFIGURACIONES:
+                segmentacion = Segmentacion(niveles(ventanas))
+                variantes = len(ventanas) * len(UMBRALES_DIARIOS)
+
+                ms_variante, conteos = cronometrar(lambda: por_variante(segmentacion), args.repeticiones)
+                ms_motor, resumen = cronometrar(segmentacion.resumen, args.repeticiones)
+
+                iguales = all(
+                    conteos[dias][nivel] == resumen[dias][nivel]['clientes']
+                    for dias in segmentacion.ventanas for nivel in segmentacion.nombres_niveles(dias)
+                )
+                diferencias += not iguales
+                print(f"  {len(ventanas):>2} ventanas ({variantes:>2} variantes)  "
+                      f"por variante {ms_variante:9.1f} ms  |  motor {ms_motor:8.1f} ms  "
+                      f"x{ms_variante / ms_motor:5.1f}  {'✅' if iguales else '❌ conteos distintos'}")
+
+    sys.exit(1 if diferencias else 0)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
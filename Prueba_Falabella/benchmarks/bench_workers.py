@@ -0,0 +1,108 @@
+# benchmarks/bench_workers.py
+"""
+Escalamiento de /api/buscar-cliente con el número de workers de gunicorn.
+
+Genera una base temporal una vez y, para cada cantidad de workers, levanta
+backend/servidor.py (gunicorn con preload) en un puerto libre y lo carga
+con clientes HTTP concurrentes. Reporta peticiones por segundo y latencias.
+El escalamiento está acotado por los núcleos disponibles (os.cpu_count()).
+
+Uso:
+    python benchmarks/bench_workers.py --workers 1,2,4 --peticiones 2000 --concurrencia 16
+"""
+import sys
+import os
+import argparse
+import random
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_endpoints import RAIZ, _http, _puerto_libre, muestra_documentos, percentiles
+
+
+def medir(args, entorno, ruta_db, workers):
+    puerto = _puerto_libre()
+    base = f'http://127.0.0.1:{puerto}'
+    servidor = subprocess.Popen(
+        [sys.executable, os.path.join(RAIZ, 'backend', 'servidor.py'), '--workers', str(workers),
+         '--bind', f'127.0.0.1:{puerto}', '--max-requests', '0'],
+        env={**entorno, 'GUNICORN_ACCESSLOG': ''},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(200):
+            try:
+                _http(base, 'GET', '/api/tipos-documento', None)
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError('El servidor no respondió')
+
+        rnd = random.Random(args.semilla)
+        documentos = muestra_documentos(ruta_db, args.semilla)
+        solicitudes = [
+            ('POST', '/api/buscar-cliente', {'tipo_documento': codigo, 'numero_documento': numero})
+            for codigo, numero in (rnd.choice(documentos) for _ in range(args.peticiones))
+        ]
+
+        # Calentamiento: que cada worker abra sus conexiones
+        with ThreadPoolExecutor(max_workers=args.concurrencia) as pool:
+            list(pool.map(lambda s: _http(base, *s), solicitudes[:args.concurrencia * 4]))
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrencia) as pool:
+            medidas = list(pool.map(lambda s: _http(base, *s), solicitudes))
+        duracion = time.perf_counter() - inicio
+
+        errores = sum(1 for _, estado in medidas if estado != 200)
+        return {
+            **percentiles([latencia for latencia, _ in medidas]),
+            'peticiones_s': args.peticiones / duracion,
+            'errores': errores,
+        }
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default='1,2,4', help='Cantidades de workers separadas por coma (default: 1,2,4)')
+    parser.add_argument('--clientes', type=int, default=20_000)
+    parser.add_argument('--compras', type=int, default=200_000)
+    parser.add_argument('--peticiones', type=int, default=2_000, help='Peticiones por medición (default: 2000)')
+    parser.add_argument('--concurrencia', type=int, default=16, help='Clientes concurrentes (default: 16)')
+    parser.add_argument('--semilla', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_db = os.path.join(carpeta, 'bench.db')
+        entorno = {
+            **os.environ,
+            'DATABASE_URL': f'sqlite:///{ruta_db}',
+            'EXPORT_FOLDER': os.path.join(carpeta, 'exports'),
+        }
+
+        print(f"📦 Generando {args.clientes:,} clientes y {args.compras:,} compras...")
+        subprocess.run(
+            [sys.executable, os.path.join(RAIZ, 'data', 'populate_db.py'), '--limpiar',
+             '--clientes', str(args.clientes), '--compras', str(args.compras), '--semilla', str(args.semilla)],
+            env=entorno, check=True, capture_output=True
+        )
+
+        print(f"⏱  buscar-cliente: {args.peticiones:,} peticiones, {args.concurrencia} clientes "
+              f"concurrentes, {os.cpu_count()} CPU\n")
+        referencia = None
+        for workers in (int(valor) for valor in args.workers.split(',')):
+            r = medir(args, entorno, ruta_db, workers)
+            referencia = referencia or r['peticiones_s']
+            print(f"  {workers:>3} workers  {r['peticiones_s']:8.1f} req/s (x{r['peticiones_s'] / referencia:4.2f})  "
+                  f"p50 {r['p50_ms']:7.1f} ms  p95 {r['p95_ms']:7.1f} ms  p99 {r['p99_ms']:7.1f} ms  "
+                  f"errores {r['errores']}")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,62 @@
+# data/limpiar_exportaciones.py
+import sys
+import os
+import argparse
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app import create_app
+from retencion import retencion, MOTIVOS
+
+
+def _megabytes(valor):
+    return f'{valor / (1024 * 1024):,.1f} MB'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Aplica la retención (edad, cantidad y tamaño máximos) a la carpeta de exportaciones'
+    )
+    parser.add_argument('--simular', action='store_true',
+                        help='Mostrar qué se eliminaría sin eliminar nada')
+    parser.add_argument('--max-edad', type=int,
+                        help='Edad máxima en segundos (default: RETENCION_MAX_EDAD_SEGUNDOS)')
+    parser.add_argument('--max-bytes', type=int,
+                        help='Tamaño total máximo en bytes (default: RETENCION_MAX_BYTES)')
+    parser.add_argument('--max-archivos', type=int,
+                        help='Cantidad máxima de archivos (default: RETENCION_MAX_ARCHIVOS)')
+    parser.add_argument('--gracia', type=int,
+                        help='No eliminar archivos usados hace menos de estos segundos '
+                             '(default: RETENCION_GRACIA_SEGUNDOS)')
+    args = parser.parse_args()
+
+    app = create_app()
+    for opcion, clave in (('max_edad', 'RETENCION_MAX_EDAD_SEGUNDOS'), ('max_bytes', 'RETENCION_MAX_BYTES'),
+                          ('max_archivos', 'RETENCION_MAX_ARCHIVOS'), ('gracia', 'RETENCION_GRACIA_SEGUNDOS')):
+        if getattr(args, opcion) is not None:
+            app.config[clave] = getattr(args, opcion)
+    retencion.init_app(app)
+
+    print(f"🧹 {'Simulando retención' if args.simular else 'Aplicando retención'} en {retencion.carpeta}")
+    print(f"   edad máx. {retencion.max_edad:,} s · {retencion.max_archivos:,} archivos · "
+          f"{_megabytes(retencion.max_bytes)} · gracia {retencion.gracia:,} s\n")
+
+    resultado = retencion.barrer(origen='cli', simular=args.simular)
+
+    verbo = 'se eliminarían' if args.simular else 'eliminados'
+    total_archivos = total_bytes = 0
+    for motivo in MOTIVOS:
+        archivos, liberados = resultado['eliminados'][motivo]
+        total_archivos += archivos
+        total_bytes += liberados
+        if archivos:
+            print(f"   {motivo:<9} {archivos:8,} archivos {verbo} ({_megabytes(liberados)})")
+
+    print(f"\n✅ {total_archivos:,} archivos {verbo}, {_megabytes(total_bytes)} liberados "
+          f"en {resultado['duracion']:.2f} s")
+    print(f"📁 Quedan {resultado['archivos']:,} archivos ({_megabytes(resultado['bytes'])})")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,41 @@
+# data/migrar.py
+import sys
+import os
+import argparse
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app import create_app
+from migraciones import preparar_esquema, version_actual, verificar_planes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aplica las migraciones pendientes del esquema')
+    parser.add_argument('--verificar', action='store_true',
+                        help='Verificar con EXPLAIN QUERY PLAN que las consultas usan índices')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        aplicadas = preparar_esquema()
+        for version, descripcion in aplicadas:
+            print(f"✅ Migración {version} aplicada: {descripcion}")
+        print(f"📌 Versión del esquema: {version_actual()}")
+
+        if args.verificar:
+            print("\n🔍 Planes de consulta")
+            fallidas = 0
+            for nombre, plan, ok in verificar_planes():
+                print(f"  {'✅' if ok else '❌'} {nombre}")
+                for detalle in plan:
+                    print(f"      {detalle}")
+                fallidas += not ok
+
+            if fallidas:
+                print(f"\n❌ {fallidas} consulta(s) recorren tablas o no usan el índice esperado")
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -1,283 +1,462 @@
 # data/populate_db.py
+"""
+Generador y cargador masivo de datos de prueba (no interactivo, con semilla).
+
+Genera clientes y compras con distribuciones configurables (monto, recencia
+y proporción de clientes que califican para fidelización) y los carga con
+inserciones executemany por lotes, con PRAGMAs de SQLite para carga masiva.
+Durante la carga se desactivan los triggers y los índices secundarios; al
+final se recrean y el resumen diario y el índice de búsqueda se reconstruyen
+en una sola pasada.
+
+Ejemplos:
+    python populate_db.py --limpiar
+    python populate_db.py --limpiar --clientes 1000000 --compras 20000000
+"""
 import sys
 import os
+import argparse
+import math
+import random
+import re
+import time
+from datetime import datetime, timedelta
+from itertools import islice
 
 # Agregar el directorio backend al path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
-from app import app, db
-from models import TipoDocumento, Cliente, Compra
-from datetime import datetime, timedelta
-import random
+from sqlalchemy import select, func, text
+from app import create_app, init_database
+from models import (
+    db, TipoDocumento, Cliente, Compra, TRIGGERS_RESUMEN, TRIGGERS_VERSION, TRIGGERS_BUSQUEDA,
+    VERSION_DATOS, VERSION_TIPOS_DOCUMENTO
+)
+from consultas import consulta_clientes_por_total, consulta_clientes_fidelizacion
+from resumen import reconstruir_resumen
+from busqueda import reconstruir_busqueda
+from segmentacion import Segmentacion
+from dinero import a_centavos, formatear_cop
 
-def limpiar_base_datos():
-    """Limpia todas las tablas"""
-    with app.app_context():
-        Compra.query.delete()
-        Cliente.query.delete()
-        TipoDocumento.query.delete()
-        db.session.commit()
-        print("✅ Base de datos limpiada")
+app = create_app()
 
+# PRAGMAs por conexión para la carga (se restauran al terminar). El modo de
+# journal se mantiene: en WAL no puede cambiarse con otras conexiones abiertas
+PRAGMAS_CARGA = {
+    'synchronous': 'OFF',
+    'temp_store': 'MEMORY',
+    'cache_size': '-262144',  # 256 MB
+}
 
-def poblar_tipos_documento():
-    """Crea los tipos de documento"""
-    with app.app_context():
-        tipos = [
-            TipoDocumento(codigo='CC', descripcion='Cédula de Ciudadanía'),
-            TipoDocumento(codigo='NIT', descripcion='NIT'),
-            TipoDocumento(codigo='PA', descripcion='Pasaporte')
-        ]
-        db.session.add_all(tipos)
-        db.session.commit()
-        print("✅ Tipos de documento creados")
-
-
-def poblar_clientes():
-    """Crea clientes de prueba"""
-    with app.app_context():
-        # Obtener tipos de documento
-        tipo_cc = TipoDocumento.query.filter_by(codigo='CC').first()
-        tipo_nit = TipoDocumento.query.filter_by(codigo='NIT').first()
-        tipo_pa = TipoDocumento.query.filter_by(codigo='PA').first()
-        
-        clientes = [
-            # Clientes que superarán los 5M (para fidelización)
-            Cliente(
-                tipo_documento_id=tipo_cc.id,
-                numero_documento='1234567890',
-                nombre='Juan',
-                apellido='Pérez García',
-                correo='juan.perez@email.com',
-                telefono='3101234567',
-                fecha_registro=datetime.now() - timedelta(days=180)
-            ),
-            Cliente(
-                tipo_documento_id=tipo_cc.id,
-                numero_documento='9876543210',
-                nombre='María',
-                apellido='González López',
-                correo='maria.gonzalez@email.com',
-                telefono='3109876543',
-                fecha_registro=datetime.now() - timedelta(days=150)
-            ),
-            Cliente(
-                tipo_documento_id=tipo_nit.id,
-                numero_documento='900123456-1',
-                nombre='Distribuidora',
-                apellido='El Éxito SAS',
-                correo='compras@exito.com',
-                telefono='6012345678',
-                fecha_registro=datetime.now() - timedelta(days=365)
-            ),
-            
-            # Clientes con compras menores (no califican para fidelización)
-            Cliente(
-                tipo_documento_id=tipo_cc.id,
-                numero_documento='1122334455',
-                nombre='Carlos',
-                apellido='Rodríguez Méndez',
-                correo='carlos.rodriguez@email.com',
-                telefono='3201122334',
-                fecha_registro=datetime.now() - timedelta(days=90)
-            ),
-            Cliente(
-                tipo_documento_id=tipo_pa.id,
-                numero_documento='AB123456',
-                nombre='John',
-                apellido='Smith',
-                correo='john.smith@email.com',
-                telefono='3157890123',
-                fecha_registro=datetime.now() - timedelta(days=60)
-            ),
-            Cliente(
-                tipo_documento_id=tipo_cc.id,
-                numero_documento='5566778899',
-                nombre='Ana',
-                apellido='Martínez Silva',
-                correo='ana.martinez@email.com',
-                telefono='3145566778',
-                fecha_registro=datetime.now() - timedelta(days=120)
-            ),
-            
-            # Cliente con compras antiguas (no califican por fecha)
-            Cliente(
-                tipo_documento_id=tipo_cc.id,
-                numero_documento='4455667788',
-                nombre='Luis',
-                apellido='Ramírez Torres',
-                correo='luis.ramirez@email.com',
-                telefono='3194455667',
-                fecha_registro=datetime.now() - timedelta(days=200)
-            ),
-        ]
-        
-        db.session.add_all(clientes)
-        db.session.commit()
-        print(f"✅ {len(clientes)} clientes creados")
-        
-        return clientes
-
-
-def poblar_compras():
-    """Crea compras de prueba"""
-    with app.app_context():
-        clientes = Cliente.query.all()
-        
-        productos = [
-            'Laptop Dell Inspiron 15',
-            'iPhone 14 Pro Max',
-            'Samsung Galaxy S23',
-            'Smart TV LG 55"',
-            'PlayStation 5',
-            'Xbox Series X',
-            'iPad Air',
-            'MacBook Pro',
-            'AirPods Pro',
-            'Nintendo Switch',
-            'Monitor Samsung 27"',
-            'Teclado Mecánico Logitech',
-            'Mouse Gamer Razer',
-            'Impresora HP LaserJet',
-            'Cámara Canon EOS',
-            'Audífonos Sony WH-1000XM5',
-            'Tablet Samsung Galaxy Tab',
-            'Smartwatch Apple Watch',
-            'Refrigerador LG',
-            'Lavadora Samsung'
-        ]
-        
-        compras = []
-        
-        # Cliente 1: Juan Pérez (superará los 5M en último mes)
-        cliente1 = Cliente.query.filter_by(numero_documento='1234567890').first()
-        for i in range(8):
-            compra = Compra(
-                cliente_id=cliente1.id,
-                fecha_compra=datetime.now() - timedelta(days=random.randint(1, 25)),
-                monto=random.uniform(800_000, 1_200_000),
-                descripcion=random.choice(productos),
-                numero_factura=f'FC-2024-{1000 + i}'
-            )
-            compras.append(compra)
-        
-        # Cliente 2: María González (superará los 5M en último mes)
-        cliente2 = Cliente.query.filter_by(numero_documento='9876543210').first()
-        for i in range(6):
-            compra = Compra(
-                cliente_id=cliente2.id,
-                fecha_compra=datetime.now() - timedelta(days=random.randint(1, 28)),
-                monto=random.uniform(1_000_000, 1_500_000),
-                descripcion=random.choice(productos),
-                numero_factura=f'FC-2024-{2000 + i}'
-            )
-            compras.append(compra)
-        
-        # Cliente 3: Distribuidora El Éxito (superará los 5M en último mes)
-        cliente3 = Cliente.query.filter_by(numero_documento='900123456-1').first()
-        for i in range(4):
-            compra = Compra(
-                cliente_id=cliente3.id,
-                fecha_compra=datetime.now() - timedelta(days=random.randint(5, 20)),
-                monto=random.uniform(2_000_000, 3_500_000),
-                descripcion=f'Lote de {random.choice(productos)}',
-                numero_factura=f'FC-2024-{3000 + i}'
-            )
-            compras.append(compra)
-        
-        # Cliente 4: Carlos Rodríguez (NO superará los 5M)
-        cliente4 = Cliente.query.filter_by(numero_documento='1122334455').first()
-        for i in range(3):
-            compra = Compra(
-                cliente_id=cliente4.id,
-                fecha_compra=datetime.now() - timedelta(days=random.randint(1, 25)),
-                monto=random.uniform(500_000, 900_000),
-                descripcion=random.choice(productos),
-                numero_factura=f'FC-2024-{4000 + i}'
-            )
-            compras.append(compra)
-        
-        # Cliente 5: John Smith (NO superará los 5M)
-        cliente5 = Cliente.query.filter_by(numero_documento='AB123456').first()
-        for i in range(2):
-            compra = Compra(
-                cliente_id=cliente5.id,
-                fecha_compra=datetime.now() - timedelta(days=random.randint(5, 20)),
-                monto=random.uniform(300_000, 700_000),
-                descripcion=random.choice(productos),
-                numero_factura=f'FC-2024-{5000 + i}'
-            )
-            compras.append(compra)
-        
-        # Cliente 6: Ana Martínez (compras moderadas)
-        cliente6 = Cliente.query.filter_by(numero_documento='5566778899').first()
-        for i in range(4):
-            compra = Compra(
-                cliente_id=cliente6.id,
-                fecha_compra=datetime.now() - timedelta(days=random.randint(2, 28)),
-                monto=random.uniform(600_000, 1_000_000),
-                descripcion=random.choice(productos),
-                numero_factura=f'FC-2024-{6000 + i}'
-            )
-            compras.append(compra)
-        
-        # Cliente 7: Luis Ramírez (compras ANTIGUAS, NO califican por fecha)
-        cliente7 = Cliente.query.filter_by(numero_documento='4455667788').first()
-        for i in range(10):
-            compra = Compra(
-                cliente_id=cliente7.id,
-                fecha_compra=datetime.now() - timedelta(days=random.randint(35, 120)),
-                monto=random.uniform(800_000, 1_500_000),
-                descripcion=random.choice(productos),
-                numero_factura=f'FC-2024-{7000 + i}'
+# Los números de documento generados no chocan con los del escenario de demostración
+PRIMER_DOCUMENTO = 2_000_000_000
+
+# Proporción de tipos de documento en los clientes generados
+PESOS_TIPOS = {'CC': 80, 'NIT': 15, 'PA': 5}
+
+# Cada cuántos lotes se imprime el avance
+LOTES_POR_REPORTE = 10
+
+NOMBRES = [
+    'Juan', 'María', 'Carlos', 'Ana', 'Luis', 'Laura', 'Andrés', 'Camila', 'Jorge', 'Valentina',
+    'Felipe', 'Daniela', 'Santiago', 'Paula', 'Diego', 'Natalia', 'Sebastián', 'Carolina',
+]
+
+APELLIDOS = [
+    'Pérez', 'González', 'Rodríguez', 'Martínez', 'Ramírez', 'Gómez', 'López', 'Díaz',
+    'Torres', 'Vargas', 'Moreno', 'Rojas', 'Castro', 'Ortiz', 'Silva', 'Méndez',
+]
+
+PRODUCTOS = [
+    'Laptop Dell Inspiron 15',
+    'iPhone 14 Pro Max',
+    'Samsung Galaxy S23',
+    'Smart TV LG 55"',
+    'PlayStation 5',
+    'Xbox Series X',
+    'iPad Air',
+    'MacBook Pro',
+    'AirPods Pro',
+    'Nintendo Switch',
+    'Monitor Samsung 27"',
+    'Teclado Mecánico Logitech',
+    'Mouse Gamer Razer',
+    'Impresora HP LaserJet',
+    'Cámara Canon EOS',
+    'Audífonos Sony WH-1000XM5',
+    'Tablet Samsung Galaxy Tab',
+    'Smartwatch Apple Watch',
+    'Refrigerador LG',
+    'Lavadora Samsung'
+]
+
+# Escenario fijo de demostración:
+# (tipo, documento, nombre, apellido, correo, teléfono, días desde el registro,
+#  (cantidad de compras, rango de monto, rango de días atrás, primera factura))
+CLIENTES_DEMO = [
+    # Clientes que superarán los 5M (para fidelización)
+    ('CC', '1234567890', 'Juan', 'Pérez García', 'juan.perez@email.com', '3101234567', 180,
+     (8, (800_000, 1_200_000), (1, 25), 1000)),
+    ('CC', '9876543210', 'María', 'González López', 'maria.gonzalez@email.com', '3109876543', 150,
+     (6, (1_000_000, 1_500_000), (1, 28), 2000)),
+    ('NIT', '900123456-1', 'Distribuidora', 'El Éxito SAS', 'compras@exito.com', '6012345678', 365,
+     (4, (2_000_000, 3_500_000), (5, 20), 3000)),
+    # Clientes con compras menores (no califican para fidelización)
+    ('CC', '1122334455', 'Carlos', 'Rodríguez Méndez', 'carlos.rodriguez@email.com', '3201122334', 90,
+     (3, (500_000, 900_000), (1, 25), 4000)),
+    ('PA', 'AB123456', 'John', 'Smith', 'john.smith@email.com', '3157890123', 60,
+     (2, (300_000, 700_000), (5, 20), 5000)),
+    ('CC', '5566778899', 'Ana', 'Martínez Silva', 'ana.martinez@email.com', '3145566778', 120,
+     (4, (600_000, 1_000_000), (2, 28), 6000)),
+    # Cliente con compras antiguas (no califican por fecha)
+    ('CC', '4455667788', 'Luis', 'Ramírez Torres', 'luis.ramirez@email.com', '3194455667', 200,
+     (10, (800_000, 1_500_000), (35, 120), 7000)),
+]
+
+
+# ==================== Generación ====================
+
+class Generador:
+    """
+    Genera filas de cliente y compra de forma determinista a partir de una
+    semilla. Las filas son tuplas en el orden de las columnas de cada tabla.
+    Los ids se asignan de forma explícita desde el máximo actual, así la
+    carga puede agregarse a una base existente.
+    """
+
+    def __init__(self, args, ids_tipos, primer_cliente, primera_compra, ahora):
+        self.args = args
+        self.rnd = random.Random(args.semilla)
+        self.ahora = ahora
+        self.primer_cliente = primer_cliente
+        self.siguiente_compra = primera_compra
+        self.ids_por_codigo = ids_tipos
+        self.ids_tipos = [ids_tipos[codigo] for codigo in PESOS_TIPOS]
+        self.pesos_acumulados = list(_acumular(PESOS_TIPOS.values()))
+        self.mu_monto = math.log(args.monto_mediana)
+        self.umbral = app.config['UMBRAL_FIDELIZACION']
+        self.ventana = app.config['DIAS_VENTANA_FIDELIZACION']
+
+    def _fecha(self, dias_atras):
+        # Mismo formato con el que SQLAlchemy guarda DateTime en SQLite
+        return (self.ahora - timedelta(days=dias_atras)).isoformat(' ', 'microseconds')
+
+    def _compra(self, cliente_id, fecha, monto_centavos, descripcion=None, factura=None):
+        compra_id = self.siguiente_compra
+        self.siguiente_compra += 1
+        return (
+            compra_id,
+            cliente_id,
+            fecha,
+            monto_centavos,
+            descripcion or self.rnd.choice(PRODUCTOS),
+            factura or f'FC-{compra_id:010d}',
+        )
+
+    def clientes_demo(self):
+        """Filas del escenario de demostración (clientes y sus compras)"""
+        clientes, compras = [], []
+        for cliente_id, demo in enumerate(CLIENTES_DEMO, start=self.primer_cliente):
+            codigo, documento, nombre, apellido, correo, telefono, dias, plan = demo
+            clientes.append((
+                cliente_id,
+                self.ids_por_codigo[codigo],
+                documento,
+                nombre,
+                apellido,
+                correo,
+                telefono,
+                self._fecha(dias),
+            ))
+            cantidad, (monto_min, monto_max), (dias_min, dias_max), factura = plan
+            for i in range(cantidad):
+                compras.append(self._compra(
+                    cliente_id,
+                    self._fecha(self.rnd.randint(dias_min, dias_max)),
+                    a_centavos(round(self.rnd.uniform(monto_min, monto_max), 2)),
+                    factura=f'FC-2024-{factura + i}'
+                ))
+        self.primer_cliente += len(clientes)
+        return clientes, compras
+
+    def clientes(self):
+        rnd = self.rnd
+        for cliente_id in range(self.primer_cliente, self.primer_cliente + self.args.clientes):
+            nombre = rnd.choice(NOMBRES)
+            apellido = f'{rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}'
+            yield (
+                cliente_id,
+                rnd.choices(self.ids_tipos, cum_weights=self.pesos_acumulados)[0],
+                str(PRIMER_DOCUMENTO + cliente_id),
+                nombre,
+                apellido,
+                f'cliente{cliente_id}@email.com',
+                f'3{cliente_id % 1_000_000_000:09d}',
+                self._fecha(rnd.uniform(0, self.args.dias_historia)),
             )
-            compras.append(compra)
-        
-        db.session.add_all(compras)
-        db.session.commit()
-        print(f"✅ {len(compras)} compras creadas")
 
+    def _dias_atras(self):
+        """Recencia exponencial acotada a la historia generada"""
+        return self.rnd.expovariate(1 / self.args.recencia_media) % self.args.dias_historia
 
-def mostrar_resumen():
-    """Muestra un resumen de los datos creados"""
-    with app.app_context():
-        print("\n" + "="*60)
-        print("📊 RESUMEN DE DATOS DE PRUEBA")
-        print("="*60)
-        
-        clientes = Cliente.query.all()
-        print(f"\n👥 Total de clientes: {len(clientes)}")
-        
-        fecha_limite = datetime.now() - timedelta(days=30)
-        
-        for cliente in clientes:
-            compras_recientes = [c for c in cliente.compras if c.fecha_compra >= fecha_limite]
-            total_reciente = sum(c.monto for c in compras_recientes)
-            
-            print(f"\n  • {cliente.nombre} {cliente.apellido}")
-            print(f"    Doc: {cliente.numero_documento}")
-            print(f"    Compras (último mes): {len(compras_recientes)}")
-            print(f"    Total (último mes): ${total_reciente:,.2f} COP")
-            
-            if total_reciente > 5_000_000:
-                print(f"    ✅ CALIFICA para fidelización")
-            else:
-                print(f"    ❌ NO califica para fidelización")
-        
-        print("\n" + "="*60)
+    def _monto_centavos(self):
+        """Monto log-normal alrededor de la mediana, mínimo un peso"""
+        return max(100, int(self.rnd.lognormvariate(self.mu_monto, self.args.dispersion) * 100))
 
+    def compras(self):
+        """
+        Primero las compras que llevan a los clientes seleccionados por encima
+        del umbral dentro de la ventana; el resto del total pedido se reparte
+        entre todos los clientes (sesgado hacia pocos si concentracion > 1).
+        """
+        rnd, args = self.rnd, self.args
+        restantes = args.compras
+
+        for cliente_id in range(self.primer_cliente, self.primer_cliente + args.clientes):
+            if restantes <= 0:
+                break
+            if rnd.random() >= args.fidelizacion:
+                continue
+            cantidad = min(rnd.randint(2, 6), restantes)
+            objetivo = a_centavos(self.umbral) * rnd.uniform(1.05, 2.0)
+            pesos = [rnd.uniform(0.5, 1.5) for _ in range(cantidad)]
+            for peso in pesos:
+                yield self._compra(
+                    cliente_id,
+                    self._fecha(rnd.uniform(0, self.ventana - 1)),
+                    math.ceil(objetivo * peso / sum(pesos))
+                )
+            restantes -= cantidad
+
+        for _ in range(restantes):
+            cliente_id = self.primer_cliente + int(args.clientes * rnd.random() ** args.concentracion)
+            yield self._compra(cliente_id, self._fecha(self._dias_atras()), self._monto_centavos())
+
+
+def _acumular(valores):
+    total = 0
+    for valor in valores:
+        total += valor
+        yield total
+
+
+# ==================== Carga ====================
+
+def _nombres_triggers():
+    return [
+        m.group(1) for sentencia in TRIGGERS_RESUMEN + TRIGGERS_VERSION + TRIGGERS_BUSQUEDA
+        if (m := re.search(r'CREATE TRIGGER IF NOT EXISTS (\w+)', sentencia))
+    ]
+
+
+def _indices_secundarios():
+    """Índices no únicos de cliente y compra: se recrean al final de la carga"""
+    return [
+        indice for tabla in (Cliente.__table__, Compra.__table__)
+        for indice in tabla.indexes if not indice.unique
+    ]
+
+
+def _sql_insercion(tabla):
+    columnas = [columna.name for columna in tabla.columns]
+    return f"INSERT INTO {tabla.name} ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})"
+
+
+def cargar(conn, tabla, filas, total, tamano_lote):
+    """
+    Inserta filas (tuplas) en lotes con executemany del driver, sin el
+    procesamiento por parámetro del ORM; retorna (filas, segundos)
+    """
+    inicio = time.perf_counter()
+    insertadas = 0
+    sentencia = _sql_insercion(tabla)
+    lotes = 0
+
+    while lote := list(islice(filas, tamano_lote)):
+        conn.exec_driver_sql(sentencia, lote)
+        conn.commit()
+        insertadas += len(lote)
+        lotes += 1
+        if lotes % LOTES_POR_REPORTE == 0:
+            duracion = time.perf_counter() - inicio
+            print(f"   {tabla.name}: {insertadas:,}/{total:,} ({insertadas / duracion:,.0f} filas/s)")
+
+    return insertadas, time.perf_counter() - inicio
+
+
+def _reportar(nombre, filas, duracion):
+    velocidad = filas / duracion if duracion else 0
+    print(f"✅ {filas:,} {nombre} en {duracion:.1f} s ({velocidad:,.0f} filas/s)")
+
+
+def poblar(args):
+    """Limpia (opcional), genera y carga los datos; retorna el tiempo total"""
+    inicio_total = time.perf_counter()
+    ids_tipos = {tipo.codigo: tipo.id for tipo in TipoDocumento.query.all()}
+    indices = _indices_secundarios()
+
+    with db.engine.connect() as conn:
+        anteriores = {
+            nombre: conn.exec_driver_sql(f'PRAGMA {nombre}').scalar() for nombre in PRAGMAS_CARGA
+        }
+        for nombre, valor in PRAGMAS_CARGA.items():
+            conn.exec_driver_sql(f'PRAGMA {nombre} = {valor}')
+
+        try:
+            # Sin triggers ni índices secundarios: cada fila se escribe una sola vez
+            for nombre in _nombres_triggers():
+                conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS {nombre}')
+            for indice in indices:
+                indice.drop(conn, checkfirst=True)
+            conn.commit()
+
+            if args.limpiar:
+                for tabla in ('resumen_compra_diaria', 'compra', 'cliente'):
+                    conn.exec_driver_sql(f'DELETE FROM {tabla}')
+                conn.commit()
+                print("✅ Base de datos limpiada")
+
+            primer_cliente = (conn.scalar(select(func.max(Cliente.id))) or 0) + 1
+            primera_compra = (conn.scalar(select(func.max(Compra.id))) or 0) + 1
+            generador = Generador(args, ids_tipos, primer_cliente, primera_compra, datetime.now())
+
+            if args.demo:
+                existe = conn.scalar(
+                    select(Cliente.id).where(Cliente.numero_documento == CLIENTES_DEMO[0][1])
+                )
+                if existe:
+                    print("ℹ️  El escenario de demostración ya existe, se omite")
+                else:
+                    clientes_demo, compras_demo = generador.clientes_demo()
+                    conn.exec_driver_sql(_sql_insercion(Cliente.__table__), clientes_demo)
+                    conn.exec_driver_sql(_sql_insercion(Compra.__table__), compras_demo)
+                    conn.commit()
+                    print(f"✅ Escenario de demostración: {len(clientes_demo)} clientes, "
+                          f"{len(compras_demo)} compras")
+
+            _reportar('clientes', *cargar(
+                conn, Cliente.__table__, generador.clientes(), args.clientes, args.lote
+            ))
+            _reportar('compras', *cargar(
+                conn, Compra.__table__, generador.compras(), args.compras, args.lote
+            ))
+        finally:
+            inicio = time.perf_counter()
+            for indice in indices:
+                indice.create(conn, checkfirst=True)
+            for trigger in TRIGGERS_RESUMEN + TRIGGERS_VERSION + TRIGGERS_BUSQUEDA:
+                conn.exec_driver_sql(trigger)
+            conn.commit()
+            print(f"✅ Índices y triggers recreados en {time.perf_counter() - inicio:.1f} s")
+
+            for nombre, valor in anteriores.items():
+                conn.exec_driver_sql(f'PRAGMA {nombre} = {valor}')
+
+    # Resumen diario en una pasada (los triggers estaban desactivados)
+    inicio = time.perf_counter()
+    filas = reconstruir_resumen()
+    _reportar('filas de resumen diario', filas, time.perf_counter() - inicio)
+
+    # Índice de búsqueda de texto completo en una pasada (recrea sus triggers)
+    inicio = time.perf_counter()
+    reconstruir_busqueda()
+    _reportar('clientes en el índice de búsqueda', db.session.scalar(select(func.count(Cliente.id))),
+              time.perf_counter() - inicio)
+
+    # Los triggers de versión no vieron la carga: invalidar cachés derivadas
+    db.session.execute(text(
+        'UPDATE version_datos SET version = version + 1, actualizado_en = CURRENT_TIMESTAMP '
+        f'WHERE id IN ({VERSION_DATOS}, {VERSION_TIPOS_DOCUMENTO})'
+    ))
+    db.session.execute(text('PRAGMA analysis_limit = 1000'))
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+    # En WAL: pasar la carga al archivo principal y truncar el -wal
+    db.session.execute(text('PRAGMA wal_checkpoint(TRUNCATE)'))
+
+    return time.perf_counter() - inicio_total
+
+
+def mostrar_resumen(limite=10):
+    """Muestra un resumen de los datos cargados"""
+    print("\n" + "="*60)
+    print("📊 RESUMEN DE DATOS DE PRUEBA")
+    print("="*60)
+
+    fecha_limite = datetime.now() - timedelta(days=app.config['DIAS_VENTANA_FIDELIZACION'])
+    umbral = app.config['UMBRAL_FIDELIZACION']
+    calificados = db.session.scalar(
+        select(func.count()).select_from(consulta_clientes_fidelizacion(fecha_limite, umbral).subquery())
+    )
+
+    print(f"\n👥 Total de clientes: {Cliente.query.count():,}")
+    print(f"🛒 Total de compras: {Compra.query.count():,}")
+    print(f"⭐ Califican para fidelización: {calificados:,}")
+
+    # Todas las ventanas y niveles de SEGMENTACION_NIVELES en una sola consulta
+    segmentacion = Segmentacion.desde_config(app.config)
+    resumen = segmentacion.resumen()
+    print(f"\n🎯 Segmentación por ventana:")
+    for dias in segmentacion.ventanas:
+        niveles = '  '.join(
+            f"{nivel}: {resumen[dias][nivel]['clientes']:,}" for nivel in segmentacion.nombres_niveles(dias)
+        )
+        print(f"    {dias:>3} días → {niveles}")
+    print(f"\n🏆 Top {limite} (último mes):")
+
+    # Totales leídos del resumen diario de compras
+    for fila in db.session.execute(consulta_clientes_por_total(fecha_limite, limite)):
+        print(f"\n  • {fila.nombre} {fila.apellido}")
+        print(f"    Doc: {fila.numero_documento}")
+        print(f"    Compras (último mes): {fila.numero_compras}")
+        print(f"    Total (último mes): {formatear_cop(fila.total_centavos)} COP")
+
+        if fila.total_centavos > a_centavos(umbral):
+            print(f"    ✅ CALIFICA para fidelización")
+        else:
+            print(f"    ❌ NO califica para fidelización")
+
+    print("\n" + "="*60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clientes', type=int, default=1_000, help='Clientes a generar (default: 1000)')
+    parser.add_argument('--compras', type=int, default=20_000, help='Compras a generar (default: 20000)')
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--limpiar', action='store_true', help='Eliminar clientes y compras existentes')
+    parser.add_argument('--sin-demo', dest='demo', action='store_false',
+                        help='No incluir los clientes fijos de demostración')
+    parser.add_argument('--lote', type=int, default=50_000, help='Filas por executemany (default: 50000)')
+    parser.add_argument('--fidelizacion', type=float, default=0.05,
+                        help='Proporción de clientes que superan el umbral en la ventana (default: 0.05)')
+    parser.add_argument('--monto-mediana', type=float, default=150_000,
+                        help='Mediana del monto por compra en pesos (default: 150000)')
+    parser.add_argument('--dispersion', type=float, default=1.0,
+                        help='Sigma de la distribución log-normal del monto (default: 1.0)')
+    parser.add_argument('--recencia-media', type=float, default=60,
+                        help='Días promedio desde la compra, distribución exponencial (default: 60)')
+    parser.add_argument('--dias-historia', type=int, default=365,
+                        help='Antigüedad máxima de compras y registros en días (default: 365)')
+    parser.add_argument('--concentracion', type=float, default=1.0,
+                        help='1 reparte las compras uniformemente; >1 las concentra en pocos clientes')
+    args = parser.parse_args()
+
+    if args.compras and not args.clientes:
+        parser.error('--compras requiere --clientes mayor que 0')
+    if not 0 <= args.fidelizacion <= 1:
+        parser.error('--fidelizacion debe estar entre 0 y 1')
 
-if __name__ == '__main__':
     print(" Iniciando población de base de datos...")
-    print("\n ADVERTENCIA: Esto eliminará todos los datos existentes")
-    respuesta = input("¿Desea continuar? (s/n): ")
-    
-    if respuesta.lower() == 's':
-        limpiar_base_datos()
-        poblar_tipos_documento()
-        poblar_clientes()
-        poblar_compras()
+    init_database(app)
+
+    with app.app_context():
+        duracion = poblar(args)
         mostrar_resumen()
-        print("\n✅ ¡Base de datos poblada exitosamente!")
-    else:
-        print("\n❌ Operación cancelada")
\ No newline at end of file
+
+    print(f"\n✅ ¡Base de datos poblada exitosamente en {duracion:.1f} s!")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,38 @@
+# data/reconstruir_resumen.py
+import sys
+import os
+import argparse
+import time
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app import create_app
+from migraciones import preparar_esquema
+from resumen import reconstruir_resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Reconstruye el resumen diario de compras por cliente desde la tabla compra'
+    )
+    parser.add_argument('--lote', type=int, default=10_000,
+                        help='Número de clientes por lote (default: 10000)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        preparar_esquema()
+
+        inicio = time.perf_counter()
+        filas = reconstruir_resumen(
+            tamano_lote=args.lote,
+            progreso=lambda hecho, total: print(f"   clientes procesados: {hecho:,}/{total:,}")
+        )
+        duracion = time.perf_counter() - inicio
+
+        print(f"\n✅ Resumen reconstruido: {filas:,} filas en {duracion:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
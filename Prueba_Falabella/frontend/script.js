@@ -4,50 +4,63 @@ const API_URL = 'http://127.0.0.1:5000/api';
 // Variable global para almacenar los datos del cliente actual
 let clienteActual = null;
 
+// Paginación de la lista de clientes
+const CLIENTES_POR_PAGINA = 50;
+let siguienteCursor = null;
+
+// Intervalo de consulta del estado de trabajos asíncronos (ms)
+const INTERVALO_CONSULTA_TRABAJO = 1000;
+
+// Búsqueda incremental por texto: espera tras la última tecla (ms) y mínimo de caracteres
+const ESPERA_BUSQUEDA = 250;
+const MIN_CARACTERES_BUSQUEDA = 2;
+const SUGERENCIAS_MAX = 10;
+let temporizadorBusqueda = null;
+let busquedaEnCurso = null;
+
 // Evento al cargar el DOM
 document.addEventListener('DOMContentLoaded', function() {
     const searchForm = document.getElementById('searchForm');
     searchForm.addEventListener('submit', buscarCliente);
     
+    const busquedaTexto = document.getElementById('busquedaTexto');
+    busquedaTexto.addEventListener('input', programarBusquedaTexto);
+    busquedaTexto.addEventListener('keydown', function(event) {
+        if (event.key === 'Escape') {
+            ocultarSugerencias();
+        }
+    });
+    document.addEventListener('click', function(event) {
+        if (!event.target.closest('.busqueda-texto')) {
+            ocultarSugerencias();
+        }
+    });
+    
     // Cargar lista de clientes al inicio
     cargarListaClientes();
 });
 
-// Función para cargar lista de clientes
+// Función para cargar lista de clientes (primera página)
 async function cargarListaClientes() {
     const container = document.getElementById('listaClientesContainer');
     
     try {
         container.innerHTML = '<p class="loading-text">Cargando clientes...</p>';
+        siguienteCursor = null;
         
-        const response = await fetch(`${API_URL}/listar-clientes`);
+        const response = await fetch(`${API_URL}/listar-clientes?limite=${CLIENTES_POR_PAGINA}`);
         const data = await response.json();
         
         if (response.ok && data.clientes.length > 0) {
-            let html = '<div class="clientes-grid">';
-            
-            data.clientes.forEach(cliente => {
-                const cardClass = cliente.califica_fidelizacion ? 'cliente-card fidelizacion' : 'cliente-card';
-                
-                html += `
-                    <div class="${cardClass}" onclick="seleccionarCliente('${cliente.codigo_tipo}', '${cliente.numero_documento}')">
-                        <div class="cliente-tipo">${cliente.codigo_tipo}</div>
-                        <div class="cliente-nombre">${cliente.nombre_completo}</div>
-                        <div class="cliente-doc">📄 ${cliente.numero_documento}</div>
-                        <div class="cliente-info">
-                            📧 ${cliente.correo}<br>
-                            📞 ${cliente.telefono}
-                        </div>
-                        <div class="cliente-total">
-                            💰 Último mes: ${formatearMoneda(cliente.total_ultimo_mes)}
-                        </div>
-                        ${cliente.califica_fidelizacion ? '<span class="badge-fidelizacion">⭐ CALIFICA FIDELIZACIÓN</span>' : ''}
-                    </div>
-                `;
-            });
-            
-            html += '</div>';
-            container.innerHTML = html;
+            container.innerHTML = `
+                <div class="clientes-grid" id="clientesGrid"></div>
+                <div class="cargar-mas">
+                    <button id="btnCargarMas" onclick="cargarMasClientes()" class="btn btn-secondary">
+                        ⬇️ Cargar más clientes
+                    </button>
+                </div>
+            `;
+            agregarClientes(data);
         } else {
             container.innerHTML = '<div class="no-clientes">No hay clientes registrados</div>';
         }
@@ -58,6 +71,65 @@ async function cargarListaClientes() {
     }
 }
 
+// Función para cargar la siguiente página de clientes
+async function cargarMasClientes() {
+    if (!siguienteCursor) {
+        return;
+    }
+    
+    const btn = document.getElementById('btnCargarMas');
+    btn.disabled = true;
+    
+    try {
+        const params = new URLSearchParams({ limite: CLIENTES_POR_PAGINA, cursor: siguienteCursor });
+        const response = await fetch(`${API_URL}/listar-clientes?${params}`);
+        const data = await response.json();
+        
+        if (response.ok) {
+            agregarClientes(data);
+        } else {
+            mostrarError(data.error || 'Error al cargar más clientes');
+        }
+        
+    } catch (error) {
+        mostrarError('Error al cargar más clientes');
+        console.error('Error:', error);
+    } finally {
+        btn.disabled = false;
+    }
+}
+
+// Función para agregar una página de clientes a la grilla
+function agregarClientes(data) {
+    let html = '';
+    
+    data.clientes.forEach(cliente => {
+        const cardClass = cliente.califica_fidelizacion ? 'cliente-card fidelizacion' : 'cliente-card';
+        
+        html += `
+            <div class="${cardClass}" onclick="seleccionarCliente('${cliente.codigo_tipo}', '${cliente.numero_documento}')">
+                <div class="cliente-tipo">${cliente.codigo_tipo}</div>
+                <div class="cliente-nombre">${cliente.nombre_completo}</div>
+                <div class="cliente-doc">📄 ${cliente.numero_documento}</div>
+                <div class="cliente-info">
+                    📧 ${cliente.correo}<br>
+                    📞 ${cliente.telefono}
+                </div>
+                <div class="cliente-total">
+                    💰 Último mes: ${formatearMoneda(cliente.total_ultimo_mes)}
+                </div>
+                ${cliente.califica_fidelizacion ? '<span class="badge-fidelizacion">⭐ CALIFICA FIDELIZACIÓN</span>' : ''}
+            </div>
+        `;
+    });
+    
+    document.getElementById('clientesGrid').insertAdjacentHTML('beforeend', html);
+    
+    // Guardar el cursor de la siguiente página y ocultar el botón si no hay más
+    siguienteCursor = data.next_cursor;
+    document.getElementById('btnCargarMas').style.display = siguienteCursor ? 'inline-block' : 'none';
+}
+
 // Función para seleccionar un cliente desde la lista
 function seleccionarCliente(tipoDoc, numeroDoc) {
     // Llenar el formulario
@@ -76,6 +148,79 @@ function seleccionarCliente(tipoDoc, numeroDoc) {
     }, 500);
 }
 
+// Búsqueda por texto: espera a que el usuario deje de escribir
+function programarBusquedaTexto() {
+    clearTimeout(temporizadorBusqueda);
+    temporizadorBusqueda = setTimeout(buscarPorTexto, ESPERA_BUSQUEDA);
+}
+
+// Función para buscar clientes por nombre, apellido, correo o teléfono
+async function buscarPorTexto() {
+    const texto = document.getElementById('busquedaTexto').value.trim();
+    
+    if (texto.replace(/[^\p{L}\p{N}]/gu, '').length < MIN_CARACTERES_BUSQUEDA) {
+        ocultarSugerencias();
+        return;
+    }
+    
+    // Cancelar la petición anterior: solo importa la del último texto
+    if (busquedaEnCurso) {
+        busquedaEnCurso.abort();
+    }
+    busquedaEnCurso = new AbortController();
+    
+    try {
+        const params = new URLSearchParams({ q: texto, limite: SUGERENCIAS_MAX });
+        const response = await fetch(`${API_URL}/clientes/busqueda?${params}`, {
+            signal: busquedaEnCurso.signal
+        });
+        const data = await response.json();
+        
+        if (response.ok) {
+            mostrarSugerencias(data.clientes);
+        } else {
+            ocultarSugerencias();
+        }
+        
+    } catch (error) {
+        if (error.name !== 'AbortError') {
+            ocultarSugerencias();
+            console.error('Error:', error);
+        }
+    }
+}
+
+// Función para mostrar la lista de sugerencias
+function mostrarSugerencias(clientes) {
+    const lista = document.getElementById('sugerencias');
+    
+    if (clientes.length === 0) {
+        lista.innerHTML = '<li class="sin-sugerencias">Sin coincidencias</li>';
+    } else {
+        lista.innerHTML = clientes.map(cliente => `
+            <li data-tipo="${escaparHtml(cliente.codigo_tipo)}" data-numero="${escaparHtml(cliente.numero_documento)}">
+                <span class="sugerencia-nombre">${escaparHtml(cliente.nombre_completo)}</span>
+                <span class="sugerencia-detalle">
+                    ${escaparHtml(cliente.codigo_tipo)} ${escaparHtml(cliente.numero_documento)} · 📧 ${escaparHtml(cliente.correo)} · 📞 ${escaparHtml(cliente.telefono)}
+                </span>
+            </li>
+        `).join('');
+        
+        lista.querySelectorAll('li[data-numero]').forEach(item => {
+            item.addEventListener('click', function() {
+                ocultarSugerencias();
+                seleccionarCliente(item.dataset.tipo, item.dataset.numero);
+            });
+        });
+    }
+    
+    lista.style.display = 'block';
+}
+
+function ocultarSugerencias() {
+    document.getElementById('sugerencias').style.display = 'none';
+}
+
 // Función para buscar cliente
 async function buscarCliente(event) {
     event.preventDefault();
@@ -92,17 +237,12 @@ async function buscarCliente(event) {
         // Mostrar indicador de carga
         mostrarCargando();
         
-        // Hacer petición a la API
-        const response = await fetch(`${API_URL}/buscar-cliente`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                tipo_documento: tipoDocumento,
-                numero_documento: numeroDocumento
-            })
+        // Hacer petición a la API (GET: el navegador revalida con ETag y recibe 304 si no hay cambios)
+        const params = new URLSearchParams({
+            tipo_documento: tipoDocumento,
+            numero_documento: numeroDocumento
         });
+        const response = await fetch(`${API_URL}/buscar-cliente?${params}`);
         
         ocultarCargando();
         
@@ -231,26 +371,59 @@ async function exportarCliente(formato) {
     }
 }
 
-// Función para generar reporte de fidelización
+// Función para generar reporte de fidelización (trabajo asíncrono)
 async function generarReporteFidelizacion() {
+    const btn = document.getElementById('btnReporteFidelizacion');
+    
     try {
-        mostrarCargando();
+        btn.disabled = true;
+        btn.textContent = '⏳ Generando reporte...';
         
-        const response = await fetch(`${API_URL}/reporte-fidelizacion`, {
-            method: 'GET'
+        // Encolar el trabajo
+        const response = await fetch(`${API_URL}/reporte-fidelizacion/trabajos`, {
+            method: 'POST'
         });
+        let trabajo = await response.json();
         
-        ocultarCargando();
+        if (!response.ok) {
+            mostrarError(trabajo.error || 'Error al generar el reporte');
+            return;
+        }
         
-        if (response.ok) {
-            // Descargar archivo
-            const blob = await response.blob();
+        // Consultar el estado hasta que termine
+        while (trabajo.estado === 'pendiente' || trabajo.estado === 'ejecutando') {
+            await esperar(INTERVALO_CONSULTA_TRABAJO);
+            const estado = await fetch(`${API_URL}/trabajos/${trabajo.id}`);
+            trabajo = await estado.json();
+            
+            if (!estado.ok) {
+                mostrarError(trabajo.error || 'Error al consultar el reporte');
+                return;
+            }
+            btn.textContent = `⏳ Generando reporte... ${Math.round(trabajo.progreso * 100)}%`;
+        }
+        
+        if (trabajo.estado === 'error') {
+            mostrarError(trabajo.error || 'Error al generar el reporte');
+            return;
+        }
+        
+        if (!trabajo.disponible) {
+            mostrarError(trabajo.mensaje || 'No hay clientes que califiquen para fidelización');
+            return;
+        }
+        
+        // Descargar archivo
+        const descarga = await fetch(`${API_URL}/trabajos/${trabajo.id}/descarga`);
+        
+        if (descarga.ok) {
+            const blob = await descarga.blob();
             const url = window.URL.createObjectURL(blob);
             const a = document.createElement('a');
             a.href = url;
             
             // Obtener nombre del archivo
-            const contentDisposition = response.headers.get('Content-Disposition');
+            const contentDisposition = descarga.headers.get('Content-Disposition');
             let filename = 'reporte_fidelizacion.xlsx';
             
             if (contentDisposition) {
@@ -268,17 +441,23 @@ async function generarReporteFidelizacion() {
             
             mostrarExito('Reporte de fidelización descargado exitosamente');
         } else {
-            const data = await response.json();
+            const data = await descarga.json();
             mostrarError(data.mensaje || data.error || 'No hay clientes que califiquen para fidelización');
         }
         
     } catch (error) {
-        ocultarCargando();
         mostrarError('Error al generar el reporte');
         console.error('Error:', error);
+    } finally {
+        btn.disabled = false;
+        btn.textContent = '📥 Descargar Reporte de Fidelización';
     }
 }
 
+function esperar(ms) {
+    return new Promise(resolve => setTimeout(resolve, ms));
+}
+
 // Funciones auxiliares
 function formatearMoneda(valor) {
     return new Intl.NumberFormat('es-CO', {
@@ -289,6 +468,12 @@ function formatearMoneda(valor) {
     }).format(valor);
 }
 
+function escaparHtml(texto) {
+    const div = document.createElement('div');
+    div.textContent = texto;
+    return div.innerHTML.replace(/"/g, '&quot;');
+}
+
 function formatearFecha(fecha) {
     const date = new Date(fecha);
     return date.toLocaleDateString('es-CO', {
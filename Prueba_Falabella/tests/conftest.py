@@ -0,0 +1,45 @@
+# tests/conftest.py
+import os
+import sys
+import subprocess
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Agregar el directorio backend al path
+sys.path.append(os.path.join(RAIZ, 'backend'))
+
+
+def poblar(carpeta, clientes, compras):
+    """Genera carpeta/database.db con data/populate_db.py (incluye ANALYZE)"""
+    entorno = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{carpeta / 'database.db'}",
+        EXPORT_FOLDER=str(carpeta / 'exports'),
+    )
+    subprocess.run(
+        [sys.executable, os.path.join(RAIZ, 'data', 'populate_db.py'),
+         '--limpiar', '--clientes', str(clientes), '--compras', str(compras)],
+        env=entorno, check=True, capture_output=True,
+    )
+
+
+def crear_app(carpeta, **opciones):
+    """
+    Aplicación sobre carpeta (database.db, exportaciones y métricas) con una
+    configuración explícita: no lee ni modifica os.environ
+    """
+    from app import create_app
+    from config import Config
+    from models import tipos_documento
+
+    exportaciones = str(carpeta / 'exports')
+    config = type('ConfigPruebas', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{carpeta / 'database.db'}",
+        'EXPORT_FOLDER': exportaciones,
+        'TRABAJOS_FOLDER': os.path.join(exportaciones, 'trabajos'),
+        'METRICAS_FOLDER': str(carpeta / 'metricas'),
+        **opciones,
+    })
+    # La caché de tipos de documento es del proceso, no de la aplicación
+    tipos_documento.invalidar()
+    return create_app(config)
\ No newline at end of file
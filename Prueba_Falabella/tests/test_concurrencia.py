@@ -0,0 +1,137 @@
+# tests/test_concurrencia.py
+"""
+Lectores concurrentes mientras un escritor inserta compras sobre una base
+en archivo (WAL + motor de solo lectura, la configuración por defecto):
+los lectores avanzan mientras la transacción de escritura está abierta,
+una lectura abierta no bloquea el commit y nadie recibe "database is
+locked". La versión con métricas de latencia es
+benchmarks/bench_concurrencia.py.
+"""
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from conftest import poblar, crear_app
+
+LECTORES = 3
+LOTES = 6
+FILAS_POR_LOTE = 1_000
+ESPERA_MAXIMA_SEGUNDOS = 10  # por lote, esperando que los lectores avancen
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    carpeta = tmp_path_factory.mktemp('concurrencia')
+    poblar(carpeta, clientes=2_000, compras=20_000)
+    return crear_app(carpeta)
+
+
+def _documentos(app):
+    from models import db
+    with app.app_context():
+        return db.session.execute(db.text(
+            'SELECT t.codigo, c.numero_documento FROM cliente c '
+            'JOIN tipo_documento t ON t.id = c.tipo_documento_id'
+        )).all()
+
+
+def test_lectores_avanzan_durante_la_escritura(app):
+    from models import db
+
+    documentos = _documentos(app)
+    escribiendo = threading.Event()
+    terminado = threading.Event()
+    errores_escritor = []
+    lecturas = [0] * LECTORES          # lecturas con la transacción de escritura abierta
+    fallidas = [[] for _ in range(LECTORES)]
+
+    def escribir():
+        rnd = random.Random(1)
+        try:
+            with app.app_context(), db.engine.connect() as conn:
+                max_cliente = conn.exec_driver_sql('SELECT MAX(id) FROM cliente').scalar()
+                ahora = datetime.now()
+                for lote in range(LOTES):
+                    conn.exec_driver_sql('BEGIN IMMEDIATE')
+                    conn.exec_driver_sql(
+                        'INSERT INTO compra (cliente_id, fecha_compra, monto_centavos, descripcion, '
+                        'numero_factura) VALUES (?, ?, ?, ?, ?)',
+                        [
+                            (rnd.randint(1, max_cliente),
+                             (ahora - timedelta(days=rnd.uniform(0, 60))).isoformat(' ', 'microseconds'),
+                             rnd.randint(5_000_000, 200_000_000), 'Producto', f'CONC-{lote}-{i}')
+                            for i in range(FILAS_POR_LOTE)
+                        ]
+                    )
+                    # Transacción abierta: los lectores deben seguir respondiendo
+                    escribiendo.set()
+                    inicio, limite = sum(lecturas), time.monotonic() + ESPERA_MAXIMA_SEGUNDOS
+                    while sum(lecturas) - inicio < LECTORES and time.monotonic() < limite:
+                        time.sleep(0.01)
+                    escribiendo.clear()
+                    conn.commit()
+        except Exception as e:
+            errores_escritor.append(e)
+        finally:
+            terminado.set()
+
+    def leer(numero):
+        rnd = random.Random(numero)
+        cliente = app.test_client()
+        while not terminado.is_set():
+            escenario = rnd.choice(('listar', 'buscar', 'reporte'))
+            if escenario == 'listar':
+                respuesta = cliente.get(f'/api/listar-clientes?limite=50&offset={rnd.randint(0, 500)}')
+            elif escenario == 'buscar':
+                codigo, numero_doc = rnd.choice(documentos)
+                respuesta = cliente.get(
+                    f'/api/buscar-cliente?tipo_documento={codigo}&numero_documento={numero_doc}'
+                )
+            else:
+                respuesta = cliente.get('/api/reporte-fidelizacion')
+            if respuesta.status_code != 200:
+                fallidas[numero].append((escenario, respuesta.status_code, respuesta.get_data(as_text=True)[:200]))
+            elif escribiendo.is_set():
+                lecturas[numero] += 1
+
+    hilos = [threading.Thread(target=leer, args=(i,)) for i in range(LECTORES)]
+    hilos.append(threading.Thread(target=escribir))
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join(timeout=120)
+
+    assert not any(hilo.is_alive() for hilo in hilos)
+    assert not errores_escritor
+    assert not [f for por_lector in fallidas for f in por_lector]
+    assert sum(lecturas) >= LOTES * LECTORES
+    with app.app_context():
+        insertadas = db.session.execute(
+            db.text("SELECT COUNT(*) FROM compra WHERE numero_factura LIKE 'CONC-%'")
+        ).scalar()
+    assert insertadas == LOTES * FILAS_POR_LOTE
+
+def test_lectura_abierta_no_bloquea_el_commit(app):
+    from models import db
+
+    with app.app_context():
+        motor_lectura = app.extensions.get('motor_lectura', db.engine)
+        with motor_lectura.connect() as lector, db.engine.connect() as escritor:
+            # Transacción de lectura abierta (instantánea) durante todo el commit
+            lector.exec_driver_sql('BEGIN')
+            contar = 'SELECT COUNT(*) FROM compra'
+            antes = lector.exec_driver_sql(contar).scalar()
+
+            escritor.exec_driver_sql('BEGIN IMMEDIATE')
+            escritor.exec_driver_sql(
+                'INSERT INTO compra (cliente_id, fecha_compra, monto_centavos, descripcion, numero_factura) '
+                "SELECT MIN(id), '2024-01-01 00:00:00.000000', 100, 'Producto', 'CONC-INSTANTANEA' FROM cliente"
+            )
+            inicio = time.monotonic()
+            escritor.commit()
+            assert time.monotonic() - inicio < 1
+
+            assert lector.exec_driver_sql(contar).scalar() == antes
+            lector.rollback()
+            assert lector.exec_driver_sql(contar).scalar() == antes + 1
\ No newline at end of file
@@ -0,0 +1,75 @@
+# tests/test_exportacion.py
+"""
+Paridad de las exportaciones (exportacion.py) con la implementación
+anterior basada en pandas: CSV idéntico byte a byte y Excel con los mismos
+valores celda a celda y encabezados en negrita. Se omite sin pandas
+(pip install -r backend/requirements-bench.txt).
+"""
+import os
+import random
+import sys
+import pytest
+from conftest import RAIZ, poblar, crear_app
+
+pytest.importorskip('pandas')
+
+# Implementación anterior y comparación de libros: las del benchmark de costo
+sys.path.append(os.path.join(RAIZ, 'benchmarks'))
+from bench_exportacion import (  # noqa: E402
+    csv_cliente_legado, csv_cliente_nuevo, excel_cliente_legado, excel_cliente_nuevo,
+    reporte_legado, reporte_nuevo, contenido_excel
+)
+
+MUESTRA = 10
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    carpeta = tmp_path_factory.mktemp('exportacion')
+    poblar(carpeta, clientes=300, compras=3000)
+    app = crear_app(carpeta)
+    with app.app_context():
+        yield app
+
+
+def _muestra():
+    """Clientes de muestra más uno sin compras (si lo hay): [(cliente, fila)]"""
+    from models import db, Cliente, Compra, tipos_documento
+    from exportacion import fila_datos_cliente
+
+    clientes = db.session.scalars(db.select(Cliente).order_by(Cliente.id)).all()
+    muestra = random.Random(42).sample(clientes, MUESTRA)
+    sin_compras = db.session.scalars(
+        db.select(Cliente).where(~Cliente.id.in_(db.select(Compra.cliente_id))).limit(1)
+    ).first()
+    if sin_compras is not None:
+        muestra.append(sin_compras)
+    return [
+        (cliente, fila_datos_cliente(cliente, tipos_documento.por_id(cliente.tipo_documento_id).descripcion))
+        for cliente in muestra
+    ]
+
+
+def test_csv_cliente_identico_byte_a_byte(app, tmp_path):
+    for cliente, fila in _muestra():
+        legado, nuevo = tmp_path / 'legado.csv', tmp_path / 'nuevo.csv'
+        csv_cliente_legado(legado, cliente, fila)
+        csv_cliente_nuevo(nuevo, cliente, fila)
+        assert nuevo.read_bytes() == legado.read_bytes(), cliente.numero_documento
+
+
+def test_excel_cliente_mismos_valores(app, tmp_path):
+    for cliente, fila in _muestra():
+        legado, nuevo = tmp_path / 'legado.xlsx', tmp_path / 'nuevo.xlsx'
+        excel_cliente_legado(legado, cliente, fila)
+        excel_cliente_nuevo(nuevo, cliente, fila)
+        assert contenido_excel(nuevo) == contenido_excel(legado), cliente.numero_documento
+
+
+def test_reporte_fidelizacion_mismos_valores(app, tmp_path):
+    legado, nuevo = tmp_path / 'legado.xlsx', tmp_path / 'nuevo.xlsx'
+    reporte_legado(legado)
+    reporte_nuevo(nuevo)
+    contenido = contenido_excel(nuevo)
+    assert contenido == contenido_excel(legado)
+    assert len(contenido['Clientes a Fidelizar'][0]) > 1
\ No newline at end of file
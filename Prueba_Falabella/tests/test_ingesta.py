@@ -0,0 +1,130 @@
+# tests/test_ingesta.py
+import io
+import json
+import uuid
+import pytest
+from conftest import poblar, crear_app
+
+# Bloques pequeños: cada lote de prueba abarca varias transacciones
+FILAS_POR_TRANSACCION = 2
+MAX_FILAS = 7
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    carpeta = tmp_path_factory.mktemp('ingesta')
+    poblar(carpeta, clientes=20, compras=100)
+    return crear_app(carpeta, INGESTA_FILAS_POR_TRANSACCION=FILAS_POR_TRANSACCION, INGESTA_MAX_FILAS=MAX_FILAS)
+
+
+@pytest.fixture(scope='module')
+def cliente_db(app):
+    """(numero_documento, código de su tipo de documento) de un cliente existente"""
+    from models import db, Cliente
+    with app.app_context():
+        cliente = db.session.scalars(db.select(Cliente).order_by(Cliente.id)).first()
+        return cliente.numero_documento, cliente.tipo_documento.codigo
+
+
+def _factura():
+    return f'TEST-{uuid.uuid4().hex[:12]}'
+
+
+def _compra(cliente_db, factura, monto='15000.50', **campos):
+    numero, tipo = cliente_db
+    return {
+        'numero_documento': numero, 'tipo_documento': tipo, 'fecha_compra': '2024-05-01T10:00:00',
+        'monto': monto, 'descripcion': 'Compra de prueba', 'numero_factura': factura, **campos
+    }
+
+
+def _enviar_ndjson(app, lineas, consulta=''):
+    cuerpo = '\n'.join(linea if isinstance(linea, str) else json.dumps(linea) for linea in lineas)
+    return app.test_client().post(
+        f'/api/compras/lote{consulta}', data=io.BytesIO(cuerpo.encode('utf-8')),
+        content_type='application/x-ndjson'
+    )
+
+
+def _montos(app, facturas):
+    """{numero_factura: monto_centavos} de las facturas que existen"""
+    from models import db, Compra
+    with app.app_context():
+        return dict(db.session.execute(
+            db.select(Compra.numero_factura, Compra.monto_centavos).where(Compra.numero_factura.in_(facturas))
+        ).all())
+
+
+def test_upsert_por_numero_factura(app, cliente_db):
+    nueva, existente = _factura(), _factura()
+    assert _enviar_ndjson(app, [_compra(cliente_db, existente)]).get_json()['creada'] == 1
+
+    respuesta = _enviar_ndjson(app, [
+        _compra(cliente_db, nueva),
+        _compra(cliente_db, existente),
+        _compra(cliente_db, existente, monto='20000'),
+        # Repetida en el mismo lote: se compara con la versión anterior del lote
+        _compra(cliente_db, existente, monto='20000'),
+    ])
+    datos = respuesta.get_json()
+    assert respuesta.status_code == 200
+    assert [resultado['estado'] for resultado in datos['resultados']] == [
+        'creada', 'sin_cambios', 'actualizada', 'sin_cambios'
+    ]
+    assert (datos['creada'], datos['actualizada'], datos['sin_cambios'], datos['error']) == (1, 1, 2, 0)
+    assert _montos(app, [nueva, existente]) == {nueva: 1_500_050, existente: 2_000_000}
+
+
+def test_filas_con_error_no_detienen_el_lote(app, cliente_db):
+    valida = _factura()
+    numero, tipo = cliente_db
+    otro_tipo = 'PA' if tipo != 'PA' else 'CC'
+    respuesta = _enviar_ndjson(app, [
+        '{"numero_documento": ',
+        '',
+        '[1, 2]',
+        _compra(cliente_db, _factura(), numero_documento='no-existe'),
+        _compra(cliente_db, _factura(), tipo_documento='XX'),
+        _compra(cliente_db, _factura(), tipo_documento=otro_tipo),
+        '   ',
+        _compra(cliente_db, _factura(), fecha_compra='ayer'),
+        _compra(cliente_db, valida),
+    ])
+    datos = respuesta.get_json()
+    assert respuesta.status_code == 200
+    # Las líneas vacías no cuentan como filas
+    assert datos['procesadas'] == 7
+    assert [resultado['estado'] for resultado in datos['resultados']] == ['error'] * 6 + ['creada']
+    assert [resultado['error'] for resultado in datos['resultados'][:3]] == [
+        'JSON inválido', 'Cada línea debe ser un objeto JSON', 'Cliente no encontrado'
+    ]
+    assert _montos(app, [valida]) == {valida: 1_500_050}
+
+    solo_errores = _enviar_ndjson(app, ['no es json', _compra(cliente_db, _factura())], '?resultados=errores')
+    assert [resultado['fila'] for resultado in solo_errores.get_json()['resultados']] == [1]
+
+
+def test_csv_con_bom(app, cliente_db):
+    numero, tipo = cliente_db
+    factura = _factura()
+    cuerpo = (
+        '\ufeffnumero_documento,tipo_documento,fecha_compra,monto_centavos,descripcion,numero_factura\r\n'
+        f'{numero},{tipo},2024-05-01 10:00:00,123456,"Compra, con coma",{factura}\r\n'
+    )
+    respuesta = app.test_client().post(
+        '/api/compras/lote', data=io.BytesIO(cuerpo.encode('utf-8')), content_type='text/csv'
+    )
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()['resultados'] == [{'fila': 1, 'numero_factura': factura, 'estado': 'creada'}]
+    assert _montos(app, [factura]) == {factura: 123_456}
+
+
+def test_lote_demasiado_grande_conserva_los_bloques_confirmados(app, cliente_db):
+    facturas = [_factura() for _ in range(MAX_FILAS + 2)]
+    respuesta = _enviar_ndjson(app, [_compra(cliente_db, factura) for factura in facturas])
+
+    assert respuesta.status_code == 413
+    # Bloques de 2: se confirmaron las filas 1-6; la 7 estaba en el bloque en curso
+    aplicadas = MAX_FILAS // FILAS_POR_TRANSACCION * FILAS_POR_TRANSACCION
+    assert respuesta.get_json()['procesadas'] == aplicadas
+    assert set(_montos(app, facturas)) == set(facturas[:aplicadas])
\ No newline at end of file
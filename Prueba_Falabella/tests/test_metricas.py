@@ -0,0 +1,77 @@
+# tests/test_metricas.py
+import os
+import subprocess
+import sys
+import textwrap
+import pytest
+from flask import Flask
+from conftest import RAIZ
+
+CONTADOR = 'prueba_peticiones_total'
+
+
+def _registro(carpeta):
+    """Registro de un worker que comparte la carpeta de métricas"""
+    from metricas import Registro
+    app = Flask(__name__)
+    app.config.update(METRICAS_FOLDER=str(carpeta), METRICAS_INTERVALO_SEGUNDOS=60)
+    registro = Registro()
+    registro.init_app(app)
+    registro.contador(CONTADOR, 'Peticiones de prueba', ('ruta',))
+    return registro
+
+
+def _worker_terminado(carpeta, cantidad):
+    """Ejecuta un worker en otro proceso que suma cantidad, vuelca y termina"""
+    codigo = textwrap.dedent(f'''
+        import sys
+        sys.path.insert(0, {os.path.join(RAIZ, 'backend')!r})
+        sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})
+        from test_metricas import _registro
+        registro = _registro({str(carpeta)!r})
+        registro._metricas[{CONTADOR!r}].inc({cantidad}, ruta='/a')
+        registro.volcar()
+    ''')
+    subprocess.run([sys.executable, '-c', codigo], check=True)
+
+
+def _valor(registro, ruta='/a'):
+    linea = f'{CONTADOR}{{ruta="{ruta}"}} '
+    for texto in registro.exponer().splitlines():
+        if texto.startswith(linea):
+            return float(texto[len(linea):])
+    return 0
+
+
+@pytest.fixture
+def carpeta(tmp_path):
+    return tmp_path / 'metricas'
+
+
+def test_metrics_combina_los_workers_vivos(carpeta):
+    uno, otro = _registro(carpeta), _registro(carpeta)
+    uno._metricas[CONTADOR].inc(3, ruta='/a')
+    otro._metricas[CONTADOR].inc(4, ruta='/a')
+    otro._metricas[CONTADOR].inc(1, ruta='/b')
+    otro.volcar()
+
+    # Cualquier worker expone la suma de todos
+    assert _valor(uno) == 7
+    assert _valor(uno, '/b') == 1
+    assert _valor(otro) == 7
+
+
+def test_workers_terminados_se_compactan_sin_retroceder(carpeta):
+    registro = _registro(carpeta)
+    registro._metricas[CONTADOR].inc(3, ruta='/a')
+    _worker_terminado(carpeta, 5)
+
+    assert _valor(registro) == 8
+    # El archivo del worker terminado quedó sumado en el acumulado
+    archivos = sorted(archivo for archivo in os.listdir(carpeta) if archivo.endswith('.json'))
+    assert archivos == sorted([registro.ACUMULADO, os.path.basename(registro._archivo)])
+    assert _valor(registro) == 8
+
+    _worker_terminado(carpeta, 2)
+    assert _valor(registro) == 10
+    assert _valor(registro) == 10
\ No newline at end of file
@@ -0,0 +1,92 @@
+# tests/test_migraciones.py
+import threading
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.exc import OperationalError
+from conftest import crear_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    # Base nueva: nace con el esquema y la versión de la última migración
+    from app import init_database
+    app = crear_app(tmp_path)
+    init_database(app)
+    return app
+
+
+def _estado(app):
+    """(user_version, tablas, columnas de compra)"""
+    from models import db
+    with app.app_context():
+        with db.engine.connect() as conn:
+            version = conn.exec_driver_sql('PRAGMA user_version').scalar()
+        inspector = inspect(db.engine)
+        return version, set(inspector.get_table_names()), {c['name'] for c in inspector.get_columns('compra')}
+
+
+def test_migracion_fallida_no_deja_cambios(app, monkeypatch):
+    import migraciones
+    version, tablas, columnas = _estado(app)
+    siguiente = version + 1
+    monkeypatch.setattr(migraciones, 'MIGRACIONES', [*migraciones.MIGRACIONES, (siguiente, 'Falla a la mitad', [
+        'CREATE TABLE prueba_migracion (id INTEGER PRIMARY KEY)',
+        'ALTER TABLE compra ADD COLUMN prueba_migracion INTEGER',
+        'INSERT INTO prueba_migracion (id) VALUES (1)',
+        'SELECT * FROM tabla_que_no_existe',
+    ])])
+
+    with app.app_context(), pytest.raises(OperationalError):
+        migraciones.migrar()
+
+    # Ni el DDL ni el DML ni user_version quedaron confirmados
+    assert _estado(app) == (version, tablas, columnas)
+
+
+def test_migraciones_previas_a_la_fallida_quedan_aplicadas(app, monkeypatch):
+    import migraciones
+    version, tablas, _ = _estado(app)
+    monkeypatch.setattr(migraciones, 'MIGRACIONES', [
+        *migraciones.MIGRACIONES,
+        (version + 1, 'Correcta', ['CREATE TABLE prueba_correcta (id INTEGER PRIMARY KEY)']),
+        (version + 2, 'Falla', [
+            'CREATE TABLE prueba_fallida (id INTEGER PRIMARY KEY)',
+            'SELECT * FROM tabla_que_no_existe',
+        ]),
+    ])
+
+    with app.app_context(), pytest.raises(OperationalError):
+        migraciones.migrar()
+
+    version_final, tablas_finales, _ = _estado(app)
+    assert version_final == version + 1
+    assert tablas_finales == tablas | {'prueba_correcta'}
+
+    # Corregida, la migración pendiente se aplica sola en el siguiente arranque
+    migraciones.MIGRACIONES[-1] = (version + 2, 'Corregida', ['CREATE TABLE prueba_fallida (id INTEGER PRIMARY KEY)'])
+    with app.app_context():
+        assert migraciones.migrar() == [(version + 2, 'Corregida')]
+    assert _estado(app)[0] == version + 2
+
+def test_migracion_espera_al_escritor_en_curso(app, monkeypatch):
+    # Con un BEGIN diferido la migración leería una instantánea que el
+    # escritor deja obsoleta al confirmar y fallaría al pasar a escribir;
+    # BEGIN IMMEDIATE espera (busy_timeout) a que el escritor termine
+    import migraciones
+    from models import db
+    version = _estado(app)[0]
+    monkeypatch.setattr(migraciones, 'MIGRACIONES', [*migraciones.MIGRACIONES, (version + 1, 'Lee y luego escribe', [
+        'SELECT COUNT(*) FROM tipo_documento',
+        'CREATE TABLE prueba_migracion (id INTEGER PRIMARY KEY)',
+    ])])
+
+    with app.app_context():
+        escritor = db.engine.raw_connection()
+        escritor.execute('BEGIN IMMEDIATE')
+        escritor.execute("INSERT INTO tipo_documento (codigo, descripcion) VALUES ('CE', 'Cédula de Extranjería')")
+        threading.Timer(0.5, escritor.commit).start()
+        try:
+            assert migraciones.migrar() == [(version + 1, 'Lee y luego escribe')]
+        finally:
+            escritor.close()
+    assert _estado(app)[0] == version + 1
\ No newline at end of file
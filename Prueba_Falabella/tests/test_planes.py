@@ -0,0 +1,28 @@
+# tests/test_planes.py
+import pytest
+from conftest import poblar, crear_app
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    """Aplicación sobre una base temporal poblada (con ANALYZE) por populate_db.py"""
+    carpeta = tmp_path_factory.mktemp('planes')
+    poblar(carpeta, clientes=2000, compras=40000)
+    return crear_app(carpeta)
+
+
+def test_recorrido_con_indice_cuenta_como_recorrido():
+    from migraciones import _recorridos, _indices_buscados
+    plan = [
+        'SCAN resumen_compra_diaria USING INDEX sqlite_autoindex_resumen_compra_diaria_1',
+        'SEARCH compra USING COVERING INDEX ix_compra_fecha_cliente_monto (fecha_compra>?)',
+    ]
+    assert _recorridos(plan) == {'resumen_compra_diaria'}
+    assert _indices_buscados(plan) == {'ix_compra_fecha_cliente_monto'}
+
+
+def test_consultas_calientes_usan_indices(app):
+    from migraciones import verificar_planes
+    with app.app_context():
+        fallidas = {nombre: plan for nombre, plan, ok in verificar_planes() if not ok}
+    assert not fallidas
\ No newline at end of file
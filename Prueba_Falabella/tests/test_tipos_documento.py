@@ -0,0 +1,80 @@
+# tests/test_tipos_documento.py
+from contextlib import contextmanager
+from datetime import datetime
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from conftest import poblar, crear_app
+
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    carpeta = tmp_path_factory.mktemp('tipos_documento')
+    poblar(carpeta, clientes=50, compras=500)
+    return crear_app(carpeta)
+
+
+@contextmanager
+def sentencias():
+    """Lista de las sentencias SQL ejecutadas (en cualquier motor) dentro del bloque"""
+    ejecutadas = []
+
+    def anotar(conn, cursor, sentencia, *args):
+        ejecutadas.append(sentencia)
+
+    event.listen(Engine, 'before_cursor_execute', anotar)
+    try:
+        yield ejecutadas
+    finally:
+        event.remove(Engine, 'before_cursor_execute', anotar)
+
+
+def _url_cliente(app):
+    from models import db, Cliente
+    with app.app_context():
+        cliente = db.session.scalars(db.select(Cliente).order_by(Cliente.id)).first()
+        url = (f'/api/buscar-cliente?tipo_documento={cliente.tipo_documento.codigo}'
+               f'&numero_documento={cliente.numero_documento}')
+        return url, cliente.id
+
+
+def _es_select_tipos(sentencia):
+    return sentencia.lstrip().upper().startswith('SELECT') and 'FROM tipo_documento' in sentencia
+
+
+def test_escritura_de_compra_no_recarga_tipos_documento(app):
+    from models import db, Compra
+    url, cliente_id = _url_cliente(app)
+    cliente = app.test_client()
+    assert cliente.get(url).status_code == 200  # carga la caché
+
+    with sentencias() as estable:
+        assert cliente.get(url).status_code == 200
+
+    with app.app_context():
+        db.session.add(Compra(
+            cliente_id=cliente_id, fecha_compra=datetime.now(), monto_centavos=12_300,
+            descripcion='Compra de prueba', numero_factura='TEST-TIPOS-1'
+        ))
+        db.session.commit()
+
+    with sentencias() as tras_escritura:
+        respuesta = cliente.get(url)
+    assert respuesta.status_code == 200
+    assert not [s for s in tras_escritura if _es_select_tipos(s)]
+    assert len(tras_escritura) == len(estable)
+
+
+def test_cambio_en_tipos_documento_recarga_la_cache(app):
+    from models import db, TipoDocumento
+    url, _ = _url_cliente(app)
+    cliente = app.test_client()
+    assert cliente.get(url).status_code == 200
+
+    with app.app_context():
+        db.session.add(TipoDocumento(codigo='CE', descripcion='Cédula de Extranjería'))
+        db.session.commit()
+
+    with sentencias() as ejecutadas:
+        assert cliente.get(url).status_code == 200
+    assert [s for s in ejecutadas if _es_select_tipos(s)]
\ No newline at end of file
@@ -0,0 +1,93 @@
+# tests/test_trabajos.py
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from flask import Flask
+
+
+@pytest.fixture
+def cola(tmp_path):
+    from config import Config
+    from trabajos import ColaTrabajos
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config['TRABAJOS_FOLDER'] = str(tmp_path / 'trabajos')
+    return ColaTrabajos(app)
+
+
+@pytest.fixture(scope='module')
+def pid_terminado():
+    """pid de un proceso de esta máquina que ya terminó"""
+    proceso = subprocess.Popen([sys.executable, '-c', 'pass'])
+    proceso.wait()
+    return proceso.pid
+
+
+def _trabajo_ajeno(cola, pid, host=None, latido=None, parametros=None):
+    """Trabajo en ejecución guardado por otro proceso (no está en la memoria de cola)"""
+    from trabajos import Trabajo
+    parametros = parametros or {'dias': 30}
+    # La misma clave que calcula encolar('reporte', parametros, ...)
+    trabajo = Trabajo('reporte', parametros, f'reporte:{json.dumps(parametros, sort_keys=True)}')
+    trabajo.estado = Trabajo.EJECUTANDO
+    trabajo.pid = pid
+    if host is not None:
+        trabajo.host = host
+    if latido is not None:
+        trabajo.latido = latido
+    cola.guardar(trabajo)
+    return trabajo
+
+
+def test_trabajo_con_dueno_muerto_pasa_a_error(cola, pid_terminado):
+    from trabajos import Trabajo
+    trabajo = _trabajo_ajeno(cola, pid_terminado)
+
+    leido = cola.obtener(trabajo.id)
+    assert leido.estado == Trabajo.ERROR
+    assert leido.error
+    # El error queda guardado para los demás procesos
+    assert cola.obtener(trabajo.id).estado == Trabajo.ERROR
+
+
+def test_trabajo_con_el_pid_de_este_proceso_fuera_de_memoria_es_huerfano(cola):
+    from trabajos import Trabajo
+    trabajo = _trabajo_ajeno(cola, os.getpid())
+    assert cola.obtener(trabajo.id).estado == Trabajo.ERROR
+
+
+def test_trabajo_de_otro_host_se_juzga_por_el_latido(cola):
+    from trabajos import Trabajo
+    vencido = time.time() - cola.latido_max - 1
+    sin_latido = _trabajo_ajeno(cola, 1, host='otro-host', latido=vencido, parametros={'dias': 1})
+    con_latido = _trabajo_ajeno(cola, 1, host='otro-host', parametros={'dias': 2})
+
+    assert cola.obtener(sin_latido.id).estado == Trabajo.ERROR
+    assert cola.obtener(con_latido.id).estado == Trabajo.EJECUTANDO
+
+
+def test_encolar_reutiliza_el_trabajo_activo_de_otro_proceso(cola):
+    # pid 1 existe siempre: el dueño está vivo y el trabajo sigue activo
+    ajeno = _trabajo_ajeno(cola, 1)
+    cola._escribir(cola._ruta_clave(ajeno.clave), ajeno.id)
+
+    trabajo, nuevo = cola.encolar('reporte', {'dias': 30}, lambda trabajo: None)
+    assert not nuevo
+    assert trabajo.id == ajeno.id
+
+
+def test_encolar_reemplaza_el_trabajo_huerfano(cola, pid_terminado):
+    from trabajos import Trabajo
+    huerfano = _trabajo_ajeno(cola, pid_terminado)
+    cola._escribir(cola._ruta_clave(huerfano.clave), huerfano.id)
+    terminado = threading.Event()
+
+    trabajo, nuevo = cola.encolar('reporte', {'dias': 30}, lambda trabajo: terminado.set())
+    assert nuevo
+    assert trabajo.id != huerfano.id
+    assert cola.obtener(huerfano.id).estado == Trabajo.ERROR
+    assert terminado.wait(10)
\ No newline at end of file